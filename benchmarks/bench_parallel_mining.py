@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Parallel mining benchmark for SampleChain.
+
+Compares the hash rate of the threaded mining path (mine_block_parallel)
+with the process pool path (mine_block_processes) for increasing worker
+counts. Blocks use an unreachable difficulty so every run hashes the full
+nonce range and the amount of work is identical across modes.
+
+Usage:
+    python benchmarks/bench_parallel_mining.py --nonces 400000 --workers 1 2 4 8
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from samplechain import Block, Miner, Transaction
+
+
+def make_block(num_transactions: int) -> Block:
+    """Create a block that can never be mined (difficulty 64)."""
+    transactions = [
+        Transaction(from_address=i, to_address=i + 1, value=1 + i % 100, fee=i % 7)
+        for i in range(num_transactions)
+    ]
+    return Block(index=1, transactions=transactions, difficulty=64)
+
+
+def measure(mine: Callable[[Block], bool], block: Block, nonces: int) -> float:
+    """Run one full nonce sweep and return the hash rate in H/s."""
+    start_time = time.perf_counter()
+    mine(block)
+    return nonces / (time.perf_counter() - start_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--nonces", type=int, default=400000)
+    parser.add_argument("--transactions", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    block = make_block(args.transactions)
+    miner = Miner(max_nonce=args.nonces)
+
+    print(f"{'workers':>8} {'threads H/s':>14} {'processes H/s':>14} {'speedup':>8}")
+
+    baseline: List[float] = []
+    try:
+        for workers in args.workers:
+            threaded = measure(
+                lambda b: miner.mine_block_parallel(b, num_workers=workers),
+                block,
+                args.nonces,
+            )
+
+            # Start the persistent pool outside the timed run
+            miner._get_process_pool(workers)
+            processes = measure(
+                lambda b: miner.mine_block_processes(b, num_workers=workers),
+                block,
+                args.nonces,
+            )
+
+            if not baseline:
+                baseline.append(processes)
+
+            print(
+                f"{workers:>8} {threaded:>14,.0f} {processes:>14,.0f} "
+                f"{processes / baseline[0]:>7.2f}x"
+            )
+    finally:
+        miner.close()
+
+
+if __name__ == "__main__":
+    main()
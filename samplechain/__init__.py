@@ -12,5 +12,6 @@ from .blockchain import Blockchain
 from .block import Block
 from .transaction import Transaction
 from .miner import Miner
+from .mempool import Mempool
 
-__all__ = ["Blockchain", "Block", "Transaction", "Miner"]
+__all__ = ["Blockchain", "Block", "Transaction", "Miner", "Mempool"]
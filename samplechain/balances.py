@@ -0,0 +1,85 @@
+"""
+Balances module for the SampleChain blockchain.
+
+This module contains the BalanceOverlay class, a copy-on-write view of the
+ledger balances used to validate and assemble blocks without copying every
+account.
+"""
+
+from typing import Dict, Iterator, Mapping, MutableMapping
+
+
+class BalanceOverlay(MutableMapping[int, int]):
+    """
+    Writable view of a balance mapping that records only the changes.
+
+    Reads fall through to the base balances for addresses that have not
+    been written. Writes are kept in the overlay until commit() applies
+    them to the base; discard() drops them. Creating, reading and
+    discarding an overlay costs O(touched addresses), independent of the
+    number of accounts in the ledger.
+
+    Attributes:
+        base: The underlying balances
+    """
+
+    def __init__(self, base: MutableMapping[int, int]) -> None:
+        """
+        Create an overlay on top of a balance mapping.
+
+        Args:
+            base: Balances to read through to and commit into
+        """
+        self.base = base
+        self._changes: Dict[int, int] = {}
+
+    @property
+    def changes(self) -> Mapping[int, int]:
+        """Balances written through this overlay, by address."""
+        return self._changes
+
+    def __getitem__(self, address: int) -> int:
+        """Get a balance; unknown addresses have a balance of 0."""
+        if address in self._changes:
+            return self._changes[address]
+
+        # Use get() so defaultdict bases are not populated by reads
+        return self.base.get(address, 0)
+
+    def __contains__(self, address: object) -> bool:
+        """Check whether an address is in the overlay or the base."""
+        return address in self._changes or address in self.base
+
+    def __setitem__(self, address: int, balance: int) -> None:
+        """Record a new balance for an address."""
+        self._changes[address] = balance
+
+    def __delitem__(self, address: int) -> None:
+        """Reset an address to a zero balance."""
+        self._changes[address] = 0
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over all addresses in the base and the overlay."""
+        yield from self.base
+        for address in self._changes:
+            if address not in self.base:
+                yield address
+
+    def __len__(self) -> int:
+        """Number of addresses in the base and the overlay."""
+        return len(self.base) + sum(
+            1 for address in self._changes if address not in self.base
+        )
+
+    def commit(self) -> None:
+        """Apply the recorded changes to the base balances."""
+        self.base.update(self._changes)
+        self._changes.clear()
+
+    def discard(self) -> None:
+        """Drop the recorded changes."""
+        self._changes.clear()
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return f"BalanceOverlay(changes={len(self._changes)})"
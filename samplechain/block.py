@@ -5,13 +5,139 @@ This module contains the Block class which represents a blockchain block
 containing transactions, proof-of-work, and linking to previous blocks.
 """
 
+import copy
 import hashlib
 import json
+import struct
 import time
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Optional, SupportsIndex, Tuple
+from dataclasses import FrozenInstanceError, dataclass, field
 
 from .transaction import Transaction
+from .pow import MAX_TARGET, difficulty_to_target
+
+# Block versions: legacy blocks hash their whole serialized body, header
+# blocks hash a fixed-size header that commits to the transactions through
+# the Merkle root
+BLOCK_VERSION_LEGACY = 1
+BLOCK_VERSION_HEADER = 2
+
+# Header fields preceding the nonce: version, index, timestamp, previous
+# hash, Merkle root and target (33 bytes so the accept-all 2**256 fits)
+_HEADER_PREFIX = struct.Struct(">IQq32s32s33s")
+_HEADER_NONCE = struct.Struct(">Q")
+HEADER_SIZE = _HEADER_PREFIX.size + _HEADER_NONCE.size
+
+# Fields covered by the block hash; assigning any of them clears the cache
+_HASHED_FIELDS = frozenset(
+    (
+        "index",
+        "transactions",
+        "timestamp",
+        "previous_hash",
+        "nonce",
+        "difficulty",
+        "target",
+        "version",
+    )
+)
+
+
+@dataclass(frozen=True)
+class PrunedBody:
+    """
+    Summary kept in place of the transactions of a pruned block.
+
+    Attributes:
+        transaction_count: Number of transactions the block had
+        total_value: Sum of their values
+        total_fees: Sum of their fees
+    """
+
+    transaction_count: int
+    total_value: int
+    total_fees: int
+
+
+class TransactionList(List[Transaction]):
+    """
+    List of a block's transactions that reports in-place changes.
+
+    Every mutating list method notifies the owning block so it can drop
+    its cached hashes, and refuses to run once the block is frozen.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction], owner: "Block") -> None:
+        """
+        Create a transaction list owned by a block.
+
+        Args:
+            transactions: Initial transactions
+            owner: Block whose caches depend on this list
+        """
+        super().__init__(transactions)
+        self._owner = owner
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle with the owner as an argument, so it is set before any items."""
+        return TransactionList, (list(self), self._owner)
+
+    def _before_change(self) -> None:
+        """Reject changes to frozen blocks and invalidate the owner's caches."""
+        self._owner._transactions_changed()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._before_change()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        self._before_change()
+        super().__delitem__(index)
+
+    # Like list.__iadd__, this accepts any iterable, which __add__ does not
+    def __iadd__(  # type: ignore[override, misc]
+        self, other: Iterable[Transaction]
+    ) -> "TransactionList":
+        self._before_change()
+        super().__iadd__(other)
+        return self
+
+    def __imul__(self, count: SupportsIndex) -> "TransactionList":
+        self._before_change()
+        super().__imul__(count)
+        return self
+
+    def append(self, transaction: Transaction) -> None:
+        self._before_change()
+        super().append(transaction)
+
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        self._before_change()
+        super().extend(transactions)
+
+    def insert(self, index: SupportsIndex, transaction: Transaction) -> None:
+        self._before_change()
+        super().insert(index, transaction)
+
+    def pop(self, index: SupportsIndex = -1) -> Transaction:
+        self._before_change()
+        return super().pop(index)
+
+    def remove(self, transaction: Transaction) -> None:
+        self._before_change()
+        super().remove(transaction)
+
+    def clear(self) -> None:
+        self._before_change()
+        super().clear()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._before_change()
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._before_change()
+        super().reverse()
 
 
 @dataclass
@@ -29,6 +155,19 @@ class Block:
         previous_hash: Hash of the previous block in the chain
         nonce: Proof-of-work nonce value
         difficulty: Mining difficulty (number of leading zeros required)
+        target: Optional 256-bit integer target; when set, the hash value
+            must be below it and difficulty is informational only
+        version: Hash format version (BLOCK_VERSION_LEGACY or
+            BLOCK_VERSION_HEADER)
+
+    The block hash, Merkle root and encoded transactions are cached and
+    cleared whenever a hashed field is assigned or the transaction list is
+    modified. Blocks accepted into a chain are frozen with freeze(), after
+    which these fields can no longer change.
+
+    A pruned block, made by prune(), has had its transactions dropped. It
+    keeps its cached hash and Merkle root and a PrunedBody with the
+    transaction totals, so it still links into the chain.
     """
 
     index: int
@@ -37,6 +176,60 @@ class Block:
     previous_hash: str = "0" * 64  # SHA256 produces 64-character hex strings
     nonce: int = 0
     difficulty: int = 4  # Number of leading zeros required in hash
+    target: Optional[int] = None  # Overrides difficulty when set
+    version: int = BLOCK_VERSION_LEGACY
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Invalidate cached hashes when a hashed field is assigned."""
+        if name in _HASHED_FIELDS:
+            if self.__dict__.get("_frozen"):
+                raise FrozenInstanceError(
+                    f"cannot assign to field {name!r} of a frozen block"
+                )
+
+            if name == "transactions":
+                self._clear_transaction_caches()
+                value = TransactionList(value, self)
+
+            self.__dict__.pop("_hash", None)
+
+        super().__setattr__(name, value)
+
+    def _clear_transaction_caches(self) -> None:
+        """Drop every cached value derived from the transactions."""
+        self.__dict__.pop("_merkle_root", None)
+        self.__dict__.pop("_body", None)
+        self.__dict__.pop("_hash", None)
+
+    def _transactions_changed(self) -> None:
+        """
+        Handle an in-place change to the transaction list.
+
+        Raises:
+            FrozenInstanceError: If the block is frozen
+        """
+        if self.__dict__.get("_frozen"):
+            raise FrozenInstanceError("cannot modify transactions of a frozen block")
+
+        self._clear_transaction_caches()
+
+    def freeze(self) -> None:
+        """
+        Make the block's hashed fields read-only.
+
+        Frozen blocks never recompute their hash, so chain validation and
+        tip lookups pay for it once. Use copy() to get a mutable block.
+        """
+        self.__dict__["_frozen"] = True
+
+    def is_frozen(self) -> bool:
+        """
+        Check if the block has been frozen.
+
+        Returns:
+            True if the block's hashed fields are read-only
+        """
+        return bool(self.__dict__.get("_frozen"))
 
     def __post_init__(self) -> None:
         """Validate block parameters after initialization."""
@@ -46,6 +239,12 @@ class Block:
         if self.difficulty < 0:
             raise ValueError("Difficulty must be non-negative")
 
+        if self.target is not None and not 0 < self.target <= MAX_TARGET:
+            raise ValueError("Target must be between 1 and 2**256")
+
+        if self.version not in (BLOCK_VERSION_LEGACY, BLOCK_VERSION_HEADER):
+            raise ValueError(f"Unsupported block version {self.version}")
+
         if len(self.previous_hash) != 64:
             raise ValueError("Previous hash must be 64 characters (SHA256)")
 
@@ -54,60 +253,163 @@ class Block:
             if not isinstance(transaction, Transaction):
                 raise TypeError("All transactions must be Transaction objects")
 
+    def get_hash_prefix(self) -> bytes:
+        """
+        Get the encoded part of the hash preimage that precedes the nonce.
+
+        The prefix is cheap to rebuild, which lets miners roll the timestamp
+        without re-encoding the transactions.
+
+        Returns:
+            Encoded prefix bytes
+        """
+        if self.version == BLOCK_VERSION_LEGACY:
+            return f"{self.index}:{self.timestamp}:{self.previous_hash}:".encode()
+
+        return _HEADER_PREFIX.pack(
+            self.version,
+            self.index,
+            self.timestamp,
+            bytes.fromhex(self.previous_hash),
+            bytes.fromhex(self.get_merkle_root()),
+            self.get_target().to_bytes(33, "big"),
+        )
+
+    def get_hash_preimage(self) -> Tuple[bytes, bytes]:
+        """
+        Get the encoded hash preimage split around the nonce.
+
+        The block hash is the SHA256 of ``prefix + nonce + suffix``, so
+        miners can encode both parts once and only vary the nonce. Header
+        blocks have an empty suffix.
+
+        Returns:
+            Tuple of (prefix, suffix) bytes surrounding the nonce
+        """
+        if self.version != BLOCK_VERSION_LEGACY:
+            return self.get_hash_prefix(), b""
+
+        body = self.__dict__.get("_body")
+
+        if body is None:
+            # Deterministic JSON array of the cached transaction encodings
+            transactions_bytes = b",".join(
+                tx.get_canonical_encoding() for tx in self.transactions
+            )
+            body = b":[" + transactions_bytes + b"]"
+            self.__dict__["_body"] = body
+
+        return self.get_hash_prefix(), body
+
+    def get_nonce_size(self) -> int:
+        """
+        Get the width of the encoded nonce in the hash preimage.
+
+        Returns:
+            Nonce size in bytes, or 0 for the legacy decimal encoding
+        """
+        if self.version == BLOCK_VERSION_LEGACY:
+            return 0
+
+        return _HEADER_NONCE.size
+
+    def encode_nonce(self, nonce: int) -> bytes:
+        """
+        Encode a nonce the way it appears in the hash preimage.
+
+        Args:
+            nonce: Nonce value to encode
+
+        Returns:
+            Encoded nonce bytes
+        """
+        if self.version == BLOCK_VERSION_LEGACY:
+            return str(nonce).encode()
+
+        return _HEADER_NONCE.pack(nonce)
+
+    def get_header(self) -> bytes:
+        """
+        Get the fixed-size binary header of a header-format block.
+
+        Returns:
+            HEADER_SIZE bytes committing to all block fields
+
+        Raises:
+            ValueError: If this is a legacy block, which has no header
+        """
+        if self.version == BLOCK_VERSION_LEGACY:
+            raise ValueError("Legacy blocks do not have a fixed-size header")
+
+        return self.get_hash_prefix() + _HEADER_NONCE.pack(self.nonce)
+
     def calculate_hash(self) -> str:
         """
         Calculate the SHA256 hash of this block.
 
-        The hash includes the block index, timestamp, previous hash, nonce,
-        and all transactions in the block.
+        Legacy blocks hash the index, timestamp, previous hash, nonce and
+        all serialized transactions. Header blocks hash only their
+        fixed-size header, so the cost does not grow with the transactions
+        once the Merkle root is known. The result is cached until a hashed
+        field changes.
 
         Returns:
             The hexadecimal hash string of the block
         """
-        # Create a deterministic string representation of transactions
-        transactions_str = json.dumps(
-            [tx.to_dict() for tx in self.transactions],
-            sort_keys=True,
-            separators=(",", ":"),
-        )
+        block_hash: Optional[str] = self.__dict__.get("_hash")
 
-        block_string = (
-            f"{self.index}:"
-            f"{self.timestamp}:"
-            f"{self.previous_hash}:"
-            f"{self.nonce}:"
-            f"{transactions_str}"
-        )
+        if block_hash is None:
+            prefix, suffix = self.get_hash_preimage()
+            block_bytes = prefix + self.encode_nonce(self.nonce) + suffix
+            block_hash = hashlib.sha256(block_bytes).hexdigest()
+            self.__dict__["_hash"] = block_hash
 
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        return block_hash
+
+    def get_target(self) -> int:
+        """
+        Get the integer target this block's hash must be below.
+
+        Returns:
+            The explicit target, or the target equivalent to the difficulty
+        """
+        if self.target is not None:
+            return self.target
+
+        return difficulty_to_target(self.difficulty)
 
     def is_hash_valid(self, block_hash: Optional[str] = None) -> bool:
         """
         Check if the block's hash meets the difficulty requirement.
 
+        The hash value is compared against the block's target, which for
+        blocks without an explicit target is the same as requiring
+        ``difficulty`` leading zero hex digits.
+
         Args:
             block_hash: Hash to validate (if None, calculates current hash)
 
         Returns:
-            True if hash has the required number of leading zeros
+            True if hash is below the block's target
         """
         if block_hash is None:
             block_hash = self.calculate_hash()
 
-        # If difficulty is 0, any hash is valid
-        if self.difficulty == 0:
-            return True
-
-        required_prefix = "0" * self.difficulty
-        return block_hash.startswith(required_prefix)
+        return int(block_hash, 16) < self.get_target()
 
     def get_merkle_root(self) -> str:
         """
         Calculate the Merkle root of all transactions in this block.
 
+        The root is cached until the transactions change.
+
         Returns:
             SHA256 hash representing the Merkle root
         """
+        merkle_root: Optional[str] = self.__dict__.get("_merkle_root")
+        if merkle_root is not None:
+            return merkle_root
+
         if not self.transactions:
             return "0" * 64
 
@@ -128,15 +430,33 @@ class Block:
 
             hashes = next_level
 
+        self.__dict__["_merkle_root"] = hashes[0]
         return hashes[0]
 
+    def get_transaction_count(self) -> int:
+        """
+        Count the transactions in this block, including pruned ones.
+
+        Returns:
+            Number of transactions
+        """
+        pruned: Optional[PrunedBody] = self.__dict__.get("_pruned")
+        if pruned is not None:
+            return pruned.transaction_count
+
+        return len(self.transactions)
+
     def get_transaction_total(self) -> int:
         """
         Calculate the total value of all transactions in this block.
 
         Returns:
-            Sum of all transaction values
+            Sum of all transaction values, including pruned ones
         """
+        pruned: Optional[PrunedBody] = self.__dict__.get("_pruned")
+        if pruned is not None:
+            return pruned.total_value
+
         return sum(tx.value for tx in self.transactions)
 
     def get_total_fees(self) -> int:
@@ -144,16 +464,74 @@ class Block:
         Calculate the total fees of all transactions in this block.
 
         Returns:
-            Sum of all transaction fees
+            Sum of all transaction fees, including pruned ones
         """
+        pruned: Optional[PrunedBody] = self.__dict__.get("_pruned")
+        if pruned is not None:
+            return pruned.total_fees
+
         return sum(tx.fee for tx in self.transactions)
 
+    def is_pruned(self) -> bool:
+        """
+        Check if the block's transactions have been pruned.
+
+        Returns:
+            True if only the header and transaction totals are left
+        """
+        return "_pruned" in self.__dict__
+
+    def prune(self) -> "Block":
+        """
+        Get a frozen copy of this block without its transactions.
+
+        The copy keeps every header field, the Merkle root, the hash and
+        the transaction totals, so hash links and proof-of-work can still
+        be checked. Its hash can no longer be recomputed from its contents.
+
+        Returns:
+            The pruned copy, or this block if it is already pruned
+        """
+        if self.is_pruned():
+            return self
+
+        pruned = Block(
+            index=self.index,
+            transactions=[],
+            timestamp=self.timestamp,
+            previous_hash=self.previous_hash,
+            nonce=self.nonce,
+            difficulty=self.difficulty,
+            target=self.target,
+            version=self.version,
+        )
+        pruned._set_pruned(
+            self.get_merkle_root(),
+            self.calculate_hash(),
+            PrunedBody(
+                transaction_count=len(self.transactions),
+                total_value=self.get_transaction_total(),
+                total_fees=self.get_total_fees(),
+            ),
+        )
+        return pruned
+
+    def _set_pruned(
+        self, merkle_root: str, block_hash: Optional[str], body: PrunedBody
+    ) -> None:
+        """Turn an empty block into a frozen pruned block."""
+        self.__dict__["_merkle_root"] = merkle_root
+        if block_hash is not None:
+            self.__dict__["_hash"] = block_hash
+        self.__dict__["_pruned"] = body
+        self.freeze()
+
     def copy(self) -> "Block":
         """
         Create a copy of this block for parallel mining operations.
 
         Returns:
-            New Block instance with the same data
+            New, unfrozen Block instance with the same data
         """
         return Block(
             index=self.index,
@@ -162,8 +540,34 @@ class Block:
             previous_hash=self.previous_hash,
             nonce=self.nonce,
             difficulty=self.difficulty,
+            target=self.target,
+            version=self.version,
         )
 
+    def __copy__(self) -> "Block":
+        """
+        Create a shallow copy with its own transaction list.
+
+        The copy shares the transactions themselves, but changing its list
+        invalidates only its own caches.
+        """
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__["transactions"] = TransactionList(self.transactions, clone)
+        return clone
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Block":
+        """Create a deep copy whose transaction list belongs to the copy."""
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        for name, value in self.__dict__.items():
+            if name != "transactions":
+                clone.__dict__[name] = copy.deepcopy(value, memo)
+
+        transactions = copy.deepcopy(list(self.transactions), memo)
+        clone.__dict__["transactions"] = TransactionList(transactions, clone)
+        return clone
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert block to dictionary representation.
@@ -171,7 +575,7 @@ class Block:
         Returns:
             Dictionary containing all block data
         """
-        return {
+        data = {
             "index": self.index,
             "timestamp": self.timestamp,
             "previous_hash": self.previous_hash,
@@ -179,12 +583,25 @@ class Block:
             "difficulty": self.difficulty,
             "hash": self.calculate_hash(),
             "merkle_root": self.get_merkle_root(),
-            "transaction_count": len(self.transactions),
+            "transaction_count": self.get_transaction_count(),
             "transactions": [tx.to_dict() for tx in self.transactions],
             "total_value": self.get_transaction_total(),
             "total_fees": self.get_total_fees(),
         }
 
+        # Only blocks with an explicit target carry it, so hex-difficulty
+        # chains serialize exactly as before
+        if self.target is not None:
+            data["target"] = format(self.target, "x")
+
+        if self.version != BLOCK_VERSION_LEGACY:
+            data["version"] = self.version
+
+        if self.is_pruned():
+            data["pruned"] = True
+
+        return data
+
     def to_json(self) -> str:
         """
         Convert block to JSON string.
@@ -204,20 +621,44 @@ class Block:
 
         Returns:
             New Block instance
+
+        Raises:
+            ValueError: If a pruned header block does not match its hash
         """
         transactions = [
             Transaction.from_dict(tx_data) for tx_data in data["transactions"]
         ]
+        target = data.get("target")
 
-        return cls(
+        block = cls(
             index=data["index"],
             transactions=transactions,
             timestamp=data["timestamp"],
             previous_hash=data["previous_hash"],
             nonce=data["nonce"],
             difficulty=data.get("difficulty", 4),
+            target=int(target, 16) if isinstance(target, str) else target,
+            version=data.get("version", BLOCK_VERSION_LEGACY),
         )
 
+        if data.get("pruned"):
+            # Header blocks are rehashed from the stored Merkle root; legacy
+            # blocks hash their transactions, so their stored hash is trusted
+            legacy = block.version == BLOCK_VERSION_LEGACY
+            block._set_pruned(
+                data["merkle_root"],
+                data["hash"] if legacy else None,
+                PrunedBody(
+                    transaction_count=data["transaction_count"],
+                    total_value=data["total_value"],
+                    total_fees=data["total_fees"],
+                ),
+            )
+            if block.calculate_hash() != data["hash"]:
+                raise ValueError(f"Block {block.index} does not match its hash")
+
+        return block
+
     @classmethod
     def from_json(cls, json_str: str) -> "Block":
         """
@@ -233,15 +674,22 @@ class Block:
         return cls.from_dict(data)
 
     @classmethod
-    def create_genesis_block(cls) -> "Block":
+    def create_genesis_block(cls, version: int = BLOCK_VERSION_LEGACY) -> "Block":
         """
         Create the genesis (first) block of the blockchain.
 
+        Args:
+            version: Hash format version of the new chain
+
         Returns:
             Genesis block with index 0 and no transactions
         """
         return cls(
-            index=0, transactions=[], previous_hash="0" * 64, timestamp=int(time.time())
+            index=0,
+            transactions=[],
+            previous_hash="0" * 64,
+            timestamp=int(time.time()),
+            version=version,
         )
 
     def __str__(self) -> str:
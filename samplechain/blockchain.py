@@ -7,12 +7,39 @@ functionality.
 """
 
 import json
-from typing import List, Dict, Optional
-from collections import defaultdict
-
-from .block import Block
+import mmap
+import os
+from array import array
+from dataclasses import asdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    List,
+    Dict,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from collections import defaultdict, deque
+
+from .balances import BalanceOverlay
+from .block import BLOCK_VERSION_HEADER, BLOCK_VERSION_LEGACY, Block
+from .index import ChainIndex, Location
+from .lazy import LazyChain
+from .mempool import Mempool, MempoolFullError
+from .snapshot import StateSnapshot
+from .stats import ChainStats, ChainTotals
 from .transaction import Transaction
 
+if TYPE_CHECKING:
+    from .storage import StorageBackend
+
 
 class BlockchainError(Exception):
     """Base exception for blockchain operations."""
@@ -32,6 +59,12 @@ class InvalidBlockError(BlockchainError):
     pass
 
 
+class PrunedDataError(BlockchainError):
+    """Raised when a query needs transactions that have been pruned."""
+
+    pass
+
+
 class Blockchain:
     """
     Manages the blockchain and maintains account balances.
@@ -41,11 +74,25 @@ class Blockchain:
     the blockchain state.
 
     Attributes:
-        chain: List of blocks in the blockchain
-        pending_transactions: List of transactions waiting to be mined
+        chain: List of blocks in the blockchain, or a LazyChain decoding
+            stored blocks on demand
+        index: Address and hash indexes over the blocks in the chain, built
+            on first use
+        stats: Running aggregates over the blocks in the chain, built on
+            first use
+        mempool: Transactions waiting to be mined, indexed by hash
+        pending_transactions: Alias of mempool kept for existing callers
         balances: Dictionary mapping addresses to their current balances
         difficulty: Current mining difficulty
+        target: Current 256-bit mining target (None to use difficulty)
         mining_reward: Reward given to miners for mining a block
+        block_version: Hash format version of newly created blocks
+        mempool_reject_unaffordable: Whether admission and block updates
+            keep every sender's pending transactions affordable together
+        storage: Persistent store new blocks are appended to (None to keep
+            the chain in memory only)
+        prune_depth: Number of most recent blocks whose transactions are
+            kept in memory (None to keep every block's transactions)
     """
 
     def __init__(
@@ -53,6 +100,13 @@ class Blockchain:
         initial_balances: Optional[Dict[int, int]] = None,
         difficulty: int = 4,
         mining_reward: int = 10,
+        target: Optional[int] = None,
+        block_version: int = BLOCK_VERSION_HEADER,
+        mempool_allow_duplicates: bool = False,
+        mempool_reject_unaffordable: bool = False,
+        mempool_max_transactions: Optional[int] = None,
+        mempool_max_bytes: Optional[int] = None,
+        prune_depth: Optional[int] = None,
     ) -> None:
         """
         Initialize a new blockchain.
@@ -61,21 +115,91 @@ class Blockchain:
             initial_balances: Starting balances for addresses
             difficulty: Mining difficulty (number of leading zeros)
             mining_reward: Reward for mining a block
+            target: Integer mining target that overrides difficulty, for
+                finer control over block times
+            block_version: Hash format version for new blocks; header
+                blocks hash in constant time regardless of transactions
+            mempool_allow_duplicates: Accept a transaction identical to one
+                already pending as a separate transfer, as the original
+                getLatestBlock did, instead of rejecting it
+            mempool_reject_unaffordable: Admit a transaction only if the
+                sender can cover it together with its pending ones, and
+                evict pending transactions that blocks make unaffordable;
+                see add_transaction()
+            mempool_max_transactions: Maximum number of pending
+                transactions (None for no limit)
+            mempool_max_bytes: Maximum estimated mempool size in bytes
+                (None for no limit)
+            prune_depth: Prune the transactions of blocks more than this
+                many blocks below the tip as blocks are added (None to
+                keep them all); see prune()
+
+        Raises:
+            ValueError: If prune_depth is less than 1
         """
-        self.chain: List[Block] = []
-        self.pending_transactions: List[Transaction] = []
+        if prune_depth is not None and prune_depth < 1:
+            raise ValueError("Prune depth must be at least 1")
+
+        self.chain: MutableSequence[Block] = []
+        self.mempool = Mempool(
+            max_transactions=mempool_max_transactions,
+            max_bytes=mempool_max_bytes,
+            allow_duplicates=mempool_allow_duplicates,
+        )
         self.balances: Dict[int, int] = defaultdict(int)
         self.difficulty = difficulty
+        self.target = target
         self.mining_reward = mining_reward
+        self.block_version = block_version
+        self.mempool_reject_unaffordable = mempool_reject_unaffordable
+        self.storage: Optional["StorageBackend"] = None
+        self.prune_depth = prune_depth
+        self._pruned_height = 0
 
         # Set initial balances
         if initial_balances:
             self.balances.update(initial_balances)
 
         # Create genesis block with no difficulty requirement
-        genesis_block = Block.create_genesis_block()
+        genesis_block = Block.create_genesis_block(version=block_version)
         genesis_block.difficulty = 0  # Genesis block doesn't need proof-of-work
+        genesis_block.freeze()
         self.chain.append(genesis_block)
+        self._index: Optional[ChainIndex] = ChainIndex(self.chain)
+        self._stats: Optional[ChainStats] = ChainStats(self.balances)
+        self._stats.add_block(genesis_block)
+
+    @property
+    def index(self) -> ChainIndex:
+        """Address and hash indexes, built from the chain on first use."""
+        if self._index is None:
+            self._index = ChainIndex(self.chain)
+            # Blocks read back from storage may still carry pruned bodies
+            for height in range(self._pruned_height):
+                self._index.remove_transactions(self.chain[height])
+        return self._index
+
+    @property
+    def stats(self) -> ChainStats:
+        """Running chain statistics, built from the chain on first use."""
+        if self._stats is None:
+            self._stats = ChainStats()
+            self._stats.rebuild(self.chain, self.balances)
+        return self._stats
+
+    @property
+    def pending_transactions(self) -> Mempool:
+        """Transactions waiting to be mined, in arrival order."""
+        return self.mempool
+
+    @pending_transactions.setter
+    def pending_transactions(self, transactions: Iterable[Transaction]) -> None:
+        self.mempool = Mempool(
+            transactions,
+            max_transactions=self.mempool.max_transactions,
+            max_bytes=self.mempool.max_bytes,
+            allow_duplicates=self.mempool.allow_duplicates,
+        )
 
     def get_latest_block(self) -> Block:
         """
@@ -102,6 +226,12 @@ class Blockchain:
         """
         Add a new transaction to the pending transactions pool.
 
+        By default the sender's confirmed balance must cover the
+        transaction on its own. With mempool_reject_unaffordable set, it
+        must cover the transaction on top of the value and fees of the
+        sender's pending transactions, less what pending transactions pay
+        the sender, so a transaction funded by a pending one is admitted.
+
         Args:
             transaction: The transaction to add
 
@@ -109,18 +239,46 @@ class Blockchain:
             True if transaction was added successfully
 
         Raises:
-            InvalidTransactionError: If transaction is invalid
+            InvalidTransactionError: If transaction is invalid, already
+                pending (unless the mempool allows duplicates), or its fee
+                is too low for a full mempool
         """
-        if not self.is_transaction_valid(transaction):
+        if not self.mempool.allow_duplicates and transaction in self.mempool:
+            raise InvalidTransactionError(
+                f"Transaction {transaction} is invalid: already pending"
+            )
+
+        if self.mempool_reject_unaffordable:
+            # Check against the balance left after the sender's pending
+            # spends and receipts, so queued transactions never overspend
+            # together
+            sender = transaction.from_address
+            available = (
+                self.balances.get(sender, 0)
+                - self.mempool.get_pending_debit(sender)
+                + self.mempool.get_pending_credit(sender)
+            )
+            valid = available >= transaction.value + transaction.fee
+        else:
+            valid = self.is_transaction_valid(transaction)
+
+        if not valid:
             raise InvalidTransactionError(
                 f"Transaction {transaction} is invalid: insufficient balance"
             )
 
-        self.pending_transactions.append(transaction)
+        try:
+            self.mempool.add(transaction)
+        except MempoolFullError as e:
+            raise InvalidTransactionError(
+                f"Transaction {transaction} is invalid: {e}"
+            ) from e
         return True
 
     def is_transaction_valid(
-        self, transaction: Transaction, temp_balances: Optional[Dict[int, int]] = None
+        self,
+        transaction: Transaction,
+        temp_balances: Optional[Mapping[int, int]] = None,
     ) -> bool:
         """
         Check if a transaction is valid given current or temporary balances.
@@ -155,8 +313,8 @@ class Blockchain:
             List of valid transactions to include in block
         """
         valid_transactions = []
-        # Track balance changes within this block
-        temp_balances = self.balances.copy()
+        # Track balance changes within this block without copying the ledger
+        temp_balances = BalanceOverlay(self.balances)
 
         for transaction in transactions[:]:  # Work on a copy
             if len(valid_transactions) >= block_size:
@@ -173,6 +331,68 @@ class Blockchain:
 
         return valid_transactions
 
+    def select_transactions_for_block(self, block_size: int) -> List[Transaction]:
+        """
+        Select the highest-fee valid pending transactions for a block.
+
+        Candidates come from the mempool's fee index, so assembling a block
+        of k transactions costs O(k log n) rather than a scan of the whole
+        mempool. Balances are tracked within the block as in
+        validate_transactions_for_block.
+
+        A candidate its sender cannot afford yet is parked under the sender
+        instead of being dropped. Whenever a selected transaction credits
+        an address, that address's parked transactions are retried, so a
+        transaction funded by another pending transaction is placed right
+        after it. The block is filled whenever such an ordering exists.
+
+        Args:
+            block_size: Maximum number of transactions per block
+
+        Returns:
+            List of valid transactions in dependency order
+        """
+        selected: List[Transaction] = []
+        temp_balances = BalanceOverlay(self.balances)
+        parked: Dict[int, List[Transaction]] = {}
+        credited: Deque[int] = deque()
+
+        def try_include(transaction: Transaction) -> bool:
+            if not self.is_transaction_valid(transaction, temp_balances):
+                return False
+
+            selected.append(transaction)
+            temp_balances[transaction.from_address] -= (
+                transaction.value + transaction.fee
+            )
+            temp_balances[transaction.to_address] += transaction.value
+            credited.append(transaction.to_address)
+            return True
+
+        for transaction in self.mempool.iter_by_fee():
+            if len(selected) >= block_size:
+                break
+
+            if not try_include(transaction):
+                parked.setdefault(transaction.from_address, []).append(transaction)
+                continue
+
+            # Retry transactions unlocked by the credits just made
+            while credited and len(selected) < block_size:
+                waiting = parked.pop(credited.popleft(), None)
+                if not waiting:
+                    continue
+
+                still_waiting = [
+                    tx
+                    for tx in waiting
+                    if len(selected) >= block_size or not try_include(tx)
+                ]
+                if still_waiting:
+                    parked[still_waiting[0].from_address] = still_waiting
+
+        return selected
+
     def mine_pending_transactions(
         self, miner_address: int, block_size: int = 10
     ) -> Optional[Block]:
@@ -189,10 +409,8 @@ class Blockchain:
         if not self.pending_transactions:
             return None
 
-        # Validate and select transactions
-        valid_transactions = self.validate_transactions_for_block(
-            self.pending_transactions, block_size
-        )
+        # Select the most profitable valid transactions
+        valid_transactions = self.select_transactions_for_block(block_size)
 
         if not valid_transactions:
             return None
@@ -213,6 +431,8 @@ class Blockchain:
             transactions=valid_transactions,
             previous_hash=self.get_latest_block().calculate_hash(),
             difficulty=self.difficulty,
+            target=self.target,
+            version=self.block_version,
         )
 
         return new_block
@@ -221,6 +441,13 @@ class Blockchain:
         """
         Add a new block to the blockchain.
 
+        The block is frozen once accepted; use Block.copy() to derive a
+        modified block.
+
+        With storage attached, the block is stored before anything in
+        memory changes, so if storing it fails the error propagates and the
+        blockchain is left as it was.
+
         Args:
             block: The block to add
             skip_mining: Skip proof-of-work validation (for testing)
@@ -231,27 +458,101 @@ class Blockchain:
         Raises:
             InvalidBlockError: If block is invalid
         """
-        if not self.is_block_valid(block, skip_mining):
+        new_balances = self._validate_block(block, skip_mining)
+        if new_balances is None:
             raise InvalidBlockError(f"Block {block.index} is invalid")
 
-        # Apply transactions to balances
-        for transaction in block.transactions:
-            if transaction.from_address != -1:  # Not a mining reward
-                self.balances[transaction.from_address] -= (
-                    transaction.value + transaction.fee
-                )
-            self.balances[transaction.to_address] += transaction.value
+        # Persist first, so a failed write leaves the blockchain unchanged
+        if self.storage is not None:
+            self.storage.append_block(block)
+
+        # Remember touched balances so funded-address stats stay incremental
+        previous_balances = {
+            address: self.balances.get(address, 0) for address in new_balances.changes
+        }
 
-        # Add block to chain
+        new_balances.commit()
+
+        # Add block to chain; accepted blocks are immutable, so their hash
+        # is computed at most once
+        block.freeze()
         self.chain.append(block)
 
+        # Indexes not built yet will include the block when they are
+        if self._index is not None:
+            self._index.add_block(block)
+        if self._stats is not None:
+            self._stats.add_block(block, previous_balances, self.balances)
+
+        if self.storage is not None and self.storage.needs_checkpoint(len(self.chain)):
+            self.storage.write_state(self.get_snapshot())
+
+        if self.prune_depth is not None:
+            self.prune(self.prune_depth)
+
         # Remove processed transactions from pending
         for transaction in block.transactions:
-            if transaction in self.pending_transactions:
-                self.pending_transactions.remove(transaction)
+            self.mempool.discard(transaction)
+
+        # Only senders debited by this block can have become unable to
+        # cover their remaining pending transactions
+        if self.mempool_reject_unaffordable:
+            self.revalidate_mempool(
+                {tx.from_address for tx in block.transactions if tx.from_address != -1}
+            )
 
         return True
 
+    @staticmethod
+    def apply_block(balances: MutableMapping[int, int], block: Block) -> None:
+        """
+        Apply the transfers of a block to a balance mapping.
+
+        Args:
+            balances: Balances to update in place; missing addresses count
+                as zero
+            block: The block to apply
+        """
+        for transaction in block.transactions:
+            if transaction.from_address != -1:  # Not a mining reward
+                balances[transaction.from_address] = balances.get(
+                    transaction.from_address, 0
+                ) - (transaction.value + transaction.fee)
+            balances[transaction.to_address] = (
+                balances.get(transaction.to_address, 0) + transaction.value
+            )
+
+    def revalidate_mempool(self, addresses: Iterable[int]) -> List[Transaction]:
+        """
+        Evict pending transactions that their senders can no longer afford.
+
+        A sender can spend its confirmed balance plus what pending
+        transactions pay it. Only the given senders are checked, along with
+        the recipients of any evicted transaction, since they lose that
+        pending credit, so maintenance after a block costs O(affected
+        senders) rather than a scan of the mempool.
+
+        Args:
+            addresses: Senders whose balances may have decreased
+
+        Returns:
+            The evicted transactions
+        """
+        evicted: List[Transaction] = []
+        to_check = list(addresses)
+
+        while to_check:
+            address = to_check.pop()
+            dropped = self.mempool.evict_unaffordable(
+                address,
+                self.balances.get(address, 0)
+                + self.mempool.get_pending_credit(address),
+            )
+            evicted.extend(dropped)
+            to_check.extend(transaction.to_address for transaction in dropped)
+
+        return evicted
+
     def is_block_valid(self, block: Block, skip_mining: bool = False) -> bool:
         """
         Validate a block against the current blockchain state.
@@ -263,35 +564,50 @@ class Blockchain:
         Returns:
             True if block is valid
         """
+        return self._validate_block(block, skip_mining) is not None
+
+    def _validate_block(
+        self, block: Block, skip_mining: bool
+    ) -> Optional[BalanceOverlay]:
+        """
+        Validate a block and compute the balances it leads to.
+
+        Returns:
+            An uncommitted overlay holding the balances after the block, or
+            None if the block is invalid
+        """
         # Check block index
         if block.index != len(self.chain):
-            return False
+            return None
 
         # Check previous hash
         if block.previous_hash != self.get_latest_block().calculate_hash():
-            return False
+            return None
 
         # Check proof-of-work (unless skipped)
         if not skip_mining and not block.is_hash_valid():
-            return False
+            return None
 
         # Validate all transactions in the block
-        temp_balances = self.balances.copy()
+        temp_balances = BalanceOverlay(self.balances)
         for transaction in block.transactions:
             if transaction.from_address != -1:  # Not a mining reward
                 if not self.is_transaction_valid(transaction, temp_balances):
-                    return False
+                    return None
                 temp_balances[transaction.from_address] -= (
                     transaction.value + transaction.fee
                 )
             temp_balances[transaction.to_address] += transaction.value
 
-        return True
+        return temp_balances
 
     def is_chain_valid(self, validate_mining: bool = False) -> bool:
         """
         Validate the entire blockchain.
 
+        Pruned blocks are checked through their stored hashes, which can
+        no longer be recomputed from their transactions.
+
         Args:
             validate_mining: Whether to validate proof-of-work (default False for testing compatibility)
 
@@ -312,6 +628,130 @@ class Blockchain:
 
         return True
 
+    def prune(self, depth: int) -> int:
+        """
+        Drop the transactions of blocks more than depth blocks below the tip.
+
+        Pruned blocks keep their headers, Merkle roots, hashes and
+        transaction totals, so is_chain_valid(), the hash links and the
+        chain statistics are unaffected. Their transactions leave the
+        indexes: hash lookups and history counts only cover blocks from
+        get_pruned_height() on, and history queries that reach before it
+        raise PrunedDataError. With storage attached, the full blocks remain
+        available from the store.
+
+        Blocks held by a LazyChain are only in memory while cached, so only
+        blocks appended since it was loaded are replaced.
+
+        Args:
+            depth: Number of most recent blocks whose transactions are kept
+
+        Returns:
+            Number of blocks pruned
+
+        Raises:
+            ValueError: If depth is less than 1
+        """
+        if depth < 1:
+            raise ValueError("Prune depth must be at least 1")
+
+        start = self._pruned_height
+        end = len(self.chain) - depth
+        if end <= start:
+            return 0
+
+        for height in range(start, end):
+            if self._index is not None:
+                self._index.remove_transactions(self.chain[height])
+            if isinstance(self.chain, LazyChain):
+                self.chain.prune(height)
+            else:
+                self.chain[height] = self.chain[height].prune()
+
+        self._pruned_height = end
+        return end - start
+
+    def get_pruned_height(self) -> int:
+        """
+        Get the height below which transactions have been pruned.
+
+        Returns:
+            Number of leading blocks whose transactions are not available
+            (0 if nothing has been pruned)
+        """
+        return self._pruned_height
+
+    def get_block(self, height: int) -> Optional[Block]:
+        """
+        Get a block by its height.
+
+        Args:
+            height: Index of the block in the chain
+
+        Returns:
+            The block, or None if the chain is not that long
+        """
+        if 0 <= height < len(self.chain):
+            return self.chain[height]
+        return None
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """
+        Find a block in the chain by its hash.
+
+        Args:
+            block_hash: Hexadecimal block hash
+
+        Returns:
+            The block, or None if it is not in the chain
+        """
+        height = self.index.get_block_height(block_hash)
+        return self.chain[height] if height is not None else None
+
+    def get_transaction_by_hash(
+        self, tx_hash: str
+    ) -> Optional[Tuple[Transaction, Location]]:
+        """
+        Find a confirmed transaction by its hash.
+
+        Transactions of pruned blocks are not found.
+
+        Args:
+            tx_hash: Hexadecimal transaction hash
+
+        Returns:
+            Tuple of (transaction, (height, position)), or None if the
+            transaction is not in the chain
+        """
+        location = self.index.get_transaction_location(tx_hash)
+
+        if location is None:
+            return None
+
+        height, position = location
+        return self.chain[height].transactions[position], location
+
+    def get_pending_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        """
+        Find a pending transaction by its hash.
+
+        Args:
+            tx_hash: Hexadecimal transaction hash
+
+        Returns:
+            The transaction, or None if it is not in the mempool
+        """
+        return self.mempool.get(tx_hash.lower())
+
+    def get_pending_transactions(self) -> List[Transaction]:
+        """
+        Get the pending transactions in arrival order.
+
+        Returns:
+            List of transactions waiting to be mined
+        """
+        return list(self.mempool)
+
     def get_transaction_history(self, address: int) -> List[Transaction]:
         """
         Get all transactions involving a specific address.
@@ -320,46 +760,331 @@ class Blockchain:
             address: The address to search for
 
         Returns:
-            List of transactions involving the address
+            List of transactions involving the address, oldest first
+
+        Raises:
+            PrunedDataError: If blocks have been pruned; page through the
+                remaining transactions with query_transaction_history()
         """
-        transactions = []
-        for block in self.chain:
-            for transaction in block.transactions:
-                if (
-                    transaction.from_address == address
-                    or transaction.to_address == address
-                ):
-                    transactions.append(transaction)
-        return transactions
+        if self._pruned_height:
+            raise PrunedDataError(
+                f"Transactions before block {self._pruned_height} have been pruned"
+            )
 
-    def get_chain_stats(self) -> Dict[str, any]:
+        return [
+            self.chain[height].transactions[position]
+            for height, position in self.index.get_locations(address)
+        ]
+
+    def query_transaction_history(
+        self,
+        address: int,
+        direction: str = "all",
+        limit: Optional[int] = None,
+        cursor: Optional[Location] = None,
+        newest_first: bool = True,
+    ) -> Tuple[List[Transaction], Optional[Location]]:
         """
-        Get statistics about the blockchain.
+        Get one page of an address's transactions from the address index.
+
+        Only transactions from get_pruned_height() on are available. Newest
+        first, the page that reaches the pruned blocks still returns a
+        cursor, and continuing from it raises PrunedDataError. Oldest first,
+        a page must start from a cursor at or after get_pruned_height().
+
+        Args:
+            address: The address to search for
+            direction: "all", "sent" or "received"
+            limit: Maximum number of transactions (None for all)
+            cursor: Cursor returned with the previous page
+            newest_first: Return the most recent transactions first
 
         Returns:
-            Dictionary with blockchain statistics
+            Tuple of (transactions, cursor for the next page or None)
+
+        Raises:
+            ValueError: If direction or limit is invalid
+            PrunedDataError: If the page would include pruned blocks
         """
-        total_transactions = sum(len(block.transactions) for block in self.chain)
-        total_value = sum(
-            sum(tx.value for tx in block.transactions) for block in self.chain
+        boundary = (self._pruned_height, 0)
+        if self._pruned_height and (
+            (newest_first and cursor is not None and cursor <= boundary)
+            or (not newest_first and (cursor is None or cursor[0] < boundary[0]))
+        ):
+            raise PrunedDataError(
+                f"Transactions before block {self._pruned_height} have been pruned"
+            )
+
+        page = self.index.query(
+            address,
+            direction=direction,
+            limit=limit,
+            cursor=cursor,
+            newest_first=newest_first,
         )
+        transactions = [
+            self.chain[height].transactions[position]
+            for height, position in page.locations
+        ]
+
+        next_cursor = page.next_cursor
+        if newest_first and next_cursor is None and limit != 0 and self._pruned_height:
+            # Older transactions may exist in the pruned blocks
+            next_cursor = boundary
+        return transactions, next_cursor
+
+    def count_transaction_history(self, address: int, direction: str = "all") -> int:
+        """
+        Count the confirmed transactions involving an address.
+
+        Transactions of pruned blocks are not counted; see
+        get_pruned_height().
+
+        Args:
+            address: The address to count
+            direction: "all", "sent" or "received"
+
+        Returns:
+            Number of matching transactions
+
+        Raises:
+            ValueError: If direction is invalid
+        """
+        return self.index.count(address, direction)
+
+    def get_chain_stats(self, window: int = 10) -> Dict[str, Any]:
+        """
+        Get statistics about the blockchain.
+
+        Totals come from running aggregates, so this costs O(1) regardless
+        of chain length.
+
+        Args:
+            window: Number of recent block intervals for the rate statistics
 
+        Returns:
+            Dictionary with blockchain statistics
+        """
         return {
             "total_blocks": len(self.chain),
-            "total_transactions": total_transactions,
-            "total_value_transferred": total_value,
+            "total_transactions": self.stats.total_transactions,
+            "total_value_transferred": self.stats.total_value,
+            "total_fees": self.stats.total_fees,
             "pending_transactions": len(self.pending_transactions),
+            "mempool": self.mempool.get_metrics(),
             "difficulty": self.difficulty,
             "mining_reward": self.mining_reward,
-            "total_addresses": len(
-                [addr for addr, balance in self.balances.items() if balance > 0]
-            ),
+            "total_addresses": self.stats.funded_addresses,
+            "average_block_interval": self.stats.get_average_block_interval(window),
+            "transactions_per_second": self.stats.get_transactions_per_second(window),
         }
 
+    def get_settings(self) -> Dict[str, Any]:
+        """
+        Get the configuration needed to recreate this blockchain.
+
+        Returns:
+            JSON-serializable dictionary accepted by from_settings()
+        """
+        settings: Dict[str, Any] = {
+            "difficulty": self.difficulty,
+            "mining_reward": self.mining_reward,
+            "block_version": self.block_version,
+        }
+
+        if self.target is not None:
+            settings["target"] = format(self.target, "x")
+
+        if self.mempool.max_transactions is not None:
+            settings["mempool_max_transactions"] = self.mempool.max_transactions
+
+        if self.mempool.max_bytes is not None:
+            settings["mempool_max_bytes"] = self.mempool.max_bytes
+
+        if self.mempool.allow_duplicates:
+            settings["mempool_allow_duplicates"] = True
+
+        if self.mempool_reject_unaffordable:
+            settings["mempool_reject_unaffordable"] = True
+
+        if self.prune_depth is not None:
+            settings["prune_depth"] = self.prune_depth
+
+        return settings
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "Blockchain":
+        """
+        Create an empty blockchain from saved settings.
+
+        Args:
+            settings: Dictionary produced by get_settings()
+
+        Returns:
+            New Blockchain instance containing only a genesis block
+        """
+        target = settings.get("target")
+        return cls(
+            difficulty=settings["difficulty"],
+            mining_reward=settings["mining_reward"],
+            target=int(target, 16) if target is not None else None,
+            # Files written before versioned blocks all use the legacy format
+            block_version=settings.get("block_version", BLOCK_VERSION_LEGACY),
+            mempool_max_transactions=settings.get("mempool_max_transactions"),
+            mempool_max_bytes=settings.get("mempool_max_bytes"),
+            mempool_allow_duplicates=settings.get("mempool_allow_duplicates", False),
+            mempool_reject_unaffordable=settings.get(
+                "mempool_reject_unaffordable", False
+            ),
+            prune_depth=settings.get("prune_depth"),
+        )
+
+    def restore_state(
+        self,
+        blocks: Iterable[Block],
+        balances: Mapping[int, int],
+        pending_transactions: Iterable[Transaction] = (),
+        totals: Optional[ChainTotals] = None,
+    ) -> None:
+        """
+        Replace the chain, balances and mempool with previously saved state.
+
+        The blocks are trusted as already validated and are frozen. A
+        LazyChain is used as the chain as-is, so no stored block is decoded
+        here. The indexes are rebuilt on first use, and so are the
+        statistics unless saved totals are given. If prune_depth is set,
+        blocks below it are pruned.
+
+        Args:
+            blocks: Blocks of the chain, starting with the genesis block
+            balances: Balances after the last block
+            pending_transactions: Transactions waiting to be mined
+            totals: Transaction totals over all the blocks, if saved
+        """
+        if isinstance(blocks, LazyChain):
+            self.chain = blocks
+            self._pruned_height = 0
+        else:
+            self.chain = []
+            for block in blocks:
+                block.freeze()
+                self.chain.append(block)
+
+            # Pruning works oldest first, so pruned blocks form a prefix
+            self._pruned_height = 0
+            while (
+                self._pruned_height < len(self.chain)
+                and self.chain[self._pruned_height].is_pruned()
+            ):
+                self._pruned_height += 1
+
+        self.pending_transactions = list(pending_transactions)
+        self.balances = defaultdict(int, balances)
+
+        self._index = None
+        self._stats = None
+        if totals is not None:
+            self._stats = ChainStats(self.balances)
+            self._stats.resume(self.chain, len(self.chain), totals)
+
+        if self.prune_depth is not None:
+            self.prune(self.prune_depth)
+
+    def get_snapshot(self) -> StateSnapshot:
+        """
+        Capture the balances and chain tip.
+
+        Returns:
+            Snapshot of the state after the last block
+        """
+        return StateSnapshot(
+            height=len(self.chain),
+            tip_hash=self.get_latest_block().calculate_hash(),
+            difficulty=self.difficulty,
+            target=self.target,
+            balances={a: b for a, b in self.balances.items() if b},
+            # Statistics not built yet are left out rather than scanned for
+            totals=self._stats.get_totals() if self._stats is not None else None,
+        )
+
+    def restore_snapshot(
+        self,
+        snapshot: StateSnapshot,
+        blocks: Sequence[Block],
+        pending_transactions: Iterable[Transaction] = (),
+    ) -> None:
+        """
+        Replace the state with a snapshot and the blocks added after it.
+
+        Only the blocks after the snapshot are read and applied, so with a
+        LazyChain the cost depends on how far the chain has moved past the
+        snapshot rather than on its length. The statistics continue from the
+        snapshot's totals when it has them. Pending transactions confirmed
+        by those blocks are dropped.
+
+        Args:
+            snapshot: Snapshot of the state at some height of the chain
+            blocks: Blocks of the whole chain, starting with the genesis block
+            pending_transactions: Transactions waiting to be mined
+
+        Raises:
+            ValueError: If the snapshot does not belong to the blocks
+        """
+        if snapshot.height > len(blocks) or (
+            snapshot.height > 0
+            and blocks[snapshot.height - 1].calculate_hash() != snapshot.tip_hash
+        ):
+            raise ValueError(
+                f"Snapshot at height {snapshot.height} does not match the chain"
+            )
+
+        balances = dict(snapshot.balances)
+        totals = snapshot.totals
+        confirmed: Set[str] = set()
+        for height in range(snapshot.height, len(blocks)):
+            block = blocks[height]
+            self.apply_block(balances, block)
+            confirmed.update(tx.calculate_hash() for tx in block.transactions)
+            if totals is not None:
+                totals = ChainTotals(
+                    totals.transactions + block.get_transaction_count(),
+                    totals.value + block.get_transaction_total(),
+                    totals.fees + block.get_total_fees(),
+                )
+
+        self.difficulty = snapshot.difficulty
+        self.target = snapshot.target
+        self.restore_state(
+            blocks,
+            balances,
+            (tx for tx in pending_transactions if tx.calculate_hash() not in confirmed),
+            totals,
+        )
+
+    def save_state(self) -> None:
+        """
+        Persist balances and pending transactions to the attached storage.
+
+        Blocks are written as they are added; this records the rest of the
+        state, which only needs to be saved at checkpoints.
+
+        Raises:
+            ValueError: If no storage is attached
+        """
+        if self.storage is None:
+            raise ValueError("Blockchain has no storage attached")
+
+        self.storage.write_state(self.get_snapshot())
+        self.storage.write_mempool(self.pending_transactions)
+
     def save_to_file(self, filename: str) -> None:
         """
         Save the blockchain to a file.
 
+        The file is written next to the target and then moved into place,
+        so a chain loaded lazily from the same file keeps reading the
+        previous version.
+
         Args:
             filename: Path to save the blockchain
         """
@@ -367,51 +1092,121 @@ class Blockchain:
             "chain": [block.to_dict() for block in self.chain],
             "pending_transactions": [tx.to_dict() for tx in self.pending_transactions],
             "balances": dict(self.balances),
-            "difficulty": self.difficulty,
-            "mining_reward": self.mining_reward,
+            "totals": asdict(self.stats.get_totals()),
         }
+        data.update(self.get_settings())
 
-        with open(filename, "w") as f:
+        temporary = filename + ".tmp"
+        with open(temporary, "w") as f:
             json.dump(data, f, indent=2)
+        os.replace(temporary, filename)
 
     @classmethod
-    def load_from_file(cls, filename: str) -> "Blockchain":
+    def load_from_file(
+        cls, filename: str, lazy: bool = False, cache_size: int = 128
+    ) -> "Blockchain":
         """
         Load a blockchain from a file.
 
+        With lazy set, the file is scanned with a streaming reader that only
+        records where each block is, and the chain becomes a LazyChain that
+        decodes a block when it is accessed and keeps the most recently used
+        ones in an LRU cache. Balances, pending transactions and the tip are
+        available at once, and peak memory no longer grows with the number
+        of blocks. The file is memory-mapped and must not be modified in
+        place while the chain is in use; save_to_file() replaces it instead.
+        close() releases the map.
+
         Args:
             filename: Path to load the blockchain from
+            lazy: Decode blocks on access instead of all up front
+            cache_size: Decoded blocks kept in memory when lazy
 
         Returns:
             Loaded Blockchain instance
+
+        Raises:
+            ValueError: If the file is malformed
         """
+        if lazy:
+            return cls._load_lazily(filename, cache_size)
+
         with open(filename, "r") as f:
             data = json.load(f)
 
-        # Create new blockchain (will create genesis block)
-        blockchain = cls(
-            difficulty=data["difficulty"], mining_reward=data["mining_reward"]
+        blockchain = cls.from_settings(data)
+        blockchain.restore_state(
+            (Block.from_dict(block_data) for block_data in data["chain"]),
+            # Convert string keys back to integers
+            {int(addr): balance for addr, balance in data["balances"].items()},
+            (
+                Transaction.from_dict(tx_data)
+                for tx_data in data["pending_transactions"]
+            ),
         )
 
-        # Clear the auto-created genesis block
-        blockchain.chain = []
+        return blockchain
 
-        # Load blocks
-        for block_data in data["chain"]:
-            block = Block.from_dict(block_data)
-            blockchain.chain.append(block)
+    @classmethod
+    def _load_lazily(cls, filename: str, cache_size: int) -> "Blockchain":
+        """Load a blockchain whose blocks are decoded from the file on access."""
+        # The storage package builds on this module, so import it late
+        from .storage.jsonstream import JSONStreamReader
+
+        with open(filename, "rb") as binary:
+            contents = mmap.mmap(binary.fileno(), 0, access=mmap.ACCESS_READ)
+
+        starts, ends = array("Q"), array("Q")
+        data: Dict[str, Any] = {}
+
+        def load(height: int) -> Block:
+            start, end = starts[height], ends[height]
+            block = Block.from_dict(json.loads(contents[start:end]))
+            if block.index != height:
+                raise ValueError(f"Block at position {height} has index {block.index}")
+            return block
+
+        try:
+            # Latin-1 maps every byte to one character, so character offsets
+            # found by the reader are byte offsets into the mapped file
+            with open(filename, "r", encoding="latin-1") as text:
+                reader = JSONStreamReader(text)
+                for key, start, end in reader.iter_spans(array_keys=("chain",)):
+                    if key == "chain":
+                        starts.append(start)
+                        ends.append(end)
+                    else:
+                        data[key] = json.loads(contents[start:end])
+
+            # Files with saved totals spare the statistics a scan of every block
+            totals = data.get("totals")
+
+            blockchain = cls.from_settings(data)
+            blockchain.restore_state(
+                LazyChain(len(starts), load, cache_size, release=contents.close),
+                {int(addr): balance for addr, balance in data["balances"].items()},
+                (
+                    Transaction.from_dict(tx_data)
+                    for tx_data in data["pending_transactions"]
+                ),
+                ChainTotals(**totals) if totals is not None else None,
+            )
+        except BaseException:
+            # The chain owns the map once loaded; until then it is closed here
+            contents.close()
+            raise
 
-        # Load pending transactions
-        blockchain.pending_transactions = [
-            Transaction.from_dict(tx_data) for tx_data in data["pending_transactions"]
-        ]
+        return blockchain
 
-        # Load balances (convert string keys back to integers)
-        blockchain.balances = defaultdict(int)
-        for addr_str, balance in data["balances"].items():
-            blockchain.balances[int(addr_str)] = balance
+    def close(self) -> None:
+        """
+        Release the file a lazily loaded chain reads its blocks from.
 
-        return blockchain
+        Does nothing for a chain held in memory. Attached storage is closed
+        separately.
+        """
+        if isinstance(self.chain, LazyChain):
+            self.chain.close()
 
     def __str__(self) -> str:
         """String representation of the blockchain."""
@@ -8,15 +8,28 @@ including creating transactions, mining blocks, and querying blockchain state.
 import json
 import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Union
 
 import click
 
-from .blockchain import Blockchain, InvalidTransactionError, InvalidBlockError
+from .blockchain import (
+    Blockchain,
+    InvalidBlockError,
+    InvalidTransactionError,
+    PrunedDataError,
+)
 from .transaction import Transaction
-from .block import Block
+from .block import BLOCK_VERSION_LEGACY, Block
 from .miner import Miner
-
+from .pow import bits_to_target
+from .storage import (
+    BACKENDS,
+    BlockFile,
+    BlockLog,
+    StorageBackend,
+    convert_json_file,
+    open_storage,
+)
 
 # Global blockchain instance (loaded from file or created new)
 blockchain: Optional[Blockchain] = None
@@ -29,22 +42,55 @@ def load_or_create_blockchain(
     """Load blockchain from file or create new one."""
     global blockchain
 
-    if Path(blockchain_file).exists():
+    storage = open_storage(blockchain_file)
+
+    if storage is not None:
+        click.echo(f"Loading blockchain storage from {blockchain_file}")
+        blockchain = storage.load_blockchain()
+    elif Path(blockchain_file).exists():
         click.echo(f"Loading blockchain from {blockchain_file}")
-        blockchain = Blockchain.load_from_file(blockchain_file)
+        blockchain = Blockchain.load_from_file(blockchain_file, lazy=True)
+        close_on_exit(blockchain)
     else:
         click.echo(f"Creating new blockchain")
         blockchain = Blockchain(
             initial_balances=initial_balances or {0: 1000},
             difficulty=4,
             mining_reward=10,
+            mempool_allow_duplicates=True,
         )
         # Save immediately
-        blockchain.save_to_file(blockchain_file)
+        save_blockchain(blockchain, blockchain_file)
 
     return blockchain
 
 
+def open_chain(blockchain_file: str) -> Union[Blockchain, StorageBackend]:
+    """Open a blockchain for reading, querying its storage when it has one."""
+    storage = open_storage(blockchain_file)
+    if storage is not None:
+        close_on_exit(storage)
+        return storage
+    return load_or_create_blockchain(blockchain_file)
+
+
+def close_on_exit(resource: Union[Blockchain, StorageBackend]) -> None:
+    """Close a lazily loaded blockchain or a store when the command ends."""
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None:
+        ctx.call_on_close(resource.close)
+
+
+def save_blockchain(blockchain: Blockchain, blockchain_file: str) -> None:
+    """Save blockchain state, incrementally if it is backed by a block log."""
+    if blockchain.storage is not None:
+        # New blocks are already in the log; checkpoint the rest
+        blockchain.save_state()
+        blockchain.storage.close()
+    else:
+        blockchain.save_to_file(blockchain_file)
+
+
 def get_miner() -> Miner:
     """Get or create global miner instance."""
     global miner
@@ -75,13 +121,26 @@ def cli(ctx: click.Context, blockchain_file: str, verbose: bool) -> None:
     help='JSON string of initial balances, e.g. {"0": 1000, "1": 500}',
 )
 @click.option("--difficulty", default=4, help="Mining difficulty (1-8)")
+@click.option(
+    "--target-bits",
+    type=int,
+    help="Required leading zero bits; overrides --difficulty for finer control",
+)
 @click.option("--mining-reward", default=10, help="Mining reward amount")
+@click.option(
+    "--storage",
+    type=click.Choice(["json"] + list(BACKENDS)),
+    default="json",
+    help="Single JSON file, block log or block file directory, or SQLite database",
+)
 @click.pass_context
 def init(
     ctx: click.Context,
     initial_balances: Optional[str],
     difficulty: int,
+    target_bits: Optional[int],
     mining_reward: int,
+    storage: str,
 ) -> None:
     """Initialize a new blockchain."""
     blockchain_file = ctx.obj["blockchain_file"]
@@ -101,18 +160,35 @@ def init(
             click.echo(f"Error parsing initial balances: {e}", err=True)
             return
 
+    target = None
+    if target_bits is not None:
+        try:
+            target = bits_to_target(target_bits)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+
     # Create new blockchain
     global blockchain
     blockchain = Blockchain(
         initial_balances=balances_dict,
         difficulty=difficulty,
         mining_reward=mining_reward,
+        target=target,
+        # Sending the same transfer twice queues it twice, as in the original
+        mempool_allow_duplicates=True,
     )
 
     # Save to file
-    blockchain.save_to_file(blockchain_file)
+    if storage in BACKENDS:
+        BACKENDS[storage].create(blockchain_file, blockchain, overwrite=True).close()
+    else:
+        blockchain.save_to_file(blockchain_file)
 
-    click.echo(f"✓ Initialized new blockchain with difficulty {difficulty}")
+    if target_bits is not None:
+        click.echo(f"✓ Initialized new blockchain with {target_bits} target bits")
+    else:
+        click.echo(f"✓ Initialized new blockchain with difficulty {difficulty}")
     click.echo(f"✓ Mining reward set to {mining_reward}")
     if balances_dict:
         click.echo(f"✓ Initial balances: {balances_dict}")
@@ -128,24 +204,33 @@ def status(ctx: click.Context) -> None:
         click.echo("No blockchain found. Use 'init' command to create one.", err=True)
         return
 
-    blockchain = load_or_create_blockchain(blockchain_file)
+    blockchain = open_chain(blockchain_file)
     stats = blockchain.get_chain_stats()
 
     click.echo("=== Blockchain Status ===")
     click.echo(f"Total Blocks: {stats['total_blocks']}")
     click.echo(f"Total Transactions: {stats['total_transactions']}")
     click.echo(f"Total Value Transferred: {stats['total_value_transferred']}")
+    click.echo(f"Total Fees: {stats['total_fees']}")
+    click.echo(f"Average Block Interval: {stats['average_block_interval']:.2f}s")
+    click.echo(f"Transactions per Second: {stats['transactions_per_second']:.2f}")
     click.echo(f"Pending Transactions: {stats['pending_transactions']}")
+    mempool = stats["mempool"]
+    click.echo(
+        f"Mempool: {mempool['bytes']} bytes, min fee {mempool['min_fee']}, "
+        f"{mempool['evictions']} evicted"
+    )
     click.echo(f"Difficulty: {stats['difficulty']}")
     click.echo(f"Mining Reward: {stats['mining_reward']}")
     click.echo(f"Active Addresses: {stats['total_addresses']}")
 
-    if blockchain.pending_transactions:
+    pending = blockchain.get_pending_transactions()
+    if pending:
         click.echo("\n=== Pending Transactions ===")
-        for i, tx in enumerate(blockchain.pending_transactions[:5]):  # Show first 5
+        for i, tx in enumerate(pending[:5]):  # Show first 5
             click.echo(f"{i+1}. {tx}")
-        if len(blockchain.pending_transactions) > 5:
-            click.echo(f"... and {len(blockchain.pending_transactions) - 5} more")
+        if len(pending) > 5:
+            click.echo(f"... and {len(pending) - 5} more")
 
 
 @cli.command()
@@ -154,7 +239,7 @@ def status(ctx: click.Context) -> None:
 def balance(ctx: click.Context, address: int) -> None:
     """Show balance for an address."""
     blockchain_file = ctx.obj["blockchain_file"]
-    blockchain = load_or_create_blockchain(blockchain_file)
+    blockchain = open_chain(blockchain_file)
 
     balance_value = blockchain.get_balance(address)
     click.echo(f"Address {address}: {balance_value}")
@@ -184,7 +269,7 @@ def send(
         )
 
         blockchain.add_transaction(tx)
-        blockchain.save_to_file(blockchain_file)
+        save_blockchain(blockchain, blockchain_file)
 
         click.echo(
             f"✓ Transaction added: {from_address} → {to_address} ({value} + {fee} fee)"
@@ -199,14 +284,24 @@ def send(
 @click.argument("miner_address", type=int)
 @click.option("--block-size", default=10, help="Maximum transactions per block")
 @click.option("--parallel", is_flag=True, help="Use parallel mining")
+@click.option(
+    "--processes", is_flag=True, help="Use parallel mining in worker processes"
+)
 @click.option("--max-nonce", default=1000000, help="Maximum nonce to try")
+@click.option(
+    "--roll-timestamp/--no-roll-timestamp",
+    default=True,
+    help="Roll the block timestamp instead of giving up at --max-nonce",
+)
 @click.pass_context
 def mine(
     ctx: click.Context,
     miner_address: int,
     block_size: int,
     parallel: bool,
+    processes: bool,
     max_nonce: int,
+    roll_timestamp: bool,
 ) -> None:
     """Mine pending transactions into a new block."""
     blockchain_file = ctx.obj["blockchain_file"]
@@ -217,7 +312,7 @@ def mine(
         return
 
     # Create miner
-    miner = Miner(max_nonce=max_nonce)
+    miner = Miner(max_nonce=max_nonce, roll_timestamp=roll_timestamp)
 
     # Progress callback for mining
     def progress_callback(nonce: int, current_hash: str) -> None:
@@ -236,8 +331,18 @@ def mine(
         return
 
     # Find valid nonce
-    mining_method = miner.mine_block_parallel if parallel else miner.mine_block
-    success = mining_method(block)
+    mining_method: Callable[[Block], bool]
+    if processes:
+        mining_method = miner.mine_block_processes
+    elif parallel:
+        mining_method = miner.mine_block_parallel
+    else:
+        mining_method = miner.mine_block
+
+    try:
+        success = mining_method(block)
+    finally:
+        miner.close()
 
     if not success:
         click.echo("Mining failed: could not find valid nonce within limit.", err=True)
@@ -245,7 +350,7 @@ def mine(
 
     # Add block to blockchain
     blockchain.add_block(block)
-    blockchain.save_to_file(blockchain_file)
+    save_blockchain(blockchain, blockchain_file)
 
     mining_time = time.time() - start_time
 
@@ -262,55 +367,114 @@ def mine(
 @cli.command()
 @click.argument("address", type=int)
 @click.option("--limit", default=10, help="Maximum number of transactions to show")
+@click.option(
+    "--direction",
+    type=click.Choice(["all", "sent", "received"]),
+    default="all",
+    help="Only show sent or received transactions",
+)
+@click.option("--cursor", help="Continue after a cursor printed by a previous page")
+@click.option("--oldest-first", is_flag=True, help="Show oldest transactions first")
 @click.pass_context
-def history(ctx: click.Context, address: int, limit: int) -> None:
+def history(
+    ctx: click.Context,
+    address: int,
+    limit: int,
+    direction: str,
+    cursor: Optional[str],
+    oldest_first: bool,
+) -> None:
     """Show transaction history for an address."""
     blockchain_file = ctx.obj["blockchain_file"]
-    blockchain = load_or_create_blockchain(blockchain_file)
+    blockchain = open_chain(blockchain_file)
+
+    start = None
+    if cursor:
+        try:
+            height, position = cursor.split(":")
+            start = (int(height), int(position))
+        except ValueError:
+            click.echo(f"Invalid cursor: {cursor}", err=True)
+            return
 
-    transactions = blockchain.get_transaction_history(address)
+    pruned_height = blockchain.get_pruned_height()
+    if pruned_height:
+        click.echo(f"Note: transactions before block {pruned_height} have been pruned")
+        if start is None and oldest_first:
+            start = (pruned_height, -1)
+
+    try:
+        transactions, next_cursor = blockchain.query_transaction_history(
+            address,
+            direction=direction,
+            limit=limit,
+            cursor=start,
+            newest_first=not oldest_first,
+        )
+    except PrunedDataError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
 
     if not transactions:
         click.echo(f"No transactions found for address {address}")
         return
 
-    click.echo(f"=== Transaction History for Address {address} ===")
+    total = blockchain.count_transaction_history(address, direction)
+    since = f" since block {pruned_height}" if pruned_height else ""
+    click.echo(
+        f"=== Transaction History for Address {address} ({total} total{since}) ==="
+    )
 
-    for i, tx in enumerate(transactions[:limit]):
-        direction = "→" if tx.from_address == address else "←"
+    for i, tx in enumerate(transactions):
+        direction_arrow = "→" if tx.from_address == address else "←"
         other_address = tx.to_address if tx.from_address == address else tx.from_address
         amount = tx.value
         fee_text = f" (fee: {tx.fee})" if tx.fee > 0 else ""
 
-        click.echo(f"{i+1}. {direction} {other_address}: {amount}{fee_text}")
+        click.echo(f"{i+1}. {direction_arrow} {other_address}: {amount}{fee_text}")
         if ctx.obj["verbose"]:
             click.echo(f"    Hash: {tx.calculate_hash()[:16]}...")
 
-    if len(transactions) > limit:
-        click.echo(f"... and {len(transactions) - limit} more transactions")
+    # A cursor at the first unpruned block only leads to pruned transactions
+    if next_cursor is not None and next_cursor > (pruned_height, 0):
+        click.echo(
+            f"... more available with --cursor {next_cursor[0]}:{next_cursor[1]}"
+        )
 
 
 @cli.command()
 @click.option("--block-index", type=int, help="Show specific block by index")
+@click.option("--hash", "block_hash", help="Show specific block by hash")
 @click.option("--latest", is_flag=True, help="Show latest block")
 @click.option("--verbose", "-v", is_flag=True, help="Show detailed information")
 @click.pass_context
 def show_block(
-    ctx: click.Context, block_index: Optional[int], latest: bool, verbose: bool
+    ctx: click.Context,
+    block_index: Optional[int],
+    block_hash: Optional[str],
+    latest: bool,
+    verbose: bool,
 ) -> None:
     """Show block information."""
     blockchain_file = ctx.obj["blockchain_file"]
-    blockchain = load_or_create_blockchain(blockchain_file)
+    blockchain = open_chain(blockchain_file)
 
     if latest:
         block = blockchain.get_latest_block()
     elif block_index is not None:
-        if block_index < 0 or block_index >= len(blockchain.chain):
+        found = blockchain.get_block(block_index)
+        if found is None:
             click.echo(f"Invalid block index: {block_index}", err=True)
             return
-        block = blockchain.chain[block_index]
+        block = found
+    elif block_hash is not None:
+        found = blockchain.get_block_by_hash(block_hash)
+        if found is None:
+            click.echo(f"Block not found: {block_hash}", err=True)
+            return
+        block = found
     else:
-        click.echo("Specify --latest or --block-index", err=True)
+        click.echo("Specify --latest, --block-index or --hash", err=True)
         return
 
     click.echo(f"=== Block {block.index} ===")
@@ -319,15 +483,49 @@ def show_block(
     click.echo(f"Timestamp: {time.ctime(block.timestamp)}")
     click.echo(f"Nonce: {block.nonce}")
     click.echo(f"Difficulty: {block.difficulty}")
-    click.echo(f"Transaction Count: {len(block.transactions)}")
+    click.echo(f"Transaction Count: {block.get_transaction_count()}")
     click.echo(f"Total Value: {block.get_transaction_total()}")
     click.echo(f"Total Fees: {block.get_total_fees()}")
 
     if verbose or ctx.obj["verbose"]:
         click.echo(f"Merkle Root: {block.get_merkle_root()}")
-        click.echo("\nTransactions:")
-        for i, tx in enumerate(block.transactions):
-            click.echo(f"  {i+1}. {tx}")
+        if block.is_pruned():
+            click.echo("\nTransactions: pruned")
+        else:
+            click.echo("\nTransactions:")
+            for i, tx in enumerate(block.transactions):
+                click.echo(f"  {i+1}. {tx}")
+
+
+@cli.command()
+@click.argument("tx_hash")
+@click.pass_context
+def show_tx(ctx: click.Context, tx_hash: str) -> None:
+    """Show a transaction by hash."""
+    blockchain_file = ctx.obj["blockchain_file"]
+    blockchain = open_chain(blockchain_file)
+
+    result = blockchain.get_transaction_by_hash(tx_hash)
+
+    if result is not None:
+        tx, (height, position) = result
+        status_text = f"confirmed in block {height} (position {position})"
+    else:
+        pending_tx = blockchain.get_pending_transaction(tx_hash)
+        if pending_tx is None:
+            click.echo(f"Transaction not found: {tx_hash}", err=True)
+            return
+        tx = pending_tx
+        status_text = "pending"
+
+    click.echo(f"=== Transaction {tx.calculate_hash()} ===")
+    click.echo(f"Status: {status_text}")
+    click.echo(f"From: {tx.from_address}")
+    click.echo(f"To: {tx.to_address}")
+    click.echo(f"Value: {tx.value}")
+    click.echo(f"Fee: {tx.fee}")
+    if tx.timestamp is not None:
+        click.echo(f"Timestamp: {time.ctime(tx.timestamp)}")
 
 
 @cli.command()
@@ -400,6 +598,33 @@ def export(ctx: click.Context, output_file: str, output_format: str) -> None:
                     )
 
         click.echo(f"✓ Transactions exported to {output_file}")
+        if blockchain.get_pruned_height():
+            click.echo(
+                f"Note: transactions before block {blockchain.get_pruned_height()} "
+                "have been pruned and were not exported"
+            )
+
+
+@cli.command()
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.argument("destination", type=click.Path(file_okay=False))
+@click.option("--overwrite", is_flag=True, help="Replace an existing store")
+@click.option(
+    "--storage",
+    type=click.Choice(["log", "blockfile"]),
+    default="log",
+    help="Block log of JSON lines or memory-mapped binary block file",
+)
+def convert(source: str, destination: str, overwrite: bool, storage: str) -> None:
+    """Convert a blockchain JSON file into a block store directory."""
+    backend = BlockFile if storage == "blockfile" else BlockLog
+    try:
+        with convert_json_file(
+            source, destination, overwrite=overwrite, backend=backend
+        ) as store:
+            click.echo(f"✓ Converted {store.get_height()} blocks into {destination}")
+    except (FileExistsError, ValueError) as e:
+        click.echo(f"Conversion failed: {e}", err=True)
 
 
 @cli.command()
@@ -423,7 +648,11 @@ def legacy(
 
         # Create temporary blockchain
         temp_blockchain = Blockchain(
-            initial_balances=initial_balances, difficulty=4, mining_reward=0
+            initial_balances=initial_balances,
+            difficulty=4,
+            mining_reward=0,
+            block_version=BLOCK_VERSION_LEGACY,
+            mempool_allow_duplicates=True,
         )
 
         # Add transactions
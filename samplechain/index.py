@@ -0,0 +1,263 @@
+"""
+Index module for the SampleChain blockchain.
+
+This module contains the ChainIndex class which maps addresses to the
+positions of their transactions in the chain, and block and transaction
+hashes to their positions, so lookups do not have to scan every block.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .block import Block
+
+# Position of a transaction in the chain: (block height, index in block)
+Location = Tuple[int, int]
+
+DIRECTIONS = ("all", "sent", "received")
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """
+    One page of an address's transaction history.
+
+    Attributes:
+        locations: Positions of the transactions on this page
+        next_cursor: Cursor for the following page, or None if this is the
+            last page
+    """
+
+    locations: List[Location]
+    next_cursor: Optional[Location]
+
+
+class ChainIndex:
+    """
+    Inverted index from addresses to transaction positions in the chain.
+
+    Each address keeps its positions in chain order, once for all of its
+    transactions and once per direction. Indexing a block costs
+    O(transactions in the block), and a history query costs
+    O(log n + results) by binary-searching the cursor.
+
+    Block hashes map to heights and transaction hashes to positions for
+    O(1) lookup. Identical transactions share a hash (mining rewards to the
+    same address, for example); such a hash maps to its first occurrence.
+    """
+
+    def __init__(self, blocks: Iterable[Block] = ()) -> None:
+        """
+        Initialize an index.
+
+        Args:
+            blocks: Blocks to index, in chain order
+        """
+        self._history: Dict[int, List[Location]] = {}
+        self._sent: Dict[int, List[Location]] = {}
+        self._received: Dict[int, List[Location]] = {}
+        self._block_heights: Dict[str, int] = {}
+        self._tx_locations: Dict[str, Location] = {}
+
+        for block in blocks:
+            self.add_block(block)
+
+    def add_block(self, block: Block) -> None:
+        """
+        Index the transactions of a block appended to the chain.
+
+        Args:
+            block: The block, whose index is its height
+        """
+        self._block_heights[block.calculate_hash()] = block.index
+
+        for position, transaction in enumerate(block.transactions):
+            location = (block.index, position)
+            self._tx_locations.setdefault(transaction.calculate_hash(), location)
+            sender = transaction.from_address
+            recipient = transaction.to_address
+
+            self._sent.setdefault(sender, []).append(location)
+            self._received.setdefault(recipient, []).append(location)
+            self._history.setdefault(sender, []).append(location)
+            if recipient != sender:
+                self._history.setdefault(recipient, []).append(location)
+
+    def remove_transactions(self, block: Block) -> None:
+        """
+        Forget the transactions of a block whose body is being pruned.
+
+        Blocks must be removed oldest first, so their positions are at the
+        front of every position list. The block hash stays indexed, since
+        pruned blocks keep their headers.
+
+        Args:
+            block: The block, with its transactions still attached
+        """
+        end = (block.index + 1, 0)
+
+        for transaction in block.transactions:
+            tx_hash = transaction.calculate_hash()
+            location = self._tx_locations.get(tx_hash)
+            if location is not None and location[0] == block.index:
+                del self._tx_locations[tx_hash]
+
+            sender = transaction.from_address
+            recipient = transaction.to_address
+            self._drop_before(self._sent, sender, end)
+            self._drop_before(self._received, recipient, end)
+            self._drop_before(self._history, sender, end)
+            self._drop_before(self._history, recipient, end)
+
+    @staticmethod
+    def _drop_before(
+        index: Dict[int, List[Location]], address: int, end: Location
+    ) -> None:
+        """Remove an address's positions before end from one position list."""
+        locations = index.get(address)
+        if not locations:
+            return
+
+        count = bisect_left(locations, end)
+        if count == len(locations):
+            del index[address]
+        elif count:
+            del locations[:count]
+
+    def rebuild(self, blocks: Iterable[Block]) -> None:
+        """
+        Discard the index and rebuild it from a chain.
+
+        Args:
+            blocks: Blocks to index, in chain order
+        """
+        self._history.clear()
+        self._sent.clear()
+        self._received.clear()
+        self._block_heights.clear()
+        self._tx_locations.clear()
+
+        for block in blocks:
+            self.add_block(block)
+
+    def get_block_height(self, block_hash: str) -> Optional[int]:
+        """
+        Look up the height of a block by its hash.
+
+        Args:
+            block_hash: Hexadecimal block hash
+
+        Returns:
+            The block height, or None if no such block is indexed
+        """
+        return self._block_heights.get(block_hash.lower())
+
+    def get_transaction_location(self, tx_hash: str) -> Optional[Location]:
+        """
+        Look up where a transaction was confirmed.
+
+        Args:
+            tx_hash: Hexadecimal transaction hash
+
+        Returns:
+            (height, position) of the transaction, or None if not indexed
+        """
+        return self._tx_locations.get(tx_hash.lower())
+
+    def get_locations(self, address: int, direction: str = "all") -> List[Location]:
+        """
+        Get every position of an address's transactions, oldest first.
+
+        Args:
+            address: The address to look up
+            direction: "all", "sent" or "received"
+
+        Returns:
+            Transaction positions in chain order
+        """
+        return list(self._get_index(address, direction))
+
+    def count(self, address: int, direction: str = "all") -> int:
+        """
+        Count an address's transactions.
+
+        Args:
+            address: The address to look up
+            direction: "all", "sent" or "received"
+
+        Returns:
+            Number of matching transactions
+        """
+        return len(self._get_index(address, direction))
+
+    def query(
+        self,
+        address: int,
+        direction: str = "all",
+        limit: Optional[int] = None,
+        cursor: Optional[Location] = None,
+        newest_first: bool = True,
+    ) -> HistoryPage:
+        """
+        Get one page of an address's transaction positions.
+
+        Args:
+            address: The address to look up
+            direction: "all", "sent" or "received"
+            limit: Maximum number of positions to return (None for all)
+            cursor: next_cursor of the previous page; the page starts after it
+            newest_first: Return the most recent transactions first
+
+        Returns:
+            The requested page
+
+        Raises:
+            ValueError: If direction or limit is invalid
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must be non-negative")
+
+        locations = self._get_index(address, direction)
+
+        if newest_first:
+            # Positions strictly before the cursor, walked backwards
+            end = len(locations)
+            if cursor is not None:
+                end = bisect_left(locations, cursor)
+
+            start = 0 if limit is None else max(0, end - limit)
+            page = locations[start:end][::-1]
+            has_more = start > 0
+        else:
+            # Positions strictly after the cursor
+            start = 0
+            if cursor is not None:
+                start = bisect_right(locations, cursor)
+
+            end = len(locations)
+            if limit is not None:
+                end = min(end, start + limit)
+
+            page = locations[start:end]
+            has_more = end < len(locations)
+
+        next_cursor = page[-1] if page and has_more else None
+        return HistoryPage(locations=page, next_cursor=next_cursor)
+
+    def _get_index(self, address: int, direction: str) -> List[Location]:
+        """Get the position list of an address for a direction."""
+        if direction == "all":
+            return self._history.get(address, [])
+
+        if direction == "sent":
+            return self._sent.get(address, [])
+
+        if direction == "received":
+            return self._received.get(address, [])
+
+        raise ValueError(f"Direction must be one of {', '.join(DIRECTIONS)}")
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return f"ChainIndex(addresses={len(self._history)})"
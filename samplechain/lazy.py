@@ -0,0 +1,182 @@
+"""
+Lazy chain module for the SampleChain blockchain.
+
+This module contains the LazyChain class, a list-like view of stored
+blocks that decodes each block only when it is accessed.
+"""
+
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    MutableSequence,
+    Optional,
+    Union,
+    overload,
+)
+
+from .block import Block
+
+
+class LazyChain(MutableSequence[Block]):
+    """
+    Sequence of blocks decoded on demand from storage.
+
+    The first length blocks are produced by a loader function when they are
+    accessed, and the most recently used ones are kept in an LRU cache, so
+    resident memory depends on the blocks touched rather than the length of
+    the chain. Blocks appended afterwards are held in memory.
+
+    Blocks are immutable once in a chain, so only append() and prune() are
+    supported; other mutations raise TypeError.
+
+    A chain can own what its loader reads from, such as a memory-mapped
+    file, and releases it in close() or when used as a context manager.
+
+    Attributes:
+        cache_size: Maximum number of decoded stored blocks kept in memory
+    """
+
+    def __init__(
+        self,
+        length: int,
+        load: Callable[[int], Block],
+        cache_size: int = 128,
+        release: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Initialize a lazy chain.
+
+        Args:
+            length: Number of stored blocks
+            load: Function decoding the block at a height
+            cache_size: Maximum number of decoded stored blocks kept in memory
+            release: Function freeing what load reads from, called once by
+                close()
+        """
+        if cache_size < 0:
+            raise ValueError("Cache size must be non-negative")
+
+        self.cache_size = cache_size
+        self._stored = length
+        self._load = load
+        self._cache: "OrderedDict[int, Block]" = OrderedDict()
+        self._appended: List[Block] = []
+        self._release = release
+
+    def __len__(self) -> int:
+        """Number of blocks, stored and appended."""
+        return self._stored + len(self._appended)
+
+    @overload
+    def __getitem__(self, index: int) -> Block: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Block]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Block, List[Block]]:
+        """Get a block by height, or a list of blocks for a slice."""
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Chain index out of range")
+
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[Block]:
+        """Iterate over the blocks in chain order."""
+        for height in range(len(self)):
+            yield self._get(height)
+
+    def append(self, block: Block) -> None:
+        """
+        Add a block after the last one.
+
+        Args:
+            block: The block to add
+        """
+        self._appended.append(block)
+
+    def insert(self, index: int, block: Block) -> None:
+        """Only appending is supported; see append()."""
+        if index < len(self):
+            raise TypeError("Blocks can only be appended to a chain")
+        self.append(block)
+
+    def __setitem__(self, index: object, value: object) -> None:
+        """Blocks in a chain cannot be replaced."""
+        raise TypeError("Blocks in a chain cannot be replaced")
+
+    def __delitem__(self, index: object) -> None:
+        """Blocks in a chain cannot be removed."""
+        raise TypeError("Blocks in a chain cannot be removed")
+
+    def prune(self, height: int) -> None:
+        """
+        Replace an appended block with its pruned form.
+
+        Stored blocks are only held while cached and are left as they are.
+
+        Args:
+            height: Height of the block
+        """
+        if height >= self._stored:
+            position = height - self._stored
+            self._appended[position] = self._appended[position].prune()
+
+    def close(self) -> None:
+        """
+        Drop the cache and release the source of the stored blocks.
+
+        Stored blocks cannot be read afterwards; appended ones can.
+        """
+        self._cache.clear()
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __enter__(self) -> "LazyChain":
+        """Use the chain as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the chain."""
+        self.close()
+
+    def cache_info(self) -> int:
+        """
+        Get the number of decoded stored blocks currently cached.
+
+        Returns:
+            Number of cached blocks
+        """
+        return len(self._cache)
+
+    def _get(self, height: int) -> Block:
+        """Get the block at a valid height, decoding it if necessary."""
+        if height >= self._stored:
+            return self._appended[height - self._stored]
+
+        block = self._cache.get(height)
+        if block is not None:
+            self._cache.move_to_end(height)
+            return block
+
+        block = self._load(height)
+        block.freeze()
+
+        if self.cache_size > 0:
+            self._cache[height] = block
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return block
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return f"LazyChain(blocks={len(self)}, cached={len(self._cache)})"
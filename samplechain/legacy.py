@@ -8,6 +8,7 @@ while leveraging the improved architecture.
 
 from typing import List, Tuple, Union
 
+from .block import BLOCK_VERSION_LEGACY
 from .blockchain import Blockchain, InvalidTransactionError
 from .transaction import Transaction
 from .miner import Miner
@@ -38,6 +39,8 @@ def getLatestBlock(
         initial_balances=initial_balances,
         difficulty=4,  # Original used 4 leading zeros
         mining_reward=0,  # Original didn't have mining rewards
+        block_version=BLOCK_VERSION_LEGACY,  # Original string hash format
+        mempool_allow_duplicates=True,  # Original queued repeated transfers
     )
 
     # Create miner
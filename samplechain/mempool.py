@@ -0,0 +1,571 @@
+"""
+Mempool module for the SampleChain blockchain.
+
+This module contains the Mempool class which holds pending transactions
+indexed by their hash, so membership checks and removals do not have to
+scan the whole pool, together with a fee-priority index for block assembly
+and optional capacity limits with fee-based eviction.
+"""
+
+import heapq
+from itertools import count, islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
+
+from .transaction import Transaction
+
+
+class MempoolFullError(Exception):
+    """Raised when a transaction's fee is too low to enter a full mempool."""
+
+    pass
+
+
+class Mempool:
+    """
+    Pending transactions indexed by transaction hash.
+
+    Transactions are kept in arrival order. Lookups, membership checks and
+    removals are O(1), and a transaction whose hash is already pending is
+    rejected unless allow_duplicates is set. In that mode identical
+    transactions are separate entries, as in a plain list: lookups by hash
+    return the earliest and each removal drops the earliest. The class also
+    supports the list operations used on the old
+    ``Blockchain.pending_transactions`` list (len, iteration, indexing,
+    append and remove).
+
+    A max-heap on fee backs iter_by_fee(), which reads it in place.
+    Removed transactions leave stale heap entries behind that are skipped
+    lazily and compacted away once they outnumber the live ones.
+
+    The pool also keeps the total pending debit (value plus fee) of each
+    sender and the total pending credit of each recipient, so admission can
+    check a new transaction against what the sender has already committed
+    to spend, and is due to receive, in O(1).
+
+    The pool can be bounded by transaction count and by estimated size in
+    bytes. When a new transaction does not fit, the lowest-fee transactions
+    are evicted through a min-heap in O(log n) each, and every eviction
+    raises a minimum fee for admission. The floor is lifted once the pool
+    drains below half of its capacity.
+
+    Attributes:
+        max_transactions: Maximum number of pending transactions (None for
+            no limit)
+        max_bytes: Maximum estimated size of the pool in bytes (None for no
+            limit)
+        allow_duplicates: Whether identical transactions can be pending
+            more than once
+        evictions: Number of transactions evicted to make room
+    """
+
+    def __init__(
+        self,
+        transactions: Iterable[Transaction] = (),
+        max_transactions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        allow_duplicates: bool = False,
+    ) -> None:
+        """
+        Initialize a mempool.
+
+        Args:
+            transactions: Initial transactions; duplicates (unless allowed)
+                and transactions that do not fit are skipped
+            max_transactions: Maximum number of pending transactions
+            max_bytes: Maximum estimated size of the pool in bytes
+            allow_duplicates: Keep identical transactions as separate entries
+
+        Raises:
+            ValueError: If a capacity is not positive
+        """
+        if max_transactions is not None and max_transactions <= 0:
+            raise ValueError("Mempool max_transactions must be positive")
+
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("Mempool max_bytes must be positive")
+
+        self.max_transactions = max_transactions
+        self.max_bytes = max_bytes
+        self.allow_duplicates = allow_duplicates
+        self.evictions = 0
+
+        # Entries by key: the transaction hash, or for further copies of a
+        # pending transaction the hash and the copy's sequence number
+        self._transactions: Dict[str, Transaction] = {}
+        self._copies: Dict[str, List[str]] = {}
+        self._bytes = 0
+        self._fee_floor = 0
+
+        # Heap of (-fee, sequence, key); the sequence breaks fee ties in
+        # arrival order and identifies the live entry for each key
+        self._fee_heap: List[Tuple[int, int, str]] = []
+        self._sequence: Dict[str, int] = {}
+        self._counter = count()
+
+        # Heap of (fee, -sequence, key) for eviction: lowest fee first,
+        # newest first among equal fees
+        self._eviction_heap: List[Tuple[int, int, str]] = []
+
+        # Sum of value + fee over each sender's pending transactions, sum of
+        # value over each recipient's, and the keys of each sender's
+        # transactions in arrival order
+        self._debits: Dict[int, int] = {}
+        self._credits: Dict[int, int] = {}
+        self._by_sender: Dict[int, Dict[str, None]] = {}
+
+        for transaction in transactions:
+            try:
+                self.add(transaction)
+            except MempoolFullError:
+                pass
+
+    @staticmethod
+    def estimate_size(transaction: Transaction) -> int:
+        """
+        Estimate the memory footprint of a transaction in the pool.
+
+        Args:
+            transaction: The transaction to measure
+
+        Returns:
+            Size of its canonical encoding in bytes
+        """
+        return len(transaction.get_canonical_encoding())
+
+    def get_min_fee(self) -> int:
+        """
+        Get the minimum fee a new transaction needs to be admitted.
+
+        Returns:
+            The current fee floor (0 while the pool is not under pressure)
+        """
+        return self._fee_floor
+
+    def add(self, transaction: Transaction) -> bool:
+        """
+        Add a transaction to the pool.
+
+        If the pool is at capacity, lower-fee transactions are evicted to
+        make room.
+
+        Args:
+            transaction: The transaction to add
+
+        Returns:
+            True if added, False if the transaction was already pending and
+            duplicates are not allowed
+
+        Raises:
+            MempoolFullError: If the fee is below the current floor, or the
+                transaction cannot fit without evicting an equal or higher fee
+        """
+        tx_hash = transaction.calculate_hash()
+
+        if tx_hash in self._transactions and not self.allow_duplicates:
+            return False
+
+        if transaction.fee < self._fee_floor:
+            raise MempoolFullError(
+                f"Fee {transaction.fee} is below the mempool minimum of "
+                f"{self._fee_floor}"
+            )
+
+        size = self.estimate_size(transaction)
+        self._make_room(transaction, size)
+
+        sequence = next(self._counter)
+        key = tx_hash
+        if key in self._transactions:
+            key = f"{tx_hash}:{sequence}"
+        if self.allow_duplicates:
+            self._copies.setdefault(tx_hash, []).append(key)
+
+        self._transactions[key] = transaction
+        self._sequence[key] = sequence
+        self._bytes += size
+        heapq.heappush(self._fee_heap, (-transaction.fee, sequence, key))
+        heapq.heappush(self._eviction_heap, (transaction.fee, -sequence, key))
+
+        sender = transaction.from_address
+        self._debits[sender] = self._debits.get(sender, 0) + (
+            transaction.value + transaction.fee
+        )
+        self._by_sender.setdefault(sender, {})[key] = None
+
+        recipient = transaction.to_address
+        self._credits[recipient] = self._credits.get(recipient, 0) + transaction.value
+        return True
+
+    def _find(self, tx_hash: str) -> Optional[str]:
+        """Key of the earliest pending entry with a hash, if any."""
+        if self.allow_duplicates:
+            copies = self._copies.get(tx_hash)
+            return copies[0] if copies else None
+
+        return tx_hash if tx_hash in self._transactions else None
+
+    def append(self, transaction: Transaction) -> None:
+        """
+        Add a transaction, ignoring disallowed duplicates (list compatibility).
+
+        Args:
+            transaction: The transaction to add
+        """
+        self.add(transaction)
+
+    def get(self, tx_hash: str) -> Optional[Transaction]:
+        """
+        Look up a pending transaction by hash.
+
+        Args:
+            tx_hash: Hexadecimal transaction hash
+
+        Returns:
+            The pending transaction, or None if not found
+        """
+        key = self._find(tx_hash)
+        return self._transactions[key] if key is not None else None
+
+    def discard(self, transaction: Transaction) -> bool:
+        """
+        Remove a transaction if it is pending.
+
+        Args:
+            transaction: The transaction to remove; of identical pending
+                transactions, the earliest is removed
+
+        Returns:
+            True if the transaction was removed
+        """
+        key = self._find(transaction.calculate_hash())
+        if key is None:
+            return False
+
+        self._remove(key)
+
+        # Lift the fee floor once the pressure that raised it is gone
+        if self._fee_floor and self._usage() < 0.5:
+            self._fee_floor = 0
+
+        self._maybe_compact()
+        return True
+
+    def _remove(self, key: str) -> Transaction:
+        """Remove an entry by key and update every index but the heaps."""
+        removed = self._transactions.pop(key)
+        del self._sequence[key]
+        self._bytes -= self.estimate_size(removed)
+
+        if self.allow_duplicates:
+            tx_hash = removed.calculate_hash()
+            copies = self._copies[tx_hash]
+            copies.remove(key)
+            if not copies:
+                del self._copies[tx_hash]
+
+        sender = removed.from_address
+        remaining = self._debits[sender] - (removed.value + removed.fee)
+        if remaining:
+            self._debits[sender] = remaining
+        else:
+            del self._debits[sender]
+
+        sender_keys = self._by_sender[sender]
+        del sender_keys[key]
+        if not sender_keys:
+            del self._by_sender[sender]
+
+        recipient = removed.to_address
+        remaining = self._credits[recipient] - removed.value
+        if remaining:
+            self._credits[recipient] = remaining
+        else:
+            del self._credits[recipient]
+
+        return removed
+
+    def _is_live(self, sequence: int, key: str) -> bool:
+        """Check whether a heap entry belongs to a pending transaction."""
+        return self._sequence.get(key) == sequence
+
+    def _usage(self) -> float:
+        """Fraction of the tightest capacity limit currently in use."""
+        usage = 0.0
+
+        if self.max_transactions is not None:
+            usage = len(self._transactions) / self.max_transactions
+
+        if self.max_bytes is not None:
+            usage = max(usage, self._bytes / self.max_bytes)
+
+        return usage
+
+    def _fits(self, count: int, size: int) -> bool:
+        """Check whether the pool could hold count more transactions of size bytes."""
+        if (
+            self.max_transactions is not None
+            and len(self._transactions) + count > self.max_transactions
+        ):
+            return False
+
+        return self.max_bytes is None or self._bytes + size <= self.max_bytes
+
+    def _make_room(self, transaction: Transaction, size: int) -> None:
+        """
+        Evict lowest-fee transactions until a new transaction fits.
+
+        Raises:
+            MempoolFullError: If making room would evict a transaction whose
+                fee is not lower than the new one's
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise MempoolFullError("Transaction is larger than the mempool")
+
+        victims: List[Tuple[int, int, str]] = []
+        freed_count = 0
+        freed_bytes = 0
+
+        while not self._fits(1 - freed_count, size - freed_bytes):
+            entry = heapq.heappop(self._eviction_heap)
+            if not self._is_live(-entry[1], entry[2]):
+                continue
+
+            victims.append(entry)
+            if entry[0] >= transaction.fee:
+                for victim in victims:
+                    heapq.heappush(self._eviction_heap, victim)
+                raise MempoolFullError(
+                    f"Mempool is full and fee {transaction.fee} does not "
+                    f"exceed the lowest pending fee of {entry[0]}"
+                )
+
+            freed_count += 1
+            freed_bytes += self.estimate_size(self._transactions[entry[2]])
+
+        for fee, _, key in victims:
+            self._remove(key)
+            self.evictions += 1
+            self._fee_floor = max(self._fee_floor, fee + 1)
+
+    def remove(self, transaction: Transaction) -> None:
+        """
+        Remove a pending transaction.
+
+        Args:
+            transaction: The transaction to remove
+
+        Raises:
+            ValueError: If the transaction is not pending
+        """
+        if not self.discard(transaction):
+            raise ValueError(f"{transaction} is not pending")
+
+    def clear(self) -> None:
+        """Remove all pending transactions."""
+        self._transactions.clear()
+        self._copies.clear()
+        self._sequence.clear()
+        self._fee_heap.clear()
+        self._eviction_heap.clear()
+        self._debits.clear()
+        self._credits.clear()
+        self._by_sender.clear()
+        self._bytes = 0
+        self._fee_floor = 0
+
+    def get_pending_debit(self, address: int) -> int:
+        """
+        Get the total an address has committed to spend in the pool.
+
+        Args:
+            address: The sending address
+
+        Returns:
+            Sum of value plus fee over the address's pending transactions
+        """
+        return self._debits.get(address, 0)
+
+    def get_pending_credit(self, address: int) -> int:
+        """
+        Get the total an address is due to receive from the pool.
+
+        Args:
+            address: The receiving address
+
+        Returns:
+            Sum of value over the pending transactions paying the address
+        """
+        return self._credits.get(address, 0)
+
+    def get_sender_transactions(self, address: int) -> List[Transaction]:
+        """
+        Get the pending transactions sent by an address.
+
+        Args:
+            address: The sending address
+
+        Returns:
+            The address's pending transactions in arrival order
+        """
+        return [self._transactions[key] for key in self._by_sender.get(address, ())]
+
+    def evict_unaffordable(self, address: int, balance: int) -> List[Transaction]:
+        """
+        Drop a sender's transactions that its balance can no longer cover.
+
+        If the sender's pending debit fits in the balance nothing changes.
+        Otherwise the highest-fee transactions that fit are kept and the
+        rest are removed. Cost is O(1) for a solvent sender and otherwise
+        proportional to that sender's pending transactions.
+
+        Args:
+            address: The sending address
+            balance: The amount the address can spend
+
+        Returns:
+            The evicted transactions
+        """
+        if self._debits.get(address, 0) <= balance:
+            return []
+
+        candidates = sorted(
+            self.get_sender_transactions(address),
+            key=lambda tx: -tx.fee,  # Stable, so equal fees keep arrival order
+        )
+
+        evicted = []
+        remaining = balance
+        for transaction in candidates:
+            cost = transaction.value + transaction.fee
+            if cost <= remaining:
+                remaining -= cost
+            else:
+                evicted.append(transaction)
+
+        for transaction in evicted:
+            self.discard(transaction)
+
+        return evicted
+
+    def iter_by_fee(self) -> Iterator[Transaction]:
+        """
+        Iterate over pending transactions from highest to lowest fee.
+
+        Transactions with equal fees come out in arrival order. The fee heap
+        is walked without being changed: a small frontier heap holds the
+        entries whose parents have been visited, so taking the first k
+        transactions costs O(k log k). The mempool must not be modified
+        during iteration.
+
+        Yields:
+            Pending transactions in fee-priority order
+        """
+        heap = self._fee_heap
+        frontier = [(heap[0], 0)] if heap else []
+
+        while frontier:
+            entry, position = heapq.heappop(frontier)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+            # Skip stale entries of removed transactions
+            if self._is_live(entry[1], entry[2]):
+                yield self._transactions[entry[2]]
+
+    def _maybe_compact(self) -> None:
+        """Rebuild the heaps once stale entries outnumber live ones."""
+        if len(self._fee_heap) > 2 * len(self._transactions) + 64:
+            self._fee_heap = [
+                entry for entry in self._fee_heap if self._is_live(entry[1], entry[2])
+            ]
+            heapq.heapify(self._fee_heap)
+
+        if len(self._eviction_heap) > 2 * len(self._transactions) + 64:
+            self._eviction_heap = [
+                entry
+                for entry in self._eviction_heap
+                if self._is_live(-entry[1], entry[2])
+            ]
+            heapq.heapify(self._eviction_heap)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get mempool size and pressure metrics.
+
+        Returns:
+            Dictionary with the transaction count, estimated bytes, capacity
+            limits, eviction count and current minimum fee
+        """
+        return {
+            "transactions": len(self._transactions),
+            "bytes": self._bytes,
+            "max_transactions": self.max_transactions,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "min_fee": self._fee_floor,
+        }
+
+    def __contains__(self, item: object) -> bool:
+        """Check membership by transaction or by hexadecimal hash."""
+        if isinstance(item, Transaction):
+            return self._find(item.calculate_hash()) is not None
+
+        if isinstance(item, str):
+            return self._find(item) is not None
+
+        return False
+
+    def __len__(self) -> int:
+        """Number of pending transactions."""
+        return len(self._transactions)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Iterate over pending transactions in arrival order."""
+        return iter(self._transactions.values())
+
+    @overload
+    def __getitem__(self, index: int) -> Transaction: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Transaction]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Transaction, List[Transaction]]:
+        """
+        Get transactions by arrival position (O(n), for compatibility).
+
+        Args:
+            index: Position or slice in arrival order
+
+        Returns:
+            The transaction, or a list of transactions for a slice
+        """
+        if isinstance(index, slice):
+            return list(self._transactions.values())[index]
+
+        if index < 0:
+            index += len(self._transactions)
+
+        if not 0 <= index < len(self._transactions):
+            raise IndexError("mempool index out of range")
+
+        return next(islice(self._transactions.values(), index, None))
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return (
+            f"Mempool(transactions={len(self._transactions)}, "
+            f"bytes={self._bytes}, min_fee={self._fee_floor})"
+        )
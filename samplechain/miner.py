@@ -5,13 +5,24 @@ This module contains the Miner class which handles proof-of-work mining,
 finding valid nonces for blocks, and managing mining operations.
 """
 
+import queue
+import threading
 import time
 import multiprocessing as mp
-from typing import Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 from .block import Block
 from .blockchain import Blockchain
+from .pow import MAX_TARGET, HashTemplate, difficulty_to_target
+
+# Nonces between progress callback invocations
+PROGRESS_INTERVAL = 1000
+
+# Nonces handed to a parallel worker per request; workers check the shared
+# stop signal between batches
+NONCE_BATCH_SIZE = 1024
 
 
 class MiningError(Exception):
@@ -20,34 +31,421 @@ class MiningError(Exception):
     pass
 
 
+class CancelToken:
+    """
+    Cooperative cancellation signal for mining operations.
+
+    Calling cancel() sets every stop event currently linked to the token, so
+    worker threads and processes notice it at their next check. Each mining
+    call clears any request left over from while it was idle, so a cancel
+    only aborts the call in progress.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a token that is not cancelled."""
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._linked_events: List[Any] = []
+
+    def cancel(self) -> None:
+        """Request cancellation of the mining call in progress."""
+        with self._lock:
+            self._cancelled = True
+            events = list(self._linked_events)
+
+        for event in events:
+            event.set()
+
+    def is_cancelled(self) -> bool:
+        """
+        Check if cancellation has been requested.
+
+        Returns:
+            True if cancel() was called since the token was last consumed
+        """
+        return self._cancelled
+
+    def consume(self) -> bool:
+        """
+        Clear the cancellation request.
+
+        Returns:
+            True if the token was cancelled
+        """
+        with self._lock:
+            cancelled = self._cancelled
+            self._cancelled = False
+        return cancelled
+
+    @contextmanager
+    def linked(self, event: Any) -> Iterator[None]:
+        """
+        Link a stop event to this token for the duration of a block.
+
+        Args:
+            event: threading or multiprocessing Event set on cancellation
+        """
+        with self._lock:
+            self._linked_events.append(event)
+            cancelled = self._cancelled
+
+        if cancelled:
+            event.set()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._linked_events.remove(event)
+
+
+class NonceScheduler:
+    """
+    Hands out small nonce batches to parallel workers on demand.
+
+    Workers claim the next unsearched batch whenever they finish one, so no
+    worker idles in a useless region while another one is behind. Once a
+    valid nonce is reported, only batches below it are still handed out, so
+    the result is always the lowest valid nonce in the range, exactly as
+    serial mining would find it.
+
+    The scheduler works across threads with its default storage, or across
+    processes when created with shared().
+    """
+
+    _NEXT, _END, _BEST = 0, 1, 2
+
+    def __init__(
+        self,
+        batch_size: int = NONCE_BATCH_SIZE,
+        lock: Optional[Any] = None,
+        state: Optional[Any] = None,
+    ) -> None:
+        """
+        Initialize an empty scheduler.
+
+        Args:
+            batch_size: Number of nonces per claimed batch
+            lock: Lock guarding the state (defaults to a threading.Lock)
+            state: Three-slot integer sequence holding next, end and best
+        """
+        self.batch_size = batch_size
+        self._lock = lock if lock is not None else threading.Lock()
+        self._state = state if state is not None else [0, 0, 0]
+
+    @classmethod
+    def shared(cls, ctx: Any, batch_size: int = NONCE_BATCH_SIZE) -> "NonceScheduler":
+        """
+        Create a scheduler whose state lives in shared memory.
+
+        Args:
+            ctx: multiprocessing context used to allocate the state
+            batch_size: Number of nonces per claimed batch
+
+        Returns:
+            Scheduler that can be handed to worker processes at start-up
+        """
+        return cls(batch_size, ctx.Lock(), ctx.RawArray("q", 3))
+
+    def reset(self, start_nonce: int, end_nonce: int) -> None:
+        """
+        Start scheduling a new nonce range.
+
+        Args:
+            start_nonce: Starting nonce value
+            end_nonce: Ending nonce value
+        """
+        with self._lock:
+            self._state[self._NEXT] = start_nonce
+            self._state[self._END] = end_nonce
+            self._state[self._BEST] = end_nonce
+
+    def claim(self) -> Optional[Tuple[int, int]]:
+        """
+        Claim the next batch of nonces.
+
+        Returns:
+            Tuple of (start_nonce, end_nonce), or None when no batch below
+            the best nonce found so far is left
+        """
+        with self._lock:
+            start_nonce = self._state[self._NEXT]
+            limit = min(self._state[self._END], self._state[self._BEST])
+            if start_nonce >= limit:
+                return None
+
+            end_nonce = min(start_nonce + self.batch_size, limit)
+            self._state[self._NEXT] = end_nonce
+
+        return start_nonce, end_nonce
+
+    def report(self, nonce: int) -> None:
+        """
+        Report a valid nonce.
+
+        Args:
+            nonce: Valid nonce found by a worker
+        """
+        with self._lock:
+            if nonce < self._state[self._BEST]:
+                self._state[self._BEST] = nonce
+
+    def get_best_nonce(self) -> Optional[int]:
+        """
+        Get the lowest valid nonce reported for the current range.
+
+        Returns:
+            The lowest reported nonce, or None if none was found
+        """
+        with self._lock:
+            best = self._state[self._BEST]
+            found = best < self._state[self._END]
+
+        return best if found else None
+
+
+def _mine_batches(
+    template: HashTemplate, scheduler: NonceScheduler, stop_event: Any
+) -> int:
+    """
+    Worker loop shared by thread and process mining.
+
+    Claims batches from the scheduler until it runs dry or the stop event
+    is set, reporting any valid nonce found along the way.
+
+    Args:
+        template: Encoded block to mine
+        scheduler: Scheduler handing out nonce batches
+        stop_event: Event that aborts the search when set
+
+    Returns:
+        Number of hashes this worker performed
+    """
+    hashes = 0
+
+    while not stop_event.is_set():
+        batch = scheduler.claim()
+        if batch is None:
+            break
+
+        start_nonce, end_nonce = batch
+        nonce = template.search(start_nonce, end_nonce)
+
+        if nonce is None:
+            hashes += end_nonce - start_nonce
+        else:
+            hashes += nonce - start_nonce + 1
+            scheduler.report(nonce)
+
+    return hashes
+
+
+def _process_mining_worker(
+    worker_id: int,
+    scheduler: NonceScheduler,
+    job_queue: Any,
+    result_queue: Any,
+    stop_event: Any,
+) -> None:
+    """
+    Main loop of a ProcessMiningPool worker process.
+
+    Receives one block template per job, mines batches from the shared
+    scheduler and reports (worker_id, hashes). A None job shuts the worker
+    down.
+    """
+    while True:
+        template = job_queue.get()
+        if template is None:
+            return
+
+        result_queue.put((worker_id, _mine_batches(template, scheduler, stop_event)))
+
+
+class ProcessMiningPool:
+    """
+    Persistent worker processes for parallel proof-of-work.
+
+    Threads cannot mine in parallel because the hashing loop holds the GIL,
+    so the pool keeps one process per worker alive across blocks. Each job
+    sends the encoded block template to every worker once; workers then pull
+    nonce batches from a scheduler in shared memory and only send back how
+    many hashes they performed.
+
+    Attributes:
+        num_workers: Number of worker processes
+    """
+
+    def __init__(self, num_workers: Optional[int] = None) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            num_workers: Number of worker processes (defaults to CPU count)
+        """
+        self.num_workers = num_workers or mp.cpu_count()
+        self._closed = False
+
+        ctx = mp.get_context()
+        self._scheduler = NonceScheduler.shared(ctx)
+        self._stop_event = ctx.Event()
+        self._result_queue = ctx.Queue()
+        self._job_queues = [ctx.Queue() for _ in range(self.num_workers)]
+        self._workers = [
+            ctx.Process(
+                target=_process_mining_worker,
+                args=(
+                    worker_id,
+                    self._scheduler,
+                    job_queue,
+                    self._result_queue,
+                    self._stop_event,
+                ),
+                daemon=True,
+            )
+            for worker_id, job_queue in enumerate(self._job_queues)
+        ]
+
+        for worker in self._workers:
+            worker.start()
+
+    def search(
+        self,
+        template: HashTemplate,
+        start_nonce: int,
+        end_nonce: int,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> Tuple[Optional[int], List[int]]:
+        """
+        Search a nonce range across all worker processes.
+
+        Workers claim small batches on demand, so the lowest valid nonce in
+        the range is found without any worker idling in a useless region.
+
+        Args:
+            template: Encoded block to mine
+            start_nonce: Starting nonce value
+            end_nonce: Ending nonce value
+            cancel_token: Token that stops all workers when cancelled
+
+        Returns:
+            Tuple of (lowest valid nonce or None, hashes performed per worker)
+
+        Raises:
+            MiningError: If the pool is closed or a worker process died
+        """
+        if self._closed:
+            raise MiningError("Mining pool is closed")
+
+        self._stop_event.clear()
+        self._scheduler.reset(start_nonce, end_nonce)
+
+        for job_queue in self._job_queues:
+            job_queue.put(template)
+
+        worker_hashes = [0] * self.num_workers
+
+        if cancel_token is None:
+            cancel_token = CancelToken()
+
+        with cancel_token.linked(self._stop_event):
+            # Drain one result per worker so the scheduler is idle before the
+            # next job resets it
+            for _ in range(self.num_workers):
+                worker_id, hashes = self._next_result()
+                worker_hashes[worker_id] = hashes
+
+        return self._scheduler.get_best_nonce(), worker_hashes
+
+    def _next_result(self) -> Tuple[int, int]:
+        """Wait for the next worker result, watching for dead workers."""
+        while True:
+            try:
+                result: Tuple[int, int] = self._result_queue.get(timeout=0.1)
+                return result
+            except queue.Empty:
+                if not all(worker.is_alive() for worker in self._workers):
+                    self.close()
+                    raise MiningError("Mining worker process exited unexpectedly")
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._stop_event.set()
+
+        for worker, job_queue in zip(self._workers, self._job_queues):
+            if worker.is_alive():
+                job_queue.put(None)
+
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+
+    def __enter__(self) -> "ProcessMiningPool":
+        """Use the pool as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the pool when leaving the context."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return f"ProcessMiningPool(num_workers={self.num_workers})"
+
+
 class Miner:
     """
     Handles proof-of-work mining for blocks.
 
     The miner finds valid nonces for blocks by testing different values
-    until the block hash meets the difficulty requirement. Supports both
-    single-threaded and multi-threaded mining.
+    until the block hash meets the difficulty requirement. Supports
+    single-threaded, multi-threaded and multi-process mining, all of which
+    can be aborted through the miner's cancel token.
 
     Attributes:
-        max_nonce: Maximum nonce value to try before giving up
+        max_nonce: Maximum nonce value to try per block timestamp
         progress_callback: Optional callback function for mining progress
+        roll_timestamp: Whether to bump the block timestamp and restart the
+            nonce search when max_nonce is reached
+        max_timestamp_rolls: Maximum number of timestamp rolls per block
+            (None for no limit)
+        cancel_token: Token used to abort mining, e.g. when a competing
+            block arrives
+        last_worker_hashes: Hashes performed by each worker during the
+            last parallel mining call
     """
 
     def __init__(
         self,
         max_nonce: int = 1000000,
         progress_callback: Optional[Callable[[int, str], None]] = None,
+        roll_timestamp: bool = True,
+        max_timestamp_rolls: Optional[int] = None,
     ) -> None:
         """
         Initialize a new miner.
 
         Args:
-            max_nonce: Maximum nonce to try before giving up
+            max_nonce: Maximum nonce to try per block timestamp
             progress_callback: Function called with (nonce, hash) during mining
+            roll_timestamp: Extend the search space by rolling the block
+                timestamp whenever max_nonce is exhausted; pass False to give
+                up at max_nonce instead
+            max_timestamp_rolls: Limit on timestamp rolls (None for no limit)
         """
         self.max_nonce = max_nonce
         self.progress_callback = progress_callback
+        self.roll_timestamp = roll_timestamp
+        self.max_timestamp_rolls = max_timestamp_rolls
+        self.cancel_token = CancelToken()
+        self.last_worker_hashes: List[int] = []
         self._mining_stats = {"blocks_mined": 0, "total_hashes": 0, "total_time": 0.0}
+        self._process_pool: Optional[ProcessMiningPool] = None
 
     def mine_block(self, block: Block) -> bool:
         """
@@ -60,7 +458,8 @@ class Miner:
             block: The block to mine
 
         Returns:
-            True if mining was successful, False if max_nonce was reached
+            True if mining was successful, False if the search space was
+            exhausted or mining was cancelled
 
         Raises:
             MiningError: If mining fails due to invalid block
@@ -68,32 +467,80 @@ class Miner:
         if block.difficulty < 0:
             raise MiningError("Block difficulty must be non-negative")
 
+        self.cancel_token.consume()
         start_time = time.time()
-        target_prefix = "0" * block.difficulty
+        found_nonce = None
+        hashes = 0
 
-        for nonce in range(self.max_nonce):
-            block.nonce = nonce
-            current_hash = block.calculate_hash()
+        for template in self._search_space(block):
+            for chunk_start in range(0, self.max_nonce, PROGRESS_INTERVAL):
+                if self.cancel_token.is_cancelled():
+                    break
+
+                chunk_end = min(chunk_start + PROGRESS_INTERVAL, self.max_nonce)
+
+                # Call progress callback if provided
+                if self.progress_callback:
+                    self.progress_callback(chunk_start, template.hexdigest(chunk_start))
+
+                found_nonce = template.search(chunk_start, chunk_end)
+                if found_nonce is not None:
+                    hashes += found_nonce - chunk_start + 1
+                    break
+
+                hashes += chunk_end - chunk_start
+
+            if found_nonce is not None:
+                break
 
-            # Call progress callback if provided
-            if self.progress_callback and nonce % 1000 == 0:
-                self.progress_callback(nonce, current_hash)
+        self.cancel_token.consume()
 
-            # If difficulty is 0, any hash is valid
-            if block.difficulty == 0 or current_hash.startswith(target_prefix):
-                # Mining successful
-                end_time = time.time()
-                mining_time = end_time - start_time
+        if found_nonce is None:
+            # Max nonce reached (or cancelled) without finding valid hash
+            if self.max_nonce > 0:
+                block.nonce = self.max_nonce - 1
+            return False
 
-                # Update statistics
-                self._mining_stats["blocks_mined"] += 1
-                self._mining_stats["total_hashes"] += nonce + 1
-                self._mining_stats["total_time"] += mining_time
+        # Mining successful
+        block.nonce = found_nonce
+        end_time = time.time()
+        mining_time = end_time - start_time
 
-                return True
+        # Update statistics
+        self._mining_stats["blocks_mined"] += 1
+        self._mining_stats["total_hashes"] += hashes
+        self._mining_stats["total_time"] += mining_time
 
-        # Max nonce reached without finding valid hash
-        return False
+        return True
+
+    def _search_space(self, block: Block) -> Iterator[HashTemplate]:
+        """
+        Yield hash templates covering the block's search space.
+
+        The first template uses the block as given. If timestamp rolling is
+        enabled, each further template bumps block.timestamp by one second
+        and only rebuilds the encoded prefix, reusing the transactions.
+
+        Args:
+            block: The block being mined (its timestamp may be modified)
+
+        Yields:
+            Template to search over the full nonce range
+        """
+        template = HashTemplate.from_block(block)
+        yield template
+
+        if not self.roll_timestamp:
+            return
+
+        rolls = 0
+        while (
+            self.max_timestamp_rolls is None or rolls < self.max_timestamp_rolls
+        ) and not self.cancel_token.is_cancelled():
+            rolls += 1
+            block.timestamp += 1
+            template = template.with_prefix(block.get_hash_prefix())
+            yield template
 
     def mine_block_parallel(
         self, block: Block, num_workers: Optional[int] = None
@@ -101,60 +548,134 @@ class Miner:
         """
         Mine a block using multiple threads for better performance.
 
-        Divides the nonce search space among multiple worker threads.
+        Worker threads claim small nonce batches from a shared scheduler,
+        so the result is the lowest valid nonce, as with mine_block. All
+        workers share a stop event that aborts them when the cancel token is
+        triggered.
 
         Args:
             block: The block to mine
             num_workers: Number of worker threads (defaults to CPU count)
 
         Returns:
-            True if mining was successful, False if max_nonce was reached
+            True if mining was successful, False if the search space was
+            exhausted or mining was cancelled
         """
         if num_workers is None:
             num_workers = mp.cpu_count()
 
+        self.cancel_token.consume()
         start_time = time.time()
-        chunk_size = self.max_nonce // num_workers
-
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            # Submit mining tasks for different nonce ranges
-            futures = []
-            for i in range(num_workers):
-                start_nonce = i * chunk_size
-                end_nonce = (
-                    start_nonce + chunk_size if i < num_workers - 1 else self.max_nonce
-                )
+        scheduler = NonceScheduler()
+        stop_event = threading.Event()
+        nonce = None
+        self.last_worker_hashes = [0] * num_workers
+
+        with self.cancel_token.linked(stop_event), ThreadPoolExecutor(
+            max_workers=num_workers
+        ) as executor:
+            for template in self._search_space(block):
+                scheduler.reset(0, self.max_nonce)
+                futures = [
+                    executor.submit(_mine_batches, template, scheduler, stop_event)
+                    for _ in range(num_workers)
+                ]
+                for i, future in enumerate(futures):
+                    self.last_worker_hashes[i] += future.result()
+
+                nonce = scheduler.get_best_nonce()
+                if nonce is not None:
+                    break
+
+        self.cancel_token.consume()
+        return self._finish_parallel(block, nonce, start_time)
+
+    def mine_block_processes(
+        self, block: Block, num_workers: Optional[int] = None
+    ) -> bool:
+        """
+        Mine a block using a pool of worker processes.
 
-                future = executor.submit(
-                    self._mine_range,
-                    block.copy() if hasattr(block, "copy") else self._copy_block(block),
-                    start_nonce,
-                    end_nonce,
-                )
-                futures.append(future)
+        Unlike mine_block_parallel this scales with the number of cores. The
+        worker processes are kept alive between calls; use close() to shut
+        them down.
+
+        Args:
+            block: The block to mine
+            num_workers: Number of worker processes (defaults to CPU count)
+
+        Returns:
+            True if mining was successful, False if the search space was
+            exhausted or mining was cancelled
+
+        Raises:
+            MiningError: If mining fails due to invalid block
+        """
+        if block.difficulty < 0:
+            raise MiningError("Block difficulty must be non-negative")
+
+        self.cancel_token.consume()
+        start_time = time.time()
+        pool = self._get_process_pool(num_workers)
+        nonce = None
+        self.last_worker_hashes = [0] * pool.num_workers
+
+        for template in self._search_space(block):
+            nonce, worker_hashes = pool.search(
+                template, 0, self.max_nonce, self.cancel_token
+            )
+            for i, hashes in enumerate(worker_hashes):
+                self.last_worker_hashes[i] += hashes
+
+            if nonce is not None:
+                break
+
+        self.cancel_token.consume()
+        return self._finish_parallel(block, nonce, start_time)
+
+    def _finish_parallel(
+        self, block: Block, nonce: Optional[int], start_time: float
+    ) -> bool:
+        """Record the outcome of a parallel mining call."""
+        if nonce is None:
+            return False
+
+        block.nonce = nonce
+
+        # Update statistics with the hashes actually performed
+        mining_time = time.time() - start_time
+        self._mining_stats["blocks_mined"] += 1
+        self._mining_stats["total_hashes"] += sum(self.last_worker_hashes)
+        self._mining_stats["total_time"] += mining_time
+
+        return True
 
-            # Wait for first successful result
-            for future in as_completed(futures):
-                result = future.result()
-                if result is not None:
-                    # Mining successful - update original block
-                    nonce, mining_hash = result
-                    block.nonce = nonce
+    def _get_process_pool(self, num_workers: Optional[int]) -> ProcessMiningPool:
+        """Get the persistent process pool, restarting it if resized."""
+        if num_workers is None:
+            num_workers = mp.cpu_count()
 
-                    # Cancel remaining tasks
-                    for f in futures:
-                        f.cancel()
+        if self._process_pool is not None:
+            if self._process_pool.num_workers == num_workers:
+                return self._process_pool
+            self._process_pool.close()
 
-                    # Update statistics
-                    end_time = time.time()
-                    mining_time = end_time - start_time
-                    self._mining_stats["blocks_mined"] += 1
-                    self._mining_stats["total_hashes"] += nonce + 1
-                    self._mining_stats["total_time"] += mining_time
+        self._process_pool = ProcessMiningPool(num_workers)
+        return self._process_pool
 
-                    return True
+    def cancel(self) -> None:
+        """
+        Abort the mining call in progress.
 
-        return False
+        Safe to call from any thread. Has no effect if no mining is running.
+        """
+        self.cancel_token.cancel()
+
+    def close(self) -> None:
+        """Shut down any worker processes started by this miner."""
+        if self._process_pool is not None:
+            self._process_pool.close()
+            self._process_pool = None
 
     def _mine_range(
         self, block: Block, start_nonce: int, end_nonce: int
@@ -170,17 +691,14 @@ class Miner:
         Returns:
             Tuple of (nonce, hash) if successful, None otherwise
         """
-        target_prefix = "0" * block.difficulty
-
-        for nonce in range(start_nonce, end_nonce):
-            block.nonce = nonce
-            current_hash = block.calculate_hash()
+        template = HashTemplate.from_block(block)
+        nonce = template.search(start_nonce, end_nonce)
 
-            # If difficulty is 0, any hash is valid
-            if block.difficulty == 0 or current_hash.startswith(target_prefix):
-                return (nonce, current_hash)
+        if nonce is None:
+            return None
 
-        return None
+        block.nonce = nonce
+        return (nonce, template.hexdigest(nonce))
 
     def _copy_block(self, block: Block) -> Block:
         """Create a copy of a block for parallel mining."""
@@ -191,10 +709,15 @@ class Miner:
             previous_hash=block.previous_hash,
             nonce=block.nonce,
             difficulty=block.difficulty,
+            target=block.target,
+            version=block.version,
         )
 
     def estimate_mining_time(
-        self, difficulty: int, hash_rate: Optional[int] = None
+        self,
+        difficulty: int,
+        hash_rate: Optional[int] = None,
+        target: Optional[int] = None,
     ) -> float:
         """
         Estimate time required to mine a block with given difficulty.
@@ -202,6 +725,7 @@ class Miner:
         Args:
             difficulty: Mining difficulty (number of leading zeros)
             hash_rate: Hashes per second (estimated from previous mining if None)
+            target: Integer target to use instead of difficulty
 
         Returns:
             Estimated mining time in seconds
@@ -218,7 +742,10 @@ class Miner:
                 hash_rate = 1000  # Hashes per second
 
         # Expected number of hashes needed
-        expected_hashes = 16**difficulty
+        if target is None:
+            expected_hashes = 16**difficulty
+        else:
+            expected_hashes = MAX_TARGET / target
 
         return expected_hashes / hash_rate
 
@@ -330,6 +857,40 @@ class Miner:
             # Time is acceptable - keep current difficulty
             return current_difficulty
 
+    @staticmethod
+    def calculate_target_adjustment(
+        blocks: List[Block], target_time: int = 600, max_factor: float = 4.0
+    ) -> int:
+        """
+        Calculate a retargeted 256-bit target based on block times.
+
+        Unlike calculate_difficulty_adjustment, which can only move in steps
+        of 16x work, the target is scaled by the ratio of actual to desired
+        block time, so block times can be tuned smoothly.
+
+        Args:
+            blocks: List of recent blocks
+            target_time: Target time between blocks in seconds
+            max_factor: Largest factor the target may change by at once
+
+        Returns:
+            New integer target
+        """
+        if not blocks:
+            return difficulty_to_target(4)
+
+        current_target = blocks[-1].get_target()
+        if len(blocks) < 2:
+            return current_target
+
+        average_time = (blocks[-1].timestamp - blocks[0].timestamp) / (len(blocks) - 1)
+
+        # Scale by actual / desired time, limited to avoid wild swings
+        ratio = min(max(average_time / target_time, 1 / max_factor), max_factor)
+        new_target = current_target * int(ratio * (1 << 32)) >> 32
+
+        return min(max(new_target, 1), MAX_TARGET)
+
     def __str__(self) -> str:
         """String representation of the miner."""
         stats = self.get_mining_stats()
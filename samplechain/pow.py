@@ -0,0 +1,232 @@
+"""
+Proof-of-work module for the SampleChain blockchain.
+
+This module contains the HashTemplate class which encodes a block's hash
+preimage once and keeps a SHA256 midstate for the fixed prefix, so mining
+only pays for hashing the nonce and the remaining bytes on every attempt.
+"""
+
+import hashlib
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .block import Block
+
+
+# Targets are compared against 256-bit hashes; this target accepts any hash
+MAX_TARGET = 1 << 256
+
+
+def difficulty_to_target(difficulty: int) -> int:
+    """
+    Convert a hex-digit difficulty into a 256-bit integer target.
+
+    A hash has ``difficulty`` leading zero hex digits exactly when its
+    integer value is below ``16 ** (64 - difficulty)``.
+
+    Args:
+        difficulty: Number of leading zero hex digits required
+
+    Returns:
+        Integer target; a hash is valid if its value is below the target
+    """
+    if difficulty <= 0:
+        return MAX_TARGET
+
+    if difficulty > 64:
+        return 0
+
+    return 1 << (256 - 4 * difficulty)
+
+
+def bits_to_target(zero_bits: int) -> int:
+    """
+    Convert a number of required leading zero bits into a target.
+
+    Each extra bit doubles the expected work, instead of the factor of 16
+    of one hex digit of difficulty.
+
+    Args:
+        zero_bits: Number of leading zero bits required (0-256)
+
+    Returns:
+        Integer target; a hash is valid if its value is below the target
+
+    Raises:
+        ValueError: If zero_bits is out of range
+    """
+    if not 0 <= zero_bits <= 256:
+        raise ValueError("Leading zero bits must be between 0 and 256")
+
+    return 1 << (256 - zero_bits)
+
+
+class HashTemplate:
+    """
+    Pre-encoded block hash preimage used by the mining hot loop.
+
+    The template serializes the block once, absorbs everything before the
+    nonce into a SHA256 midstate, and compares raw digest bytes against the
+    target instead of building hex strings. Digests are identical to
+    ``Block.calculate_hash`` for the same nonce.
+
+    Attributes:
+        target: Integer target a digest must be below
+        nonce_size: Width of the big-endian nonce in bytes, or 0 for the
+            legacy decimal encoding
+    """
+
+    def __init__(
+        self, prefix: bytes, suffix: bytes, target: int, nonce_size: int = 0
+    ) -> None:
+        """
+        Build a hash template from an encoded preimage.
+
+        Args:
+            prefix: Encoded bytes hashed before the nonce
+            suffix: Encoded bytes hashed after the nonce
+            target: Integer target a digest must be below
+            nonce_size: Width of the big-endian nonce in bytes, or 0 to
+                encode the nonce as decimal ASCII
+        """
+        self.target = target
+        self.nonce_size = nonce_size
+        self._prefix = prefix
+        self._midstate = hashlib.sha256(prefix)
+        self._suffix = suffix
+
+        # Big-endian digests compare like integers, so a valid digest is
+        # simply one that sorts below the target bytes
+        self._accept_all = target >= MAX_TARGET
+        self._target_bytes = min(target, MAX_TARGET - 1).to_bytes(32, "big")
+
+    @classmethod
+    def from_block(cls, block: "Block") -> "HashTemplate":
+        """
+        Build a hash template from a block.
+
+        Args:
+            block: The block to encode (its nonce is ignored)
+
+        Returns:
+            New HashTemplate instance
+        """
+        prefix, suffix = block.get_hash_preimage()
+        return cls(prefix, suffix, block.get_target(), block.get_nonce_size())
+
+    def with_prefix(self, prefix: bytes) -> "HashTemplate":
+        """
+        Build a template that shares this template's suffix.
+
+        Used to restart the search after rolling header fields such as the
+        timestamp, without re-encoding the transactions.
+
+        Args:
+            prefix: New encoded bytes hashed before the nonce
+
+        Returns:
+            New HashTemplate instance
+        """
+        return self.__class__(prefix, self._suffix, self.target, self.nonce_size)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle as the encoded preimage; hashlib midstates are not picklable."""
+        return (
+            self.__class__,
+            (self._prefix, self._suffix, self.target, self.nonce_size),
+        )
+
+    def encode_nonce(self, nonce: int) -> bytes:
+        """
+        Encode a nonce the way it appears in the hash preimage.
+
+        Args:
+            nonce: Nonce value to encode
+
+        Returns:
+            Encoded nonce bytes
+        """
+        if self.nonce_size:
+            return nonce.to_bytes(self.nonce_size, "big")
+
+        return b"%d" % nonce
+
+    def digest(self, nonce: int) -> bytes:
+        """
+        Calculate the raw SHA256 digest of the block for a nonce.
+
+        Args:
+            nonce: Nonce value to hash
+
+        Returns:
+            The 32-byte digest
+        """
+        hasher = self._midstate.copy()
+        hasher.update(self.encode_nonce(nonce))
+        hasher.update(self._suffix)
+        return hasher.digest()
+
+    def hexdigest(self, nonce: int) -> str:
+        """
+        Calculate the hexadecimal block hash for a nonce.
+
+        Args:
+            nonce: Nonce value to hash
+
+        Returns:
+            The hexadecimal hash string, as returned by Block.calculate_hash
+        """
+        return self.digest(nonce).hex()
+
+    def is_digest_valid(self, digest: bytes) -> bool:
+        """
+        Check if a raw digest meets the target.
+
+        Args:
+            digest: 32-byte digest to check
+
+        Returns:
+            True if the digest is below the target
+        """
+        return self._accept_all or digest < self._target_bytes
+
+    def search(self, start_nonce: int, end_nonce: int) -> Optional[int]:
+        """
+        Find the lowest valid nonce within a range.
+
+        Args:
+            start_nonce: Starting nonce value (inclusive)
+            end_nonce: Ending nonce value (exclusive)
+
+        Returns:
+            The first valid nonce in the range, or None if there is none
+        """
+        if start_nonce >= end_nonce:
+            return None
+
+        if self._accept_all:
+            return start_nonce
+
+        # Bind everything the loop touches to locals
+        copy = self._midstate.copy
+        suffix = self._suffix
+        target = self._target_bytes
+
+        if self.nonce_size:
+            size = self.nonce_size
+            for nonce in range(start_nonce, end_nonce):
+                hasher = copy()
+                hasher.update(nonce.to_bytes(size, "big"))
+                hasher.update(suffix)
+                if hasher.digest() < target:
+                    return nonce
+            return None
+
+        for nonce in range(start_nonce, end_nonce):
+            hasher = copy()
+            hasher.update(b"%d" % nonce)
+            hasher.update(suffix)
+            if hasher.digest() < target:
+                return nonce
+
+        return None
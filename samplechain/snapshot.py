@@ -0,0 +1,141 @@
+"""
+State snapshot module for the SampleChain blockchain.
+
+This module contains the StateSnapshot class, which records the balances,
+chain tip and transaction totals at a block height in a compact binary
+form, so a blockchain can be restored without replaying the blocks before
+that height.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from .stats import ChainTotals
+
+SNAPSHOT_MAGIC = b"SCSNAP"
+SNAPSHOT_VERSION = 1
+
+# Magic, version, height, difficulty, tip hash, target (zero for none)
+# and number of balances
+_HEADER = struct.Struct(">6sBQQ32s33sI")
+
+# Whether totals are present, then transaction count, value and fees
+_TOTALS = struct.Struct(">BQQQ")
+
+# Address and balance
+_BALANCE = struct.Struct(">qq")
+
+# CRC-32 of everything before it
+_CHECKSUM = struct.Struct(">I")
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """
+    Balances and chain tip after the first height blocks.
+
+    Attributes:
+        height: Number of blocks the snapshot includes
+        tip_hash: Hash of the last included block, or the genesis block's
+            previous hash for a snapshot at height 0
+        difficulty: Mining difficulty at that height
+        target: Integer mining target at that height, if any
+        balances: Non-zero balances after the included blocks
+        totals: Transaction totals over the included blocks, if known
+    """
+
+    height: int
+    tip_hash: str
+    difficulty: int
+    target: Optional[int] = None
+    balances: Dict[int, int] = field(default_factory=dict)
+    totals: Optional[ChainTotals] = None
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the snapshot with a trailing checksum.
+
+        Balances are written in address order, so equal snapshots encode
+        to equal bytes.
+
+        Returns:
+            The encoded snapshot
+
+        Raises:
+            ValueError: If a field does not fit the binary format
+        """
+        balances = sorted((a, b) for a, b in self.balances.items() if b)
+        totals = self.totals or ChainTotals()
+        try:
+            parts = [
+                _HEADER.pack(
+                    SNAPSHOT_MAGIC,
+                    SNAPSHOT_VERSION,
+                    self.height,
+                    self.difficulty,
+                    bytes.fromhex(self.tip_hash),
+                    (self.target or 0).to_bytes(33, "big"),
+                    len(balances),
+                ),
+                _TOTALS.pack(
+                    self.totals is not None,
+                    totals.transactions,
+                    totals.value,
+                    totals.fees,
+                ),
+            ]
+            parts.extend(_BALANCE.pack(a, b) for a, b in balances)
+        except (struct.error, OverflowError) as e:
+            raise ValueError(f"Snapshot does not fit the binary format: {e}")
+
+        data = b"".join(parts)
+        return data + _CHECKSUM.pack(zlib.crc32(data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StateSnapshot":
+        """
+        Decode a snapshot written by to_bytes().
+
+        Args:
+            data: The encoded snapshot
+
+        Returns:
+            The decoded snapshot
+
+        Raises:
+            ValueError: If the data is truncated, corrupt or not a snapshot
+        """
+        if len(data) < _HEADER.size + _TOTALS.size + _CHECKSUM.size:
+            raise ValueError("Snapshot is truncated")
+
+        body_size = len(data) - _CHECKSUM.size
+        body = data[:body_size]
+        (checksum,) = _CHECKSUM.unpack_from(data, body_size)
+        if zlib.crc32(body) != checksum:
+            raise ValueError("Snapshot checksum mismatch")
+
+        magic, version, height, difficulty, tip_hash, target, count = (
+            _HEADER.unpack_from(body)
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a state snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        has_totals, transactions, value, fees = _TOTALS.unpack_from(body, _HEADER.size)
+        totals = ChainTotals(transactions, value, fees) if has_totals else None
+        offset = _HEADER.size + _TOTALS.size
+
+        if len(body) != offset + count * _BALANCE.size:
+            raise ValueError("Snapshot length does not match its balance count")
+
+        return cls(
+            height=height,
+            tip_hash=tip_hash.hex(),
+            difficulty=difficulty,
+            target=int.from_bytes(target, "big") or None,
+            balances=dict(_BALANCE.iter_unpack(body[offset:])),
+            totals=totals,
+        )
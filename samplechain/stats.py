@@ -0,0 +1,239 @@
+"""
+Statistics module for the SampleChain blockchain.
+
+This module contains the ChainStats class which keeps running aggregates
+of the chain, so statistics do not have to be recomputed from every block.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from .block import Block
+
+
+@dataclass(frozen=True)
+class ChainTotals:
+    """
+    Transaction totals over the first blocks of a chain.
+
+    Attributes:
+        transactions: Number of transactions
+        value: Sum of transaction values
+        fees: Sum of transaction fees
+    """
+
+    transactions: int = 0
+    value: int = 0
+    fees: int = 0
+
+
+class ChainStats:
+    """
+    Running aggregates over the blocks of a chain.
+
+    Totals are updated as blocks are appended. Per-block timestamps are
+    stored alongside cumulative transaction counts, so throughput and block
+    interval over any window of recent blocks cost O(1). The number of
+    funded addresses is maintained from the balances each block touches.
+
+    Statistics can also resume from totals saved at some height, so a
+    stored chain is not scanned to build them. Windows reaching below that
+    height then read only the blocks they cover.
+
+    Attributes:
+        total_blocks: Number of blocks recorded
+        total_transactions: Number of transactions in all blocks
+        total_value: Sum of transaction values in all blocks
+        total_fees: Sum of transaction fees in all blocks
+        funded_addresses: Number of addresses with a positive balance
+    """
+
+    def __init__(self, balances: Optional[Mapping[int, int]] = None) -> None:
+        """
+        Initialize statistics for an empty chain.
+
+        Args:
+            balances: Starting balances used to count funded addresses
+        """
+        self.total_blocks = 0
+        self.total_transactions = 0
+        self.total_value = 0
+        self.total_fees = 0
+        self.funded_addresses = 0
+        # _timestamps[i] is the timestamp of block _base + i, and
+        # _cumulative_transactions[i] counts transactions in blocks 0.._base + i
+        self._timestamps: List[int] = []
+        self._cumulative_transactions: List[int] = []
+        self._base = 0
+        self._base_transactions = 0
+        self._blocks: Sequence[Block] = ()
+
+        if balances is not None:
+            self.reset_balances(balances)
+
+    def reset_balances(self, balances: Mapping[int, int]) -> None:
+        """
+        Recount funded addresses from a full balance mapping.
+
+        Args:
+            balances: Current balances of all addresses
+        """
+        self.funded_addresses = sum(1 for balance in balances.values() if balance > 0)
+
+    def add_block(
+        self,
+        block: Block,
+        previous_balances: Optional[Mapping[int, int]] = None,
+        balances: Optional[Mapping[int, int]] = None,
+    ) -> None:
+        """
+        Record a block appended to the chain.
+
+        Args:
+            block: The appended block
+            previous_balances: Balances of the addresses the block touched,
+                before it was applied
+            balances: Balances after the block was applied
+        """
+        transaction_count = block.get_transaction_count()
+
+        self.total_blocks += 1
+        self.total_transactions += transaction_count
+        self.total_value += block.get_transaction_total()
+        self.total_fees += block.get_total_fees()
+        self._timestamps.append(block.timestamp)
+        self._cumulative_transactions.append(self.total_transactions)
+
+        if previous_balances is not None and balances is not None:
+            for address, before in previous_balances.items():
+                after = balances.get(address, 0)
+                self.funded_addresses += (after > 0) - (before > 0)
+
+    def rebuild(self, blocks: Iterable[Block], balances: Mapping[int, int]) -> None:
+        """
+        Discard the aggregates and recompute them from a chain.
+
+        Args:
+            blocks: Blocks of the chain, in order
+            balances: Current balances of all addresses
+        """
+        self.total_blocks = 0
+        self.total_transactions = 0
+        self.total_value = 0
+        self.total_fees = 0
+        self._timestamps.clear()
+        self._cumulative_transactions.clear()
+        self._base = 0
+        self._base_transactions = 0
+        self._blocks = ()
+        self.reset_balances(balances)
+
+        for block in blocks:
+            self.add_block(block)
+
+    def resume(self, blocks: Sequence[Block], height: int, totals: ChainTotals) -> None:
+        """
+        Discard the aggregates and continue from totals saved at a height.
+
+        No block is read here; the blocks from the height on are recorded
+        with add_block() as usual, and funded addresses with
+        reset_balances().
+
+        Args:
+            blocks: Blocks of the chain, read for windows reaching below
+                the height
+            height: Number of blocks the totals include
+            totals: Totals over the first height blocks
+        """
+        self.total_blocks = height
+        self.total_transactions = totals.transactions
+        self.total_value = totals.value
+        self.total_fees = totals.fees
+        self._timestamps.clear()
+        self._cumulative_transactions.clear()
+        self._base = height
+        self._base_transactions = totals.transactions
+        self._blocks = blocks
+
+    def get_totals(self) -> ChainTotals:
+        """
+        Get the transaction totals over the recorded blocks.
+
+        Returns:
+            The totals, for saving with the chain state
+        """
+        return ChainTotals(self.total_transactions, self.total_value, self.total_fees)
+
+    def get_average_block_interval(self, window: Optional[int] = None) -> float:
+        """
+        Get the average time between consecutive blocks.
+
+        Args:
+            window: Number of most recent intervals to average (None for all)
+
+        Returns:
+            Average interval in seconds, or 0.0 with fewer than two blocks
+        """
+        intervals = self._window(window)
+        if intervals == 0:
+            return 0.0
+
+        last = self.total_blocks - 1
+        return (self._timestamp(last) - self._timestamp(last - intervals)) / intervals
+
+    def get_transactions_per_second(self, window: Optional[int] = None) -> float:
+        """
+        Get the transaction throughput over recent blocks.
+
+        Counts the transactions of the last ``window`` blocks against the
+        time since the block before them.
+
+        Args:
+            window: Number of most recent blocks (None for all)
+
+        Returns:
+            Transactions per second, or 0.0 if no time has elapsed
+        """
+        intervals = self._window(window)
+        if intervals == 0:
+            return 0.0
+
+        last = self.total_blocks - 1
+        elapsed = self._timestamp(last) - self._timestamp(last - intervals)
+        if elapsed <= 0:
+            return 0.0
+
+        transactions = self.total_transactions - self._transactions_through(
+            last - intervals
+        )
+        return transactions / elapsed
+
+    def _window(self, window: Optional[int]) -> int:
+        """Clamp a window of recent block intervals to those recorded."""
+        available = max(0, self.total_blocks - 1)
+        return available if window is None else max(0, min(window, available))
+
+    def _timestamp(self, height: int) -> int:
+        """Timestamp of the block at a height."""
+        if height >= self._base:
+            return self._timestamps[height - self._base]
+
+        return self._blocks[height].timestamp
+
+    def _transactions_through(self, height: int) -> int:
+        """Number of transactions in the blocks up to and including a height."""
+        if height >= self._base:
+            return self._cumulative_transactions[height - self._base]
+
+        # Count back from the resumed totals over the blocks in between
+        count = self._base_transactions
+        for later in range(height + 1, self._base):
+            count -= self._blocks[later].get_transaction_count()
+        return count
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return (
+            f"ChainStats(blocks={self.total_blocks}, "
+            f"transactions={self.total_transactions})"
+        )
@@ -0,0 +1,60 @@
+"""
+Storage engines for the SampleChain blockchain.
+
+This package persists a blockchain incrementally, so adding a block does
+not rewrite the whole chain the way Blockchain.save_to_file() does.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+from .base import (
+    SYNC_ALWAYS,
+    SYNC_BATCH,
+    SYNC_MODES,
+    SYNC_NEVER,
+    StorageBackend,
+)
+from .blockfile import BlockFile
+from .blocklog import BlockLog, convert_json_file
+from .jsonstream import JSONStreamReader
+from .sqlite import SQLiteStorage
+
+# Backends by the name used on the command line
+BACKENDS: Dict[str, Type[StorageBackend]] = {
+    "log": BlockLog,
+    "sqlite": SQLiteStorage,
+    "blockfile": BlockFile,
+}
+
+
+def open_storage(path: str, **options: Any) -> Optional[StorageBackend]:
+    """
+    Open the store at a location with the backend that wrote it.
+
+    Args:
+        path: Store directory or database file
+        **options: Options passed to the backend constructor
+
+    Returns:
+        The opened store, or None if no backend recognizes the location
+    """
+    for backend in BACKENDS.values():
+        if backend.exists(path):
+            return backend(path, **options)  # type: ignore[call-arg]
+    return None
+
+
+__all__ = [
+    "BACKENDS",
+    "BlockFile",
+    "BlockLog",
+    "JSONStreamReader",
+    "SQLiteStorage",
+    "StorageBackend",
+    "convert_json_file",
+    "open_storage",
+    "SYNC_ALWAYS",
+    "SYNC_BATCH",
+    "SYNC_NEVER",
+    "SYNC_MODES",
+]
@@ -0,0 +1,281 @@
+"""
+Storage backend interface for the SampleChain blockchain.
+
+This module contains the StorageBackend abstract base class implemented by
+the persistent stores a Blockchain can write through to.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from ..block import Block
+from ..blockchain import Blockchain
+from ..index import Location
+from ..snapshot import StateSnapshot
+from ..transaction import Transaction
+
+# Durability modes shared by the backends
+SYNC_ALWAYS = "always"
+SYNC_BATCH = "batch"
+SYNC_NEVER = "never"
+SYNC_MODES = (SYNC_ALWAYS, SYNC_BATCH, SYNC_NEVER)
+
+
+def initial_balances(
+    balances: Mapping[int, int], deltas: Mapping[int, int]
+) -> Dict[int, int]:
+    """
+    Compute the balances before a sequence of blocks was applied.
+
+    Args:
+        balances: Balances after the blocks
+        deltas: Net changes made by the blocks, as left by applying them
+            to an empty mapping with Blockchain.apply_block()
+
+    Returns:
+        Non-zero balances before the first block
+    """
+    initial = {}
+    for address in set(balances) | set(deltas):
+        balance = balances.get(address, 0) - deltas.get(address, 0)
+        if balance:
+            initial[address] = balance
+    return initial
+
+
+def require_body(block: Block) -> None:
+    """
+    Ensure a block still has its transactions before it is stored.
+
+    Args:
+        block: The block to store
+
+    Raises:
+        ValueError: If the block has been pruned
+    """
+    if block.is_pruned():
+        raise ValueError(f"Block {block.index} has been pruned and cannot be stored")
+
+
+class StorageBackend(ABC):
+    """
+    Persistent store for a blockchain.
+
+    A Blockchain with a backend attached in its storage attribute appends
+    every accepted block to it. Balances and pending transactions are
+    written at checkpoints through Blockchain.save_state().
+
+    The query methods mirror those of Blockchain so read-only callers can
+    use either. Their default implementations load the whole chain once
+    and reuse it until the store changes; backends with indexes override
+    them with direct lookups.
+    """
+
+    # Chain loaded for the default query implementations, see _loaded_chain()
+    _cached_chain: Optional[Blockchain] = None
+
+    @classmethod
+    @abstractmethod
+    def create(
+        cls, path: str, blockchain: Blockchain, overwrite: bool = False, **options: Any
+    ) -> "StorageBackend":
+        """
+        Write a blockchain to a new store and attach the store to it.
+
+        Args:
+            path: Location of the new store
+            blockchain: The blockchain to store
+            overwrite: Replace an existing store at the location
+            **options: Backend-specific options
+
+        Returns:
+            The opened store
+
+        Raises:
+            FileExistsError: If a store exists and overwrite is False
+            ValueError: If the blockchain has pruned blocks
+        """
+
+    @classmethod
+    @abstractmethod
+    def exists(cls, path: str) -> bool:
+        """
+        Check whether a location holds a store of this backend.
+
+        Args:
+            path: Location to check
+
+        Returns:
+            True if the location holds such a store
+        """
+
+    @abstractmethod
+    def get_height(self) -> int:
+        """
+        Get the number of stored blocks.
+
+        Returns:
+            Number of blocks, including the genesis block
+        """
+
+    @abstractmethod
+    def append_block(self, block: Block) -> None:
+        """
+        Store the next block of the chain.
+
+        Args:
+            block: A block whose index equals the current height
+
+        Raises:
+            ValueError: If the block does not directly follow the store or has
+                been pruned
+        """
+
+    @abstractmethod
+    def write_state(self, snapshot: StateSnapshot) -> None:
+        """
+        Checkpoint the balances and chain tip.
+
+        Args:
+            snapshot: State after the first snapshot.height blocks
+        """
+
+    def needs_checkpoint(self, height: int) -> bool:
+        """
+        Check whether the state should be checkpointed after a block.
+
+        Blockchain.add_block() writes a snapshot when this returns True, so
+        stores that replay blocks on load can bound how many they replay.
+
+        Args:
+            height: Number of blocks, including the one just appended
+
+        Returns:
+            True if write_state() should be called now
+        """
+        return False
+
+    @abstractmethod
+    def write_mempool(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Replace the stored pending transactions.
+
+        Args:
+            transactions: Transactions waiting to be mined
+        """
+
+    @abstractmethod
+    def iter_blocks(self, start: int = 0) -> Iterator[Block]:
+        """
+        Iterate over the stored blocks in chain order.
+
+        Args:
+            start: Height of the first block to return
+
+        Yields:
+            Stored blocks
+        """
+
+    @abstractmethod
+    def load_blockchain(self) -> Blockchain:
+        """
+        Load the stored blockchain and attach this store to it.
+
+        Returns:
+            The loaded Blockchain instance
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write out buffered data and release the store."""
+
+    def flush(self) -> None:
+        """Force written data to durable storage."""
+
+    def _loaded_chain(self) -> Blockchain:
+        """
+        Get the stored blockchain for the default query implementations.
+
+        The chain is loaded on first use and reused while it has as many
+        blocks as the store. Backends relying on it reset _cached_chain in
+        write_mempool(), so pending transactions are read again.
+
+        Returns:
+            The loaded Blockchain instance; callers must not modify it
+        """
+        cached = self._cached_chain
+        if cached is None or len(cached.chain) != self.get_height():
+            cached = self._cached_chain = self.load_blockchain()
+        return cached
+
+    def get_balance(self, address: int) -> int:
+        """See Blockchain.get_balance()."""
+        return self._loaded_chain().get_balance(address)
+
+    def get_block(self, height: int) -> Optional[Block]:
+        """See Blockchain.get_block()."""
+        if height < 0:
+            return None
+        return next(self.iter_blocks(start=height), None)
+
+    def get_latest_block(self) -> Block:
+        """See Blockchain.get_latest_block()."""
+        block = self.get_block(self.get_height() - 1)
+        if block is None:
+            raise ValueError("Store holds no blocks")
+        return block
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """See Blockchain.get_block_by_hash()."""
+        return self._loaded_chain().get_block_by_hash(block_hash)
+
+    def get_transaction_by_hash(
+        self, tx_hash: str
+    ) -> Optional[Tuple[Transaction, Location]]:
+        """See Blockchain.get_transaction_by_hash()."""
+        return self._loaded_chain().get_transaction_by_hash(tx_hash)
+
+    def get_pending_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        """See Blockchain.get_pending_transaction()."""
+        return self._loaded_chain().get_pending_transaction(tx_hash)
+
+    def get_pending_transactions(self) -> List[Transaction]:
+        """See Blockchain.get_pending_transactions()."""
+        return self._loaded_chain().get_pending_transactions()
+
+    def query_transaction_history(
+        self,
+        address: int,
+        direction: str = "all",
+        limit: Optional[int] = None,
+        cursor: Optional[Location] = None,
+        newest_first: bool = True,
+    ) -> Tuple[List[Transaction], Optional[Location]]:
+        """See Blockchain.query_transaction_history()."""
+        return self._loaded_chain().query_transaction_history(
+            address, direction, limit, cursor, newest_first
+        )
+
+    def count_transaction_history(self, address: int, direction: str = "all") -> int:
+        """See Blockchain.count_transaction_history()."""
+        return self._loaded_chain().count_transaction_history(address, direction)
+
+    def get_pruned_height(self) -> int:
+        """
+        See Blockchain.get_pruned_height().
+
+        Stores keep the transactions of every block, so nothing is pruned.
+        """
+        return 0
+
+    def get_chain_stats(self, window: int = 10) -> Dict[str, Any]:
+        """See Blockchain.get_chain_stats()."""
+        return self._loaded_chain().get_chain_stats(window)
+
+    def __enter__(self) -> "StorageBackend":
+        """Use the store as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the store."""
+        self.close()
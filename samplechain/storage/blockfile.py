@@ -0,0 +1,373 @@
+"""
+Binary block file storage for the SampleChain blockchain.
+
+This module contains the BlockFile class, which stores a chain as binary
+block records in one data file and a fixed-width offset index in another.
+Both are read through memory maps, so a block is located with one index
+lookup and decoded only when it is requested.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, BinaryIO, Iterator, Optional, Sequence, Tuple
+
+from ..block import Block
+from ..lazy import LazyChain
+from ..transaction import Transaction
+from .base import SYNC_BATCH
+from .directory import DirectoryStorage
+
+DATA_FILE = "blocks.dat"
+INDEX_FILE = "blocks.idx"
+
+BLOCKFILE_LAYOUT = "blockfile"
+
+# Block header: version, index, timestamp, nonce, difficulty, previous hash,
+# target (zero when the block has none) and transaction count
+_HEADER = struct.Struct(">BQqQQ32s33sI")
+
+# Transaction: from, to, value, fee, timestamp flag and timestamp
+_TRANSACTION = struct.Struct(">qqqqBq")
+
+# Index entry: end offset of the record in the data file and its CRC-32
+_ENTRY = struct.Struct(">QI")
+
+
+def encode_block(block: Block) -> bytes:
+    """
+    Encode a block as a binary record.
+
+    Args:
+        block: The block to encode
+
+    Returns:
+        The encoded record
+
+    Raises:
+        ValueError: If a field does not fit the binary format
+    """
+    previous_hash = bytes.fromhex(block.previous_hash)
+    if previous_hash.hex() != block.previous_hash:
+        raise ValueError("Previous hash must be lowercase hex for the binary format")
+
+    try:
+        parts = [
+            _HEADER.pack(
+                block.version,
+                block.index,
+                block.timestamp,
+                block.nonce,
+                block.difficulty,
+                previous_hash,
+                (block.target or 0).to_bytes(33, "big"),
+                len(block.transactions),
+            )
+        ]
+        for tx in block.transactions:
+            parts.append(
+                _TRANSACTION.pack(
+                    tx.from_address,
+                    tx.to_address,
+                    tx.value,
+                    tx.fee,
+                    tx.timestamp is not None,
+                    tx.timestamp or 0,
+                )
+            )
+    except struct.error as e:
+        raise ValueError(f"Block {block.index} does not fit the binary format: {e}")
+
+    return b"".join(parts)
+
+
+def decode_block(buffer: Any, offset: int = 0) -> Block:
+    """
+    Decode a binary record into a block.
+
+    Args:
+        buffer: Bytes-like object holding the record, such as a memory map
+        offset: Position of the record in the buffer
+
+    Returns:
+        The decoded block
+
+    Raises:
+        ValueError: If the record is truncated
+    """
+    try:
+        (
+            version,
+            index,
+            timestamp,
+            nonce,
+            difficulty,
+            previous_hash,
+            target,
+            count,
+        ) = _HEADER.unpack_from(buffer, offset)
+
+        transactions = []
+        offset += _HEADER.size
+        for _ in range(count):
+            from_address, to_address, value, fee, has_timestamp, tx_timestamp = (
+                _TRANSACTION.unpack_from(buffer, offset)
+            )
+            transactions.append(
+                Transaction(
+                    from_address=from_address,
+                    to_address=to_address,
+                    value=value,
+                    fee=fee,
+                    timestamp=tx_timestamp if has_timestamp else None,
+                )
+            )
+            offset += _TRANSACTION.size
+    except struct.error as e:
+        raise ValueError(f"Truncated block record: {e}")
+
+    return Block(
+        index=index,
+        transactions=transactions,
+        timestamp=timestamp,
+        previous_hash=previous_hash.hex(),
+        nonce=nonce,
+        difficulty=difficulty,
+        target=int.from_bytes(target, "big") or None,
+        version=version,
+    )
+
+
+class BlockFile(DirectoryStorage):
+    """
+    Memory-mapped binary block file with a fixed-width offset index.
+
+    Block records are appended to a data file, and for every block the
+    index file holds the end offset of its record and a CRC-32 of it.
+    Block i therefore spans from the end of block i - 1 to its own end,
+    and reading it takes one index lookup in a memory map and decoding
+    one record, whatever the length of the chain.
+
+    Opening the store reads no blocks, and a loaded blockchain gets a
+    LazyChain that decodes blocks as they are accessed and keeps the most
+    recently used ones in an LRU cache. Balances, the mempool and syncing
+    are handled as described in DirectoryStorage.
+
+    Attributes:
+        path: Directory holding the store
+        sync: Sync mode for appended blocks
+        sync_interval: Blocks per fsync in "batch" mode
+        snapshot_interval: Blocks between automatic snapshots (0 for none)
+        keep_snapshots: Number of snapshots kept
+        cache_size: Decoded blocks cached by the chain of a loaded blockchain
+        height: Number of stored blocks
+    """
+
+    LAYOUT = BLOCKFILE_LAYOUT
+
+    def __init__(
+        self,
+        path: str,
+        sync: str = SYNC_BATCH,
+        sync_interval: int = 64,
+        snapshot_interval: int = 1000,
+        keep_snapshots: int = 2,
+        cache_size: int = 128,
+    ) -> None:
+        """
+        Open an existing block file.
+
+        Index entries left by a crash during an append, whose record is
+        missing or fails its checksum, are dropped together with any
+        partial record.
+
+        Args:
+            path: Directory holding the store
+            sync: Sync mode for appended blocks ("always", "batch" or "never")
+            sync_interval: Blocks per fsync in "batch" mode
+            snapshot_interval: Blocks between automatic snapshots (0 for none)
+            keep_snapshots: Number of snapshots kept
+            cache_size: Decoded blocks cached by the chain of a loaded blockchain
+
+        Raises:
+            FileNotFoundError: If the directory holds no block file
+            ValueError: If an option is invalid
+        """
+        if cache_size < 0:
+            raise ValueError("Cache size must be non-negative")
+        super().__init__(path, sync, sync_interval, snapshot_interval, keep_snapshots)
+
+        self.cache_size = cache_size
+        self._data: Optional[BinaryIO] = self._open_file(DATA_FILE)
+        self._index: Optional[BinaryIO] = self._open_file(INDEX_FILE)
+        self._data_map: Optional[mmap.mmap] = None
+        self._index_map: Optional[mmap.mmap] = None
+        self._data_size = 0
+
+        self.height = self._recover()
+
+    @classmethod
+    def _owns_file(cls, name: str) -> bool:
+        """Check whether a file name belongs to the store."""
+        return super()._owns_file(name) or name in (DATA_FILE, INDEX_FILE)
+
+    def append_block(self, block: Block) -> None:
+        """
+        Append a block to the store.
+
+        The record is written before its index entry, so a crash never
+        leaves an entry pointing past the data.
+
+        Args:
+            block: The next block of the chain
+
+        Raises:
+            ValueError: If the block does not directly follow the stored
+                ones, has been pruned or does not fit the binary format
+        """
+        self._check_next(block)
+        record = encode_block(block)
+        data, index = self._files()
+
+        data.seek(self._data_size)
+        data.write(record)
+        data.flush()
+        self._data_size += len(record)
+
+        index.seek(self.height * _ENTRY.size)
+        index.write(_ENTRY.pack(self._data_size, zlib.crc32(record)))
+        index.flush()
+
+        self._block_written()
+
+    def flush(self) -> None:
+        """Force appended blocks to disk, regardless of the sync mode."""
+        if self._data is not None and self._index is not None and self._unsynced:
+            os.fsync(self._data.fileno())
+            os.fsync(self._index.fileno())
+        self._unsynced = 0
+
+    def read_block(self, height: int) -> Block:
+        """
+        Decode the block at a height.
+
+        Args:
+            height: Height of the block
+
+        Returns:
+            The decoded block
+
+        Raises:
+            IndexError: If no block is stored at the height
+            ValueError: If the record fails its checksum
+        """
+        if not 0 <= height < self.height:
+            raise IndexError(f"No block at height {height}")
+
+        start, end, checksum = self._locate(height)
+        data = self._map_data(end)
+        if zlib.crc32(data[start:end]) != checksum:
+            raise ValueError(f"Block {height} is corrupt")
+        return decode_block(data, start)
+
+    def iter_blocks(self, start: int = 0) -> Iterator[Block]:
+        """
+        Iterate over the stored blocks in chain order.
+
+        Args:
+            start: Height of the first block to return
+
+        Yields:
+            Blocks decoded from the data file
+        """
+        for height in range(max(start, 0), self.height):
+            yield self.read_block(height)
+
+    def _load_chain(self) -> Sequence[Block]:
+        """Get the blocks to use as the chain of a loaded blockchain."""
+        return LazyChain(self.height, self.read_block, self.cache_size)
+
+    def close(self) -> None:
+        """Force appended blocks to disk, unmap the files and close them."""
+        if self._data is None or self._index is None:
+            return
+
+        self.flush()
+        for memory_map in (self._data_map, self._index_map):
+            if memory_map is not None:
+                memory_map.close()
+        self._data.close()
+        self._index.close()
+        self._data = self._index = None
+        self._data_map = self._index_map = None
+
+    def _files(self) -> Tuple[BinaryIO, BinaryIO]:
+        """The data and index files, which must still be open."""
+        if self._data is None or self._index is None:
+            raise ValueError(f"Block file {self.path} is closed")
+        return self._data, self._index
+
+    def _open_file(self, name: str) -> BinaryIO:
+        """Open one of the block files for reading and writing."""
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            open(path, "xb").close()
+        return open(path, "r+b")
+
+    def _recover(self) -> int:
+        """Drop a torn tail left by a crash and return the number of blocks."""
+        data, index = self._files()
+        data_size = os.fstat(data.fileno()).st_size
+        index_size = os.fstat(index.fileno()).st_size
+        height = index_size // _ENTRY.size
+
+        while height > 0:
+            end, checksum = self._read_entry(height - 1)
+            start = self._read_entry(height - 2)[0] if height > 1 else 0
+            if start <= end <= data_size:
+                data.seek(start)
+                if zlib.crc32(data.read(end - start)) == checksum:
+                    break
+            height -= 1
+
+        self._data_size = self._read_entry(height - 1)[0] if height else 0
+        if index_size != height * _ENTRY.size:
+            index.truncate(height * _ENTRY.size)
+        if data_size != self._data_size:
+            data.truncate(self._data_size)
+        return height
+
+    def _read_entry(self, height: int) -> Tuple[int, int]:
+        """Read an index entry straight from the file, during recovery."""
+        index = self._files()[1]
+        index.seek(height * _ENTRY.size)
+        return _ENTRY.unpack(index.read(_ENTRY.size))
+
+    def _locate(self, height: int) -> Tuple[int, int, int]:
+        """Start offset, end offset and checksum of a stored block."""
+        index = self._map_index((height + 1) * _ENTRY.size)
+        end, checksum = _ENTRY.unpack_from(index, height * _ENTRY.size)
+        start = (
+            _ENTRY.unpack_from(index, (height - 1) * _ENTRY.size)[0] if height else 0
+        )
+        return start, end, checksum
+
+    def _map_index(self, size: int) -> mmap.mmap:
+        """Get a map of the index file covering at least size bytes."""
+        if self._index_map is None or len(self._index_map) < size:
+            self._index_map = self._remap(self._files()[1], self._index_map)
+        return self._index_map
+
+    def _map_data(self, size: int) -> mmap.mmap:
+        """Get a map of the data file covering at least size bytes."""
+        if self._data_map is None or len(self._data_map) < size:
+            self._data_map = self._remap(self._files()[0], self._data_map)
+        return self._data_map
+
+    @staticmethod
+    def _remap(file: BinaryIO, memory_map: Optional[mmap.mmap]) -> mmap.mmap:
+        """Map the whole of a file again after it has grown."""
+        if memory_map is not None:
+            memory_map.close()
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,292 @@
+"""
+Block log storage for the SampleChain blockchain.
+
+This module contains the BlockLog class, which stores a chain as an
+append-only log of JSON lines split into segment files, next to small
+metadata, state and mempool files. Adding a block appends one line instead
+of rewriting the whole chain.
+"""
+
+import json
+import os
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+)
+
+from ..block import Block
+from ..blockchain import Blockchain
+from ..snapshot import StateSnapshot
+from ..stats import ChainTotals
+from ..transaction import Transaction
+from .base import SYNC_BATCH, SYNC_NEVER, initial_balances
+from .directory import SEGMENTS_LAYOUT, DirectoryStorage
+from .jsonstream import JSONStreamReader
+
+SEGMENT_PREFIX = "blocks-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def _segment_name(first_height: int) -> str:
+    """File name of the segment whose first block has the given height."""
+    return f"{SEGMENT_PREFIX}{first_height:010d}{SEGMENT_SUFFIX}"
+
+
+def _encode_line(data: Mapping[str, Any]) -> bytes:
+    """Encode a record as one compact JSON line."""
+    return (json.dumps(data, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class BlockLog(DirectoryStorage):
+    """
+    Append-only, segmented block log in a directory.
+
+    Each block is one JSON line in a segment file named after the height of
+    its first block; a new segment is started every segment_blocks blocks.
+    Balances, the mempool and syncing are handled as described in
+    DirectoryStorage.
+
+    Attributes:
+        path: Directory holding the log
+        sync: Sync mode for appended blocks
+        sync_interval: Blocks per fsync in "batch" mode
+        snapshot_interval: Blocks between automatic snapshots (0 for none)
+        keep_snapshots: Number of snapshots kept
+        segment_blocks: Maximum number of blocks per segment file
+        height: Number of blocks in the log
+    """
+
+    LAYOUT = SEGMENTS_LAYOUT
+
+    def __init__(
+        self,
+        path: str,
+        sync: str = SYNC_BATCH,
+        sync_interval: int = 64,
+        snapshot_interval: int = 1000,
+        keep_snapshots: int = 2,
+        segment_blocks: int = 10000,
+    ) -> None:
+        """
+        Open an existing block log.
+
+        A partially written last line, left by a crash during an append, is
+        truncated.
+
+        Args:
+            path: Directory holding the log
+            sync: Sync mode for appended blocks ("always", "batch" or "never")
+            sync_interval: Blocks per fsync in "batch" mode
+            snapshot_interval: Blocks between automatic snapshots (0 for none)
+            keep_snapshots: Number of snapshots kept
+            segment_blocks: Maximum number of blocks per new segment file
+
+        Raises:
+            FileNotFoundError: If the directory holds no block log
+            ValueError: If an option is invalid
+        """
+        if segment_blocks < 1:
+            raise ValueError("Segment size must be positive")
+        super().__init__(path, sync, sync_interval, snapshot_interval, keep_snapshots)
+
+        self.segment_blocks = segment_blocks
+        self._segments = self._find_segments()
+        self._file: Optional[BinaryIO] = None
+        self._segment_start = self._segments[-1] if self._segments else 0
+        self._segment_count = 0
+
+        if self._segments:
+            self._segment_count = self._recover_segment(self._segments[-1])
+        self.height = self._segment_start + self._segment_count
+
+    @classmethod
+    def _owns_file(cls, name: str) -> bool:
+        """Check whether a file name belongs to the log."""
+        return super()._owns_file(name) or (
+            name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def append_block(self, block: Block) -> None:
+        """
+        Append a block to the log.
+
+        Args:
+            block: The next block of the chain
+
+        Raises:
+            ValueError: If the block does not directly follow the log or has
+                been pruned
+        """
+        self._check_next(block)
+
+        if self._segment_count >= self.segment_blocks:
+            self.close()
+            self._segment_start = self.height
+            self._segment_count = 0
+
+        file = self._file if self._file is not None else self._open_segment()
+        file.write(_encode_line(block.to_dict()))
+        file.flush()
+        self._segment_count += 1
+        self._block_written()
+
+    def flush(self) -> None:
+        """Force appended blocks to disk, regardless of the sync mode."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def iter_blocks(self, start: int = 0) -> Iterator[Block]:
+        """
+        Iterate over the stored blocks in chain order.
+
+        Args:
+            start: Height of the first block to return
+
+        Yields:
+            Blocks decoded from the log
+        """
+        for i, first_height in enumerate(self._segments):
+            end = self._segments[i + 1] if i + 1 < len(self._segments) else self.height
+            if end <= start:
+                continue
+
+            with open(self._segment_path(first_height), "rb") as f:
+                for height, line in enumerate(f, first_height):
+                    if height >= end:
+                        break
+                    if height >= start:
+                        yield Block.from_dict(json.loads(line))
+
+    def _load_chain(self) -> Sequence[Block]:
+        """Get the blocks to use as the chain of a loaded blockchain."""
+        return list(self.iter_blocks())
+
+    def close(self) -> None:
+        """Force appended blocks to disk and close the open segment."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def _find_segments(self) -> List[int]:
+        """First heights of the segment files, in order."""
+        starts = []
+        first, last = len(SEGMENT_PREFIX), -len(SEGMENT_SUFFIX)
+        for name in os.listdir(self.path):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                starts.append(int(name[first:last]))
+        return sorted(starts)
+
+    def _segment_path(self, first_height: int) -> str:
+        """Path of a segment file."""
+        return os.path.join(self.path, _segment_name(first_height))
+
+    def _recover_segment(self, first_height: int) -> int:
+        """Truncate a torn last line and count the blocks in a segment."""
+        path = self._segment_path(first_height)
+        with open(path, "rb+") as f:
+            data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                f.truncate(complete)
+        return data.count(b"\n", 0, complete)
+
+    def _open_segment(self) -> BinaryIO:
+        """Open the current segment for appending, creating it if needed."""
+        new_file = not self._segments or self._segments[-1] != self._segment_start
+        if new_file:
+            self._segments.append(self._segment_start)
+
+        self._file = open(self._segment_path(self._segment_start), "ab")
+        if new_file and self.sync != SYNC_NEVER:
+            self._fsync_directory(self.path)
+        return self._file
+
+
+def convert_json_file(
+    source: str,
+    path: str,
+    overwrite: bool = False,
+    backend: Type[DirectoryStorage] = BlockLog,
+    **options: Any,
+) -> DirectoryStorage:
+    """
+    Convert a blockchain.json file into a directory store without loading it whole.
+
+    Blocks are streamed from the source file straight into the store, so
+    memory use is bounded by the largest block and the balance table.
+
+    Args:
+        source: File written by Blockchain.save_to_file()
+        path: Directory for the new store
+        overwrite: Replace an existing store in the directory
+        backend: Directory store class to write, BlockLog by default
+        **options: Options passed to the backend constructor
+
+    Returns:
+        The new store
+
+    Raises:
+        ValueError: If the source file is malformed or has pruned blocks
+    """
+    storage = backend._initialize(path, overwrite, **options)
+    try:
+        _convert_blocks(source, storage)
+    except BaseException:
+        storage.discard()
+        raise
+    return storage
+
+
+def _convert_blocks(source: str, storage: DirectoryStorage) -> None:
+    """Stream the blocks of a blockchain.json file into a new store."""
+    deltas: Dict[int, int] = {}
+    data: Dict[str, Any] = {}
+    tip: Optional[Block] = None
+    total_transactions = total_value = total_fees = 0
+
+    with open(source, "r") as f:
+        for key, value in JSONStreamReader(f).iter_object(array_keys=("chain",)):
+            if key == "chain":
+                block = Block.from_dict(value)
+                storage.append_block(block)
+                Blockchain.apply_block(deltas, block)
+                total_transactions += block.get_transaction_count()
+                total_value += block.get_transaction_total()
+                total_fees += block.get_total_fees()
+                tip = block
+            else:
+                data[key] = value
+
+    if tip is None:
+        raise ValueError(f"{source} holds no blocks")
+
+    # Round-trip the settings to apply the defaults of older files
+    blockchain = Blockchain.from_settings(data)
+    balances = {int(a): b for a, b in data.get("balances", {}).items()}
+
+    storage.write_state(
+        StateSnapshot(
+            height=storage.height,
+            tip_hash=tip.calculate_hash(),
+            difficulty=blockchain.difficulty,
+            target=blockchain.target,
+            balances=balances,
+            totals=ChainTotals(total_transactions, total_value, total_fees),
+        )
+    )
+    storage.write_mempool(
+        Transaction.from_dict(tx) for tx in data.get("pending_transactions", [])
+    )
+
+    # Settings and balances follow the chain in the source file, so the
+    # metadata, which completes the store, is written last
+    storage.write_meta(blockchain.get_settings(), initial_balances(balances, deltas))
@@ -0,0 +1,471 @@
+"""
+Directory storage for the SampleChain blockchain.
+
+This module contains the DirectoryStorage base class for stores that keep a
+chain as files in a directory. It manages the side files shared by every
+layout: JSON metadata and mempool files, and binary state snapshots.
+Subclasses decide how the blocks themselves are laid out.
+"""
+
+import json
+import os
+from abc import abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from ..block import Block
+from ..blockchain import Blockchain
+from ..snapshot import StateSnapshot
+from ..transaction import Transaction
+from .base import (
+    SYNC_ALWAYS,
+    SYNC_BATCH,
+    SYNC_MODES,
+    SYNC_NEVER,
+    StorageBackend,
+    initial_balances,
+    require_body,
+)
+
+META_FILE = "meta.json"
+# Stands in for the metadata while a store is created; the metadata is
+# written last, so an interrupted create never looks like a complete store
+PENDING_FILE = "meta.pending.json"
+MEMPOOL_FILE = "mempool.json"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".bin"
+
+LOG_FORMAT_VERSION = 1
+SEGMENTS_LAYOUT = "segments"
+
+
+def _snapshot_name(height: int) -> str:
+    """File name of the state snapshot at the given height."""
+    return f"{SNAPSHOT_PREFIX}{height:010d}{SNAPSHOT_SUFFIX}"
+
+
+class DirectoryStorage(StorageBackend):
+    """
+    Base class for stores kept as files in a directory.
+
+    Balances are checkpointed in binary state snapshots named after the
+    chain height they correspond to, written by Blockchain.save_state() and
+    every snapshot_interval blocks; the newest keep_snapshots are kept.
+    Pending transactions are kept in a mempool file. Loading starts from
+    the newest snapshot that matches the stored blocks and replays only the
+    blocks after it, so the snapshots can lag behind the blocks.
+
+    Appended blocks are flushed to the operating system immediately. How
+    often they are forced to disk depends on the sync mode:
+
+    - "always": fsync after every block
+    - "batch": group commit, fsync once every sync_interval blocks and
+      before each state checkpoint
+    - "never": leave it to the operating system
+
+    Attributes:
+        path: Directory holding the store
+        sync: Sync mode for appended blocks
+        sync_interval: Blocks per fsync in "batch" mode
+        snapshot_interval: Blocks between automatic snapshots (0 for none)
+        keep_snapshots: Number of snapshots kept
+        height: Number of stored blocks
+    """
+
+    # Stored in the metadata to tell directory layouts apart
+    LAYOUT = ""
+
+    def __init__(
+        self,
+        path: str,
+        sync: str = SYNC_BATCH,
+        sync_interval: int = 64,
+        snapshot_interval: int = 1000,
+        keep_snapshots: int = 2,
+    ) -> None:
+        """
+        Open an existing store.
+
+        Args:
+            path: Directory holding the store
+            sync: Sync mode for appended blocks ("always", "batch" or "never")
+            sync_interval: Blocks per fsync in "batch" mode
+            snapshot_interval: Blocks between automatic snapshots (0 for none)
+            keep_snapshots: Number of snapshots kept
+
+        Raises:
+            FileNotFoundError: If the directory holds no store of this layout
+            ValueError: If an option is invalid
+        """
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Sync mode must be one of {', '.join(SYNC_MODES)}")
+        if sync_interval < 1:
+            raise ValueError("Sync interval must be positive")
+        if snapshot_interval < 0 or keep_snapshots < 1:
+            raise ValueError("Invalid snapshot interval or count")
+        # A store being created only has its pending metadata
+        if self.LAYOUT not in (
+            self._read_layout(path, META_FILE),
+            self._read_layout(path, PENDING_FILE),
+        ):
+            raise FileNotFoundError(f"No {type(self).__name__} in {path}")
+
+        self.path = path
+        self.sync = sync
+        self.sync_interval = sync_interval
+        self.snapshot_interval = snapshot_interval
+        self.keep_snapshots = keep_snapshots
+        self.height = 0
+        self._unsynced = 0
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """
+        Check whether a directory holds a store of this layout.
+
+        Args:
+            path: Directory to check
+
+        Returns:
+            True if the directory has metadata written by this class
+        """
+        return cls._read_layout(path, META_FILE) == cls.LAYOUT
+
+    @staticmethod
+    def _read_layout(path: str, name: str) -> Optional[str]:
+        """Read the layout from a metadata file, or None if it is unreadable."""
+        try:
+            with open(os.path.join(path, name), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        layout: Optional[str] = meta.get("layout")
+        return layout
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        blockchain: Blockchain,
+        overwrite: bool = False,
+        **options: Any,
+    ) -> "DirectoryStorage":
+        """
+        Write a blockchain to a new store and attach the store to it.
+
+        Blocks added to the blockchain afterwards are appended to the store.
+
+        Args:
+            path: Directory for the store; created if missing
+            blockchain: The blockchain to store
+            overwrite: Replace an existing store in the directory
+            **options: Options passed to the constructor
+
+        Returns:
+            The opened store
+
+        Raises:
+            FileExistsError: If the directory already holds a store and
+                overwrite is False
+            ValueError: If the blockchain has pruned blocks
+        """
+        deltas: Dict[int, int] = {}
+        for block in blockchain.chain:
+            require_body(block)
+            Blockchain.apply_block(deltas, block)
+
+        storage = cls._initialize(path, overwrite, **options)
+        try:
+            for block in blockchain.chain:
+                storage.append_block(block)
+            storage.write_state(blockchain.get_snapshot())
+            storage.write_mempool(blockchain.pending_transactions)
+            storage.write_meta(
+                blockchain.get_settings(),
+                initial_balances(blockchain.balances, deltas),
+            )
+        except BaseException:
+            storage.discard()
+            raise
+
+        blockchain.storage = storage
+        return storage
+
+    @classmethod
+    def _initialize(
+        cls, path: str, overwrite: bool, **options: Any
+    ) -> "DirectoryStorage":
+        """
+        Create an empty store without metadata and open it.
+
+        The caller writes the metadata with write_meta() once the rest of
+        the store is complete, or calls discard() if it fails.
+        """
+        if os.path.isfile(os.path.join(path, META_FILE)) and not overwrite:
+            raise FileExistsError(f"Block storage already exists in {path}")
+
+        # Also clears the files of an earlier, interrupted create
+        os.makedirs(path, exist_ok=True)
+        cls._remove_files(path)
+        cls._write_json(
+            path,
+            PENDING_FILE,
+            {"format": LOG_FORMAT_VERSION, "layout": cls.LAYOUT},
+            fsync=True,
+        )
+
+        return cls(path, **options)
+
+    def discard(self) -> None:
+        """Close a store whose creation failed and delete its files."""
+        self.close()
+        self._remove_files(self.path)
+
+    @classmethod
+    def _remove_files(cls, path: str) -> None:
+        """Delete the files of a store, leaving other files alone."""
+        for name in os.listdir(path):
+            if cls._owns_file(name):
+                os.remove(os.path.join(path, name))
+
+    @classmethod
+    def _owns_file(cls, name: str) -> bool:
+        """Check whether a file name belongs to the store."""
+        return name in (META_FILE, PENDING_FILE, MEMPOOL_FILE) or (
+            name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)
+        )
+
+    def get_height(self) -> int:
+        """
+        Get the number of stored blocks.
+
+        Returns:
+            Number of blocks, including the genesis block
+        """
+        return self.height
+
+    def _block_written(self) -> None:
+        """Count an appended block and sync according to the sync mode."""
+        self.height += 1
+        self._unsynced += 1
+
+        if self.sync == SYNC_ALWAYS or (
+            self.sync == SYNC_BATCH and self._unsynced >= self.sync_interval
+        ):
+            self.flush()
+
+    def _check_next(self, block: Block) -> None:
+        """Ensure a block directly follows the stored ones and has its body."""
+        require_body(block)
+        if block.index != self.height:
+            raise ValueError(
+                f"Block {block.index} does not follow a chain of {self.height} blocks"
+            )
+
+    def write_meta(
+        self, settings: Mapping[str, Any], initial_balances: Mapping[int, int]
+    ) -> None:
+        """
+        Record the blockchain settings and the balances before the first block.
+
+        The initial balances let the blocks be replayed without a state file.
+        Writing the metadata completes a store being created.
+
+        Args:
+            settings: Dictionary produced by Blockchain.get_settings()
+            initial_balances: Balances before the genesis block was applied
+        """
+        meta = {
+            "format": LOG_FORMAT_VERSION,
+            "layout": self.LAYOUT,
+            "settings": dict(settings),
+            "initial_balances": {str(a): b for a, b in initial_balances.items()},
+        }
+        self._write_json(self.path, META_FILE, meta, fsync=True)
+
+        pending = os.path.join(self.path, PENDING_FILE)
+        if os.path.exists(pending):
+            os.remove(pending)
+
+    def needs_checkpoint(self, height: int) -> bool:
+        """
+        Check whether a snapshot is due after a block.
+
+        Args:
+            height: Number of blocks, including the one just appended
+
+        Returns:
+            True every snapshot_interval blocks
+        """
+        return self.snapshot_interval > 0 and height % self.snapshot_interval == 0
+
+    def write_state(self, snapshot: StateSnapshot) -> None:
+        """
+        Write a state snapshot and delete the ones beyond keep_snapshots.
+
+        Appended blocks are forced to disk first, so a snapshot never
+        refers to blocks that could be lost.
+
+        Args:
+            snapshot: State after the first snapshot.height blocks
+        """
+        self.flush()
+        self._write_file(
+            self.path,
+            _snapshot_name(snapshot.height),
+            snapshot.to_bytes(),
+            fsync=self.sync != SYNC_NEVER,
+        )
+
+        keep = self.keep_snapshots
+        for height in self._find_snapshots()[keep:]:
+            os.remove(os.path.join(self.path, _snapshot_name(height)))
+
+    def iter_snapshots(self) -> Iterator[StateSnapshot]:
+        """
+        Iterate over the readable snapshots, newest first.
+
+        Snapshots beyond the stored blocks, or whose checksum fails, are
+        skipped.
+
+        Yields:
+            Stored state snapshots
+        """
+        for height in self._find_snapshots():
+            if height > self.height:
+                continue
+            try:
+                with open(os.path.join(self.path, _snapshot_name(height)), "rb") as f:
+                    yield StateSnapshot.from_bytes(f.read())
+            except (OSError, ValueError):
+                continue
+
+    def write_mempool(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Replace the stored pending transactions.
+
+        Args:
+            transactions: Transactions waiting to be mined
+        """
+        data = {"pending_transactions": [tx.to_dict() for tx in transactions]}
+        self._write_json(self.path, MEMPOOL_FILE, data, fsync=self.sync != SYNC_NEVER)
+        self._cached_chain = None
+
+    def read_meta(self) -> Dict[str, Any]:
+        """
+        Read the store metadata.
+
+        Returns:
+            Dictionary with "layout", "settings" and "initial_balances"
+        """
+        meta: Dict[str, Any] = self._read_json(META_FILE)
+        return meta
+
+    def load_blockchain(self) -> Blockchain:
+        """
+        Load the stored blockchain and attach this store to it.
+
+        The state comes from the newest snapshot whose tip matches the
+        stored blocks, falling back to replaying every block from the
+        initial balances. Blocks after the snapshot are replayed on top,
+        and their transactions are dropped from the stored mempool.
+
+        Returns:
+            The loaded Blockchain instance
+        """
+        meta = self.read_meta()
+        mempool = self._read_json(MEMPOOL_FILE, default={"pending_transactions": []})
+        pending = [Transaction.from_dict(tx) for tx in mempool["pending_transactions"]]
+
+        blockchain = Blockchain.from_settings(meta["settings"])
+        chain = self._load_chain()
+
+        for snapshot in self._iter_checkpoints(meta, blockchain):
+            try:
+                blockchain.restore_snapshot(snapshot, chain, pending)
+                break
+            except ValueError:
+                continue
+
+        blockchain.storage = self
+        return blockchain
+
+    def _iter_checkpoints(
+        self, meta: Mapping[str, Any], blockchain: Blockchain
+    ) -> Iterator[StateSnapshot]:
+        """Candidate states to load from, newest first, ending at height 0."""
+        yield from self.iter_snapshots()
+
+        yield StateSnapshot(
+            height=0,
+            tip_hash="0" * 64,
+            difficulty=blockchain.difficulty,
+            target=blockchain.target,
+            balances={int(a): b for a, b in meta["initial_balances"].items()},
+        )
+
+    @abstractmethod
+    def _load_chain(self) -> Sequence[Block]:
+        """Get the blocks to use as the chain of a loaded blockchain."""
+
+    def _find_snapshots(self) -> List[int]:
+        """Heights of the snapshot files, newest first."""
+        heights = []
+        first, last = len(SNAPSHOT_PREFIX), -len(SNAPSHOT_SUFFIX)
+        for name in os.listdir(self.path):
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+                heights.append(int(name[first:last]))
+        return sorted(heights, reverse=True)
+
+    def _read_json(self, name: str, default: Any = ...) -> Any:
+        """Read one of the JSON side files of the store."""
+        try:
+            with open(os.path.join(self.path, name), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            if default is ...:
+                raise
+            return default
+
+    @classmethod
+    def _write_json(cls, path: str, name: str, data: Any, fsync: bool) -> None:
+        """Atomically replace one of the JSON side files of the store."""
+        encoded = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        cls._write_file(path, name, encoded, fsync)
+
+    @classmethod
+    def _write_file(cls, path: str, name: str, data: bytes, fsync: bool) -> None:
+        """Atomically replace one of the side files of the store."""
+        target = os.path.join(path, name)
+        temporary = target + ".tmp"
+
+        with open(temporary, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(temporary, target)
+        if fsync:
+            cls._fsync_directory(path)
+
+    @staticmethod
+    def _fsync_directory(path: str) -> None:
+        """Persist directory entries where the platform supports it."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return (
+            f"{type(self).__name__}(path={self.path!r}, height={self.height}, "
+            f"sync={self.sync!r})"
+        )
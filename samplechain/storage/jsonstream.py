@@ -0,0 +1,181 @@
+"""
+Streaming JSON reader for the SampleChain blockchain.
+
+This module reads the top-level object of a JSON document one member at a
+time, so arrays with millions of entries (such as the chain of a
+blockchain.json file) can be processed without loading the whole file.
+"""
+
+import json
+from typing import Any, Collection, Iterator, TextIO, Tuple
+
+_WHITESPACE = " \t\n\r"
+_CHUNK_SIZE = 1 << 16
+
+
+class JSONStreamReader:
+    """
+    Incremental reader over a JSON document in a text file.
+
+    The file is read in chunks, and only the chunk holding the value being
+    decoded is kept in memory. Values larger than a chunk are decoded once
+    enough of the file has been buffered to hold them.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = _CHUNK_SIZE) -> None:
+        """
+        Initialize a reader.
+
+        Args:
+            file: Text file positioned at the start of the document
+            chunk_size: Number of characters read from the file at a time
+        """
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._offset = 0  # Characters dropped from the front of the buffer
+        self._eof = False
+
+    def iter_object(
+        self, array_keys: Collection[str] = ()
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over the members of the top-level object.
+
+        Args:
+            array_keys: Keys whose array values are streamed element by
+                element instead of being decoded whole
+
+        Yields:
+            (key, value) for each member; for keys in array_keys, one
+            (key, element) pair per array element
+
+        Raises:
+            ValueError: If the document is not a JSON object or is malformed
+        """
+        for key, value, _, _ in self._iter_members(array_keys):
+            yield key, value
+
+    def iter_spans(
+        self, array_keys: Collection[str] = ()
+    ) -> Iterator[Tuple[str, int, int]]:
+        """
+        Iterate over the positions of the members of the top-level object.
+
+        Values are still parsed to find where they end, but are discarded,
+        so they can be decoded later from the recorded positions.
+
+        Args:
+            array_keys: Keys whose array values are reported element by
+                element instead of as a whole
+
+        Yields:
+            (key, start, end) character offsets of each value in the
+            document; for keys in array_keys, one triple per array element
+
+        Raises:
+            ValueError: If the document is not a JSON object or is malformed
+        """
+        for key, _, start, end in self._iter_members(array_keys):
+            yield key, start, end
+
+    def _iter_members(
+        self, array_keys: Collection[str]
+    ) -> Iterator[Tuple[str, Any, int, int]]:
+        """Decode the members of the top-level object with their offsets."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key, _, _ = self._decode()
+            if not isinstance(key, str):
+                raise ValueError("Object keys must be strings")
+            self._expect(":")
+
+            if key in array_keys:
+                for element in self._iter_array():
+                    yield (key,) + element
+            else:
+                yield (key,) + self._decode()
+
+            if self._next_char() == "}":
+                return
+            self._pos -= 1
+            self._expect(",")
+
+    def _iter_array(self) -> Iterator[Tuple[Any, int, int]]:
+        """Decode the elements of the array at the current position."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._decode()
+
+            if self._next_char() == "]":
+                return
+            self._pos -= 1
+            self._expect(",")
+
+    def _decode(self) -> Tuple[Any, int, int]:
+        """Decode the value at the current position, with its start and end offsets."""
+        self._peek()
+        start = self._offset + self._pos
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ValueError(f"Malformed JSON: {e}") from e
+                value, end = None, None
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end is not None and (end < len(self._buffer) or self._eof):
+                self._pos = end
+                return value, start, self._offset + end
+
+            self._fill(max(self._chunk_size, len(self._buffer) - self._pos))
+
+    def _expect(self, char: str) -> None:
+        """Consume a structural character."""
+        found = self._next_char()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected {char!r}, found {found!r}")
+
+    def _next_char(self) -> str:
+        """Consume and return the next non-whitespace character."""
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while (
+                self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE
+            ):
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if self._eof:
+                raise ValueError("Malformed JSON: unexpected end of document")
+
+            self._fill(self._chunk_size)
+
+    def _fill(self, size: int) -> None:
+        """Drop consumed input and read more of the file into the buffer."""
+        chunk = self._file.read(size)
+        consumed = self._pos
+        self._buffer = self._buffer[consumed:] + chunk
+        self._offset += consumed
+        self._pos = 0
+        if not chunk:
+            self._eof = True
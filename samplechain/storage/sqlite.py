@@ -0,0 +1,573 @@
+"""
+SQLite storage for the SampleChain blockchain.
+
+This module contains the SQLiteStorage class, which keeps blocks,
+transactions, balances and the mempool in indexed SQLite tables so single
+blocks, transactions, balances and address histories can be queried
+without loading the chain.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..block import Block
+from ..blockchain import Blockchain
+from ..index import DIRECTIONS, Location
+from ..mempool import Mempool
+from ..snapshot import StateSnapshot
+from ..transaction import Transaction
+from .base import (
+    SYNC_ALWAYS,
+    SYNC_BATCH,
+    SYNC_MODES,
+    SYNC_NEVER,
+    StorageBackend,
+    initial_balances,
+    require_body,
+)
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# PRAGMA synchronous level for each sync mode
+_SYNCHRONOUS = {SYNC_ALWAYS: "FULL", SYNC_BATCH: "NORMAL", SYNC_NEVER: "OFF"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    previous_hash TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    nonce INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL,
+    target TEXT,
+    version INTEGER NOT NULL,
+    merkle_root TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    height INTEGER NOT NULL REFERENCES blocks (height),
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    from_address INTEGER NOT NULL,
+    to_address INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    fee INTEGER NOT NULL,
+    timestamp INTEGER,
+    PRIMARY KEY (height, position)
+);
+CREATE INDEX IF NOT EXISTS transactions_hash ON transactions (hash);
+CREATE INDEX IF NOT EXISTS transactions_sender
+    ON transactions (from_address, height, position);
+CREATE INDEX IF NOT EXISTS transactions_recipient
+    ON transactions (to_address, height, position);
+CREATE TABLE IF NOT EXISTS balances (
+    address INTEGER PRIMARY KEY,
+    balance INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mempool (
+    position INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    from_address INTEGER NOT NULL,
+    to_address INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    fee INTEGER NOT NULL,
+    timestamp INTEGER
+);
+CREATE INDEX IF NOT EXISTS mempool_hash ON mempool (hash);
+"""
+
+_TX_COLUMNS = "from_address, to_address, value, fee, timestamp"
+
+# Filters selecting an address's transactions, per direction; "all" is the
+# union of both, which counts a transfer to oneself once
+_DIRECTION_FILTERS = {
+    "sent": ("from_address = :address",),
+    "received": ("to_address = :address",),
+    "all": ("from_address = :address", "to_address = :address"),
+}
+
+
+def _row_to_transaction(row: sqlite3.Row) -> Transaction:
+    """Build a transaction from a row holding the transaction columns."""
+    return Transaction(
+        from_address=row["from_address"],
+        to_address=row["to_address"],
+        value=row["value"],
+        fee=row["fee"],
+        timestamp=row["timestamp"],
+    )
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Blockchain store in a SQLite database.
+
+    Blocks and their transactions are stored relationally, with indexes on
+    block height and hash, transaction hash, and sender and recipient
+    address. Each appended block is written in a single SQLite transaction
+    together with the balance changes it makes, so the balances table is
+    always consistent with the stored blocks.
+
+    Attributes:
+        path: Database file
+        sync: Durability mode ("always", "batch" or "never"), mapped to
+            SQLite's synchronous setting
+    """
+
+    def __init__(self, path: str, sync: str = SYNC_BATCH) -> None:
+        """
+        Open an existing database.
+
+        Args:
+            path: Database file
+            sync: Durability mode ("always", "batch" or "never")
+
+        Raises:
+            FileNotFoundError: If the file is not a blockchain database
+            ValueError: If the sync mode is invalid
+        """
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Sync mode must be one of {', '.join(SYNC_MODES)}")
+        if not self.exists(path):
+            raise FileNotFoundError(f"No blockchain database at {path}")
+
+        self.path = path
+        self.sync = sync
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute(f"PRAGMA synchronous = {_SYNCHRONOUS[sync]}")
+
+        settings = self._get_meta("settings")
+        if settings is None:
+            self._connection.close()
+            raise FileNotFoundError(f"No blockchain database at {path}")
+        self._settings: Dict[str, Any] = json.loads(settings)
+        self._height: int = self._connection.execute(
+            "SELECT COUNT(*) FROM blocks"
+        ).fetchone()[0]
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """
+        Check whether a file is a SQLite database.
+
+        Args:
+            path: File to check
+
+        Returns:
+            True if the file starts with the SQLite header
+        """
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+        except OSError:
+            return False
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        blockchain: Blockchain,
+        overwrite: bool = False,
+        **options: Any,
+    ) -> "SQLiteStorage":
+        """
+        Write a blockchain to a new database and attach the database to it.
+
+        Args:
+            path: Database file; created if missing
+            blockchain: The blockchain to store
+            overwrite: Replace an existing file
+            **options: Options passed to the SQLiteStorage constructor
+
+        Returns:
+            The opened database
+
+        Raises:
+            FileExistsError: If the file exists and overwrite is False
+            ValueError: If the blockchain has pruned blocks
+        """
+        deltas: Dict[int, int] = {}
+        for block in blockchain.chain:
+            require_body(block)
+            Blockchain.apply_block(deltas, block)
+
+        if os.path.exists(path):
+            if not overwrite:
+                raise FileExistsError(f"File already exists: {path}")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+        with sqlite3.connect(path) as connection:
+            connection.executescript(_SCHEMA)
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('settings', ?)",
+                (json.dumps(blockchain.get_settings()),),
+            )
+            connection.executemany(
+                "INSERT INTO balances (address, balance) VALUES (?, ?)",
+                initial_balances(blockchain.balances, deltas).items(),
+            )
+        connection.close()
+
+        storage = cls(path, **options)
+        for block in blockchain.chain:
+            storage.append_block(block)
+        storage.write_mempool(blockchain.pending_transactions)
+
+        blockchain.storage = storage
+        return storage
+
+    def get_height(self) -> int:
+        """
+        Get the number of stored blocks.
+
+        Returns:
+            Number of blocks, including the genesis block
+        """
+        return self._height
+
+    def append_block(self, block: Block) -> None:
+        """
+        Store a block and apply its balance changes in one transaction.
+
+        Args:
+            block: The next block of the chain
+
+        Raises:
+            ValueError: If the block does not directly follow the database or
+                has been pruned
+        """
+        require_body(block)
+        if block.index != self._height:
+            raise ValueError(
+                f"Block {block.index} does not follow a chain of {self._height} blocks"
+            )
+
+        deltas: Dict[int, int] = {}
+        Blockchain.apply_block(deltas, block)
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO blocks (height, hash, previous_hash, timestamp, nonce, "
+                "difficulty, target, version, merkle_root) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    block.index,
+                    block.calculate_hash(),
+                    block.previous_hash,
+                    block.timestamp,
+                    block.nonce,
+                    block.difficulty,
+                    format(block.target, "x") if block.target is not None else None,
+                    block.version,
+                    block.get_merkle_root(),
+                ),
+            )
+            self._connection.executemany(
+                f"INSERT INTO transactions (height, position, hash, {_TX_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        block.index,
+                        position,
+                        tx.calculate_hash(),
+                        tx.from_address,
+                        tx.to_address,
+                        tx.value,
+                        tx.fee,
+                        tx.timestamp,
+                    )
+                    for position, tx in enumerate(block.transactions)
+                ),
+            )
+            self._connection.executemany(
+                "INSERT INTO balances (address, balance) VALUES (?, ?) "
+                "ON CONFLICT (address) "
+                "DO UPDATE SET balance = balance + excluded.balance",
+                deltas.items(),
+            )
+
+        self._height += 1
+
+    def write_state(self, snapshot: StateSnapshot) -> None:
+        """
+        Replace the stored balances unless they already match the snapshot height.
+
+        Balances are updated together with every appended block, so this
+        only writes when the caller's state differs from the stored blocks.
+
+        Args:
+            snapshot: State after the first snapshot.height blocks
+        """
+        if snapshot.height == self._height:
+            return
+
+        with self._connection:
+            self._connection.execute("DELETE FROM balances")
+            self._connection.executemany(
+                "INSERT INTO balances (address, balance) VALUES (?, ?)",
+                ((a, b) for a, b in snapshot.balances.items() if b),
+            )
+
+    def write_mempool(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Replace the stored pending transactions.
+
+        Args:
+            transactions: Transactions waiting to be mined
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM mempool")
+            self._connection.executemany(
+                f"INSERT INTO mempool (position, hash, {_TX_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        position,
+                        tx.calculate_hash(),
+                        tx.from_address,
+                        tx.to_address,
+                        tx.value,
+                        tx.fee,
+                        tx.timestamp,
+                    )
+                    for position, tx in enumerate(transactions)
+                ),
+            )
+
+    def iter_blocks(self, start: int = 0) -> Iterator[Block]:
+        """
+        Iterate over the stored blocks in chain order.
+
+        Args:
+            start: Height of the first block to return
+
+        Yields:
+            Stored blocks
+        """
+        rows = self._connection.execute(
+            "SELECT * FROM blocks WHERE height >= ? ORDER BY height", (max(start, 0),)
+        )
+        for row in rows:
+            yield self._row_to_block(row)
+
+    def load_blockchain(self) -> Blockchain:
+        """
+        Load the stored blockchain and attach this database to it.
+
+        Returns:
+            The loaded Blockchain instance
+        """
+        balances = {
+            row["address"]: row["balance"]
+            for row in self._connection.execute("SELECT * FROM balances")
+        }
+
+        blockchain = Blockchain.from_settings(self._settings)
+        blockchain.restore_state(
+            self.iter_blocks(), balances, self.get_pending_transactions()
+        )
+        blockchain.storage = self
+        return blockchain
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def get_balance(self, address: int) -> int:
+        """See Blockchain.get_balance()."""
+        row = self._connection.execute(
+            "SELECT balance FROM balances WHERE address = ?", (address,)
+        ).fetchone()
+        return row["balance"] if row is not None else 0
+
+    def get_block(self, height: int) -> Optional[Block]:
+        """See Blockchain.get_block()."""
+        row = self._connection.execute(
+            "SELECT * FROM blocks WHERE height = ?", (height,)
+        ).fetchone()
+        return self._row_to_block(row) if row is not None else None
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """See Blockchain.get_block_by_hash()."""
+        row = self._connection.execute(
+            "SELECT * FROM blocks WHERE hash = ?", (block_hash.lower(),)
+        ).fetchone()
+        return self._row_to_block(row) if row is not None else None
+
+    def get_transaction_by_hash(
+        self, tx_hash: str
+    ) -> Optional[Tuple[Transaction, Location]]:
+        """See Blockchain.get_transaction_by_hash()."""
+        row = self._connection.execute(
+            "SELECT * FROM transactions WHERE hash = ? "
+            "ORDER BY height, position LIMIT 1",
+            (tx_hash.lower(),),
+        ).fetchone()
+
+        if row is None:
+            return None
+        return _row_to_transaction(row), (row["height"], row["position"])
+
+    def get_pending_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        """See Blockchain.get_pending_transaction()."""
+        row = self._connection.execute(
+            f"SELECT {_TX_COLUMNS} FROM mempool WHERE hash = ?", (tx_hash.lower(),)
+        ).fetchone()
+        return _row_to_transaction(row) if row is not None else None
+
+    def get_pending_transactions(self) -> List[Transaction]:
+        """See Blockchain.get_pending_transactions()."""
+        rows = self._connection.execute(
+            f"SELECT {_TX_COLUMNS} FROM mempool ORDER BY position"
+        )
+        return [_row_to_transaction(row) for row in rows]
+
+    def query_transaction_history(
+        self,
+        address: int,
+        direction: str = "all",
+        limit: Optional[int] = None,
+        cursor: Optional[Location] = None,
+        newest_first: bool = True,
+    ) -> Tuple[List[Transaction], Optional[Location]]:
+        """See Blockchain.query_transaction_history()."""
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must be non-negative")
+
+        order = "DESC" if newest_first else "ASC"
+        comparison = "<" if newest_first else ">"
+        parameters: Dict[str, Any] = {"address": address, "limit": -1}
+
+        conditions = []
+        if cursor is not None:
+            conditions.append(
+                f"(height {comparison} :height OR "
+                f"(height = :height AND position {comparison} :position))"
+            )
+            parameters["height"], parameters["position"] = cursor
+        if limit is not None:
+            # One extra row tells whether another page follows
+            parameters["limit"] = limit + 1
+
+        rows = self._connection.execute(
+            f"{self._history_query(direction, conditions)} "
+            f"ORDER BY height {order}, position {order} LIMIT :limit",
+            parameters,
+        ).fetchall()
+
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit] if limit is not None else rows
+        next_cursor = (
+            (rows[-1]["height"], rows[-1]["position"]) if rows and has_more else None
+        )
+        return [_row_to_transaction(row) for row in rows], next_cursor
+
+    def count_transaction_history(self, address: int, direction: str = "all") -> int:
+        """See Blockchain.count_transaction_history()."""
+        count: int = self._connection.execute(
+            f"SELECT COUNT(*) FROM ({self._history_query(direction, [])})",
+            {"address": address},
+        ).fetchone()[0]
+        return count
+
+    def get_chain_stats(self, window: int = 10) -> Dict[str, Any]:
+        """See Blockchain.get_chain_stats()."""
+        totals = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(value), 0), COALESCE(SUM(fee), 0) "
+            "FROM transactions"
+        ).fetchone()
+        funded = self._connection.execute(
+            "SELECT COUNT(*) FROM balances WHERE balance > 0"
+        ).fetchone()[0]
+
+        # Timestamps and transaction counts of the last window + 1 blocks
+        recent = self._connection.execute(
+            "SELECT timestamp, (SELECT COUNT(*) FROM transactions t "
+            "WHERE t.height = b.height) AS count "
+            "FROM blocks b ORDER BY height DESC LIMIT ?",
+            (max(window, 0) + 1,),
+        ).fetchall()
+        intervals = len(recent) - 1
+        elapsed = recent[0]["timestamp"] - recent[-1]["timestamp"] if recent else 0
+        recent_transactions = sum(row["count"] for row in recent[:-1])
+
+        mempool = Mempool(
+            self.get_pending_transactions(),
+            max_transactions=self._settings.get("mempool_max_transactions"),
+            max_bytes=self._settings.get("mempool_max_bytes"),
+            allow_duplicates=self._settings.get("mempool_allow_duplicates", False),
+        )
+
+        return {
+            "total_blocks": self._height,
+            "total_transactions": totals[0],
+            "total_value_transferred": totals[1],
+            "total_fees": totals[2],
+            "pending_transactions": len(mempool),
+            "mempool": mempool.get_metrics(),
+            "difficulty": self._settings["difficulty"],
+            "mining_reward": self._settings["mining_reward"],
+            "total_addresses": funded,
+            "average_block_interval": elapsed / intervals if intervals > 0 else 0.0,
+            "transactions_per_second": (
+                recent_transactions / elapsed if intervals > 0 and elapsed > 0 else 0.0
+            ),
+        }
+
+    @staticmethod
+    def _history_query(direction: str, conditions: List[str]) -> str:
+        """Build the SELECT for an address's transactions in one direction."""
+        if direction not in _DIRECTION_FILTERS:
+            raise ValueError(f"Direction must be one of {', '.join(DIRECTIONS)}")
+
+        # Each branch of the union can use its own address index
+        return " UNION ".join(
+            f"SELECT height, position, {_TX_COLUMNS} FROM transactions "
+            f"WHERE {' AND '.join([address_filter] + conditions)}"
+            for address_filter in _DIRECTION_FILTERS[direction]
+        )
+
+    def _row_to_block(self, row: sqlite3.Row) -> Block:
+        """Build a block from its row and its transaction rows."""
+        transactions = [
+            _row_to_transaction(tx_row)
+            for tx_row in self._connection.execute(
+                f"SELECT {_TX_COLUMNS} FROM transactions WHERE height = ? "
+                "ORDER BY position",
+                (row["height"],),
+            )
+        ]
+
+        return Block(
+            index=row["height"],
+            transactions=transactions,
+            timestamp=row["timestamp"],
+            previous_hash=row["previous_hash"],
+            nonce=row["nonce"],
+            difficulty=row["difficulty"],
+            target=int(row["target"], 16) if row["target"] is not None else None,
+            version=row["version"],
+        )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        """Read a value from the meta table, if the table exists."""
+        try:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row["value"] if row is not None else None
+
+    def __repr__(self) -> str:
+        """Developer-friendly string representation."""
+        return f"SQLiteStorage(path={self.path!r}, height={self._height})"
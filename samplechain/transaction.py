@@ -51,6 +51,29 @@ class Transaction:
         if self.from_address == self.to_address and self.from_address != -1:
             raise ValueError("Cannot send transaction to the same address")
 
+    def get_digest(self) -> bytes:
+        """
+        Get the raw SHA256 digest of this transaction.
+
+        The digest is computed on first use and cached on the instance.
+        Transactions are frozen, so the cache can never go stale; it lives
+        outside the dataclass fields and does not affect equality or hashing.
+
+        Returns:
+            The 32-byte digest of the transaction data
+        """
+        digest = self.__dict__.get("_digest")
+
+        if digest is None:
+            transaction_string = (
+                f"{self.from_address},{self.to_address},"
+                f"{self.value},{self.fee},{self.timestamp}"
+            )
+            digest = hashlib.sha256(transaction_string.encode()).digest()
+            object.__setattr__(self, "_digest", digest)
+
+        return digest
+
     def calculate_hash(self) -> str:
         """
         Calculate the SHA256 hash of this transaction.
@@ -58,11 +81,27 @@ class Transaction:
         Returns:
             The hexadecimal hash string of the transaction data
         """
-        transaction_string = (
-            f"{self.from_address},{self.to_address},"
-            f"{self.value},{self.fee},{self.timestamp}"
-        )
-        return hashlib.sha256(transaction_string.encode()).hexdigest()
+        return self.get_digest().hex()
+
+    def get_canonical_encoding(self) -> bytes:
+        """
+        Get the canonical JSON encoding of this transaction.
+
+        This is ``to_dict()`` serialized with sorted keys and no whitespace,
+        as hashed by legacy blocks. It is cached like the digest.
+
+        Returns:
+            The encoded JSON bytes
+        """
+        encoding = self.__dict__.get("_encoding")
+
+        if encoding is None:
+            encoding = json.dumps(
+                self.to_dict(), sort_keys=True, separators=(",", ":")
+            ).encode()
+            object.__setattr__(self, "_encoding", encoding)
+
+        return encoding
 
     def to_dict(self) -> Dict[str, Any]:
         """
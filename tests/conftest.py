@@ -51,6 +51,57 @@ def genesis_block():
     return Block.create_genesis_block()
 
 
+def _build_chain(num_blocks=3, transfers=((0, None),), pending=False, **settings):
+    """
+    Mine the same transfers into each block of a new chain.
+
+    Every transfer moves the block height with a fee of 1 and its own
+    timestamp; block n is stamped 1000 + 10 * n. Address 99 mines.
+
+    Args:
+        num_blocks: Blocks mined after the genesis block
+        transfers: (sender, recipient) pairs of each block; a recipient of
+            None is the block height
+        pending: Leave a transfer from address 0 to 1 in the mempool
+        **settings: Blockchain arguments; by default addresses 0-2 start
+            with 1000 and the mining reward is 5
+    """
+    settings.setdefault("initial_balances", {0: 1000, 1: 1000, 2: 1000})
+    settings.setdefault("mining_reward", 5)
+    blockchain = Blockchain(**settings)
+    timestamp = 0
+
+    for height in range(1, num_blocks + 1):
+        for sender, recipient in transfers:
+            timestamp += 1
+            blockchain.add_transaction(
+                Transaction(
+                    from_address=sender,
+                    to_address=height if recipient is None else recipient,
+                    value=height,
+                    fee=1,
+                    timestamp=timestamp,
+                )
+            )
+        block = blockchain.mine_pending_transactions(
+            miner_address=99, block_size=len(transfers)
+        )
+        block.timestamp = 1000 + 10 * height
+        blockchain.add_block(block, skip_mining=True)
+
+    if pending:
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=1, value=3, timestamp=999)
+        )
+    return blockchain
+
+
+@pytest.fixture
+def build_chain():
+    """Provide a function building a chain of mined blocks, see _build_chain()."""
+    return _build_chain
+
+
 # Test data for original compatibility tests
 ORIGINAL_TEST_CASES = [
     {
@@ -0,0 +1,86 @@
+"""
+Tests for the BalanceOverlay class.
+"""
+
+from collections import defaultdict
+from samplechain.balances import BalanceOverlay
+from samplechain.blockchain import Blockchain
+from samplechain.transaction import Transaction
+
+
+class TestBalanceOverlay:
+    """Test cases for the BalanceOverlay class."""
+
+    def test_reads_through_to_base(self) -> None:
+        """Test unchanged addresses read from the base balances."""
+        overlay = BalanceOverlay({1: 100, 2: 50})
+
+        assert overlay[1] == 100
+        assert overlay.get(2, 0) == 50
+        assert overlay[3] == 0
+
+    def test_writes_stay_in_overlay(self) -> None:
+        """Test writes only touch the overlay until committed."""
+        base = {1: 100}
+        overlay = BalanceOverlay(base)
+
+        overlay[1] -= 30
+        overlay[2] += 30
+
+        assert overlay[1] == 70
+        assert overlay[2] == 30
+        assert base == {1: 100}
+        assert overlay.changes == {1: 70, 2: 30}
+
+    def test_commit_and_discard(self) -> None:
+        """Test committing applies changes and discarding drops them."""
+        base = {1: 100}
+        overlay = BalanceOverlay(base)
+
+        overlay[1] = 10
+        overlay.discard()
+        assert overlay[1] == 100
+
+        overlay[1] = 20
+        overlay[5] = 80
+        overlay.commit()
+        assert base == {1: 20, 5: 80}
+        assert overlay.changes == {}
+
+    def test_reads_do_not_populate_defaultdict(self) -> None:
+        """Test reading missing addresses leaves a defaultdict base untouched."""
+        base: defaultdict = defaultdict(int, {1: 5})
+        overlay = BalanceOverlay(base)
+
+        assert overlay[42] == 0
+        assert 42 not in base
+
+    def test_membership_checks_overlay_and_base(self) -> None:
+        """Test only addresses in the base or the overlay are members."""
+        overlay = BalanceOverlay({1: 5})
+        overlay[2] = 7
+
+        assert 1 in overlay
+        assert 2 in overlay
+        assert 3 not in overlay
+        assert overlay[3] == 0
+        assert 3 not in overlay
+
+    def test_iteration_covers_base_and_changes(self) -> None:
+        """Test the overlay behaves as a mapping of all addresses."""
+        overlay = BalanceOverlay({1: 5, 2: 6})
+        overlay[2] = 7
+        overlay[3] = 8
+
+        assert dict(overlay) == {1: 5, 2: 7, 3: 8}
+        assert len(overlay) == 3
+
+    def test_block_validation_leaves_ledger_untouched(self) -> None:
+        """Test validating a block does not modify the balances."""
+        blockchain = Blockchain(initial_balances={0: 100, 1: 0})
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=40))
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        balances_before = dict(blockchain.balances)
+
+        assert blockchain.is_block_valid(block, skip_mining=True)
+        assert dict(blockchain.balances) == balances_before
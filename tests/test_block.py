@@ -2,10 +2,18 @@
 Tests for the Block class.
 """
 
+import copy
+import hashlib
 import json
+import pickle
 import time
 import pytest
-from samplechain.block import Block
+from samplechain.block import (
+    BLOCK_VERSION_HEADER,
+    BLOCK_VERSION_LEGACY,
+    HEADER_SIZE,
+    Block,
+)
 from samplechain.transaction import Transaction
 
 
@@ -354,4 +362,205 @@ class TestBlock:
         block2 = Block(index=1, transactions=[tx2, tx1])
         
         # Different order should produce different Merkle roots
-        assert block1.get_merkle_root() != block2.get_merkle_root()
\ No newline at end of file
+        assert block1.get_merkle_root() != block2.get_merkle_root()
+
+    def test_target_overrides_difficulty(self) -> None:
+        """Test an explicit target replaces the hex-digit rule."""
+        block = Block(index=1, transactions=[], difficulty=4, target=1 << 250)
+
+        assert block.get_target() == 1 << 250
+        assert block.is_hash_valid("03" + "f" * 62) is True
+        assert block.is_hash_valid("04" + "0" * 62) is False
+
+    def test_difficulty_target_matches_hex_prefix(self) -> None:
+        """Test blocks without a target still validate by leading zeros."""
+        block = Block(index=1, transactions=[], difficulty=3)
+
+        assert block.get_target() == 16**61
+        assert block.is_hash_valid("000" + "f" * 61) is True
+        assert block.is_hash_valid("001" + "0" * 61) is False
+
+    def test_invalid_target(self) -> None:
+        """Test that out-of-range targets raise ValueError."""
+        with pytest.raises(ValueError, match="Target must be between"):
+            Block(index=1, transactions=[], target=0)
+
+    def test_round_trip_dict_with_target(self) -> None:
+        """Test targets survive dictionary serialization."""
+        original = Block(index=1, transactions=[], timestamp=1640995200, target=12345)
+
+        data = original.to_dict()
+        reconstructed = Block.from_dict(data)
+
+        assert data["target"] == "3039"
+        assert reconstructed.target == 12345
+        assert reconstructed.calculate_hash() == original.calculate_hash()
+
+    def test_header_block_hash_covers_fixed_size_header(self) -> None:
+        """Test header blocks hash a fixed-size header."""
+        small = Block(index=1, transactions=[], timestamp=1640995200, version=2)
+        large = Block(
+            index=1,
+            transactions=[
+                Transaction(from_address=i, to_address=i + 1, value=1)
+                for i in range(200)
+            ],
+            timestamp=1640995200,
+            version=2,
+        )
+
+        assert len(small.get_header()) == HEADER_SIZE
+        assert len(large.get_header()) == HEADER_SIZE
+        assert small.calculate_hash() == hashlib.sha256(small.get_header()).hexdigest()
+
+    def test_header_block_commits_to_transactions(self) -> None:
+        """Test changing a transaction changes the header block hash."""
+        tx = Transaction(from_address=0, to_address=1, value=10)
+        block = Block(index=1, transactions=[tx], timestamp=1640995200, version=2)
+        original_hash = block.calculate_hash()
+
+        block.transactions = [Transaction(from_address=0, to_address=1, value=11)]
+
+        assert block.calculate_hash() != original_hash
+
+    def test_legacy_block_has_no_header(self) -> None:
+        """Test legacy blocks keep their format and reject get_header."""
+        block = Block(index=1, transactions=[], timestamp=1640995200)
+
+        assert block.version == BLOCK_VERSION_LEGACY
+        assert "version" not in block.to_dict()
+        with pytest.raises(ValueError):
+            block.get_header()
+
+    def test_round_trip_dict_with_version(self) -> None:
+        """Test block versions survive dictionary serialization."""
+        original = Block(
+            index=1,
+            transactions=[],
+            timestamp=1640995200,
+            nonce=7,
+            version=BLOCK_VERSION_HEADER,
+        )
+
+        reconstructed = Block.from_dict(original.to_dict())
+
+        assert reconstructed.version == BLOCK_VERSION_HEADER
+        assert reconstructed.calculate_hash() == original.calculate_hash()
+
+    def test_invalid_version(self) -> None:
+        """Test that unknown block versions raise ValueError."""
+        with pytest.raises(ValueError, match="Unsupported block version"):
+            Block(index=1, transactions=[], version=99)
+
+    def test_legacy_hash_format_is_stable(self) -> None:
+        """Test legacy block hashes match the original string preimage."""
+        txs = [
+            Transaction(from_address=i, to_address=i + 1, value=5, fee=1)
+            for i in range(3)
+        ]
+        block = Block(index=2, transactions=txs, timestamp=1640995200, nonce=42)
+
+        transactions_str = json.dumps(
+            [tx.to_dict() for tx in txs], sort_keys=True, separators=(",", ":")
+        )
+        preimage = f"2:1640995200:{'0' * 64}:42:{transactions_str}"
+
+        assert block.calculate_hash() == hashlib.sha256(preimage.encode()).hexdigest()
+
+    def test_hash_cache_invalidated_on_assignment(self) -> None:
+        """Test assigning hashed fields recomputes the hash."""
+        block = Block(index=1, transactions=[], timestamp=1640995200)
+        original_hash = block.calculate_hash()
+
+        block.nonce = 5
+        nonce_hash = block.calculate_hash()
+        block.timestamp += 1
+
+        assert nonce_hash != original_hash
+        assert block.calculate_hash() not in (original_hash, nonce_hash)
+
+        block.nonce = 0
+        block.timestamp -= 1
+        assert block.calculate_hash() == original_hash
+
+    @pytest.mark.parametrize("version", [BLOCK_VERSION_LEGACY, BLOCK_VERSION_HEADER])
+    def test_hash_cache_invalidated_on_transaction_mutation(self, version: int) -> None:
+        """Test in-place changes to the transaction list recompute hashes."""
+        tx1 = Transaction(from_address=1, to_address=2, value=10, timestamp=1)
+        tx2 = Transaction(from_address=2, to_address=3, value=5, timestamp=1)
+        block = Block(
+            index=1, transactions=[tx1], timestamp=1640995200, version=version
+        )
+        reference = Block(
+            index=1, transactions=[tx1, tx2], timestamp=1640995200, version=version
+        )
+        original_hash = block.calculate_hash()
+        original_root = block.get_merkle_root()
+
+        block.transactions.append(tx2)
+
+        assert block.get_merkle_root() == reference.get_merkle_root() != original_root
+        assert block.calculate_hash() == reference.calculate_hash() != original_hash
+
+        del block.transactions[1]
+        assert block.calculate_hash() == original_hash
+
+    def test_frozen_block_rejects_changes(self) -> None:
+        """Test frozen blocks refuse to change hashed fields."""
+        tx = Transaction(from_address=1, to_address=2, value=10)
+        block = Block(index=1, transactions=[tx])
+        block_hash = block.calculate_hash()
+        block.freeze()
+
+        assert block.is_frozen()
+        with pytest.raises(AttributeError):
+            block.nonce = 1
+        with pytest.raises(AttributeError):
+            block.transactions.append(tx)
+        assert block.calculate_hash() == block_hash
+
+        copied = block.copy()
+        copied.nonce = 1
+        assert not copied.is_frozen()
+        assert copied.calculate_hash() != block_hash
+
+    @pytest.mark.parametrize("version", [BLOCK_VERSION_LEGACY, BLOCK_VERSION_HEADER])
+    def test_pickle_round_trip(self, version: int) -> None:
+        """Test unpickled blocks keep their transactions and track changes."""
+        tx = Transaction(from_address=1, to_address=2, value=10, timestamp=1)
+        block = Block(index=1, transactions=[tx], timestamp=1640995200, version=version)
+        block_hash = block.calculate_hash()
+
+        restored = pickle.loads(pickle.dumps(block))
+
+        assert restored == block
+        assert restored.calculate_hash() == block_hash
+        restored.transactions.append(tx)
+        assert restored.calculate_hash() != block_hash
+        assert block.calculate_hash() == block_hash
+
+    @pytest.mark.parametrize("copier", [copy.copy, copy.deepcopy])
+    def test_copies_own_their_transaction_list(self, copier) -> None:
+        """Test changing a copy's transactions only invalidates the copy."""
+        tx = Transaction(from_address=1, to_address=2, value=10, timestamp=1)
+        block = Block(index=1, transactions=[tx], timestamp=1640995200)
+        block_hash = block.calculate_hash()
+
+        copied = copier(block)
+        copied.transactions.append(tx)
+
+        assert copied.transactions is not block.transactions
+        assert len(block.transactions) == 1
+        expected = Block(index=1, transactions=[tx, tx], timestamp=1640995200)
+        assert copied.calculate_hash() == expected.calculate_hash()
+        assert block.calculate_hash() == block_hash
+
+    def test_cache_does_not_affect_equality(self) -> None:
+        """Test cached hashes and freezing do not change equality."""
+        block1 = Block(index=1, transactions=[], timestamp=1640995200)
+        block2 = Block(index=1, transactions=[], timestamp=1640995200)
+
+        block1.calculate_hash()
+        block1.freeze()
+
+        assert block1 == block2
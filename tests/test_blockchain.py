@@ -2,11 +2,13 @@
 Tests for the Blockchain class.
 """
 
+import json
 import os
 import tempfile
 import pytest
 from samplechain.blockchain import Blockchain, InvalidTransactionError, InvalidBlockError
 from samplechain.block import Block
+from samplechain.lazy import LazyChain
 from samplechain.transaction import Transaction
 
 
@@ -426,4 +428,169 @@ class TestBlockchain:
         
         assert len(blockchain.chain) > 1  # Should have more than genesis
         assert len(blockchain.pending_transactions) < 5  # Some transactions should be processed
-        assert blockchain.get_balance(99) > 0  # Miner should have rewards
\ No newline at end of file
+        assert blockchain.get_balance(99) > 0  # Miner should have rewards
+
+    def test_target_blockchain_round_trip(self) -> None:
+        """Test blockchains with an integer target mine and persist it."""
+        blockchain = Blockchain(initial_balances={0: 100}, target=1 << 250)
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=5))
+
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        assert block.target == 1 << 250
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            loaded = Blockchain.load_from_file(filename)
+            assert loaded.target == 1 << 250
+        finally:
+            os.unlink(filename)
+
+    def test_lazy_load_decodes_blocks_on_access(self) -> None:
+        """Test lazily loaded chains match eager ones and decode blocks on demand."""
+        blockchain = Blockchain(initial_balances={0: 1000}, target=1 << 250)
+        for i in range(1, 6):
+            blockchain.add_transaction(
+                Transaction(from_address=0, to_address=i, value=i, fee=1)
+            )
+            blockchain.add_block(
+                blockchain.mine_pending_transactions(99), skip_mining=True
+            )
+        blockchain.add_transaction(Transaction(from_address=0, to_address=9, value=7))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.json")
+            blockchain.save_to_file(filename)
+
+            loaded = Blockchain.load_from_file(filename, lazy=True, cache_size=2)
+
+            assert isinstance(loaded.chain, LazyChain)
+            assert loaded.chain.cache_info() == 0
+            assert loaded.get_balance(0) == blockchain.get_balance(0)
+            assert (
+                loaded.get_pending_transactions()
+                == blockchain.get_pending_transactions()
+            )
+            assert (
+                loaded.get_latest_block().calculate_hash()
+                == blockchain.get_latest_block().calculate_hash()
+            )
+            assert loaded.chain.cache_info() == 1
+
+            eager = Blockchain.load_from_file(filename)
+            assert [b.calculate_hash() for b in loaded.chain] == [
+                b.calculate_hash() for b in eager.chain
+            ]
+            assert loaded.chain.cache_info() == 2
+            assert loaded.get_chain_stats() == eager.get_chain_stats()
+            assert loaded.is_chain_valid()
+
+            loaded.close()
+            with pytest.raises(ValueError):
+                loaded.chain[1]
+
+    def test_lazy_load_uses_saved_totals(self) -> None:
+        """Test statistics of a lazily loaded file come from its saved totals."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        for i in range(1, 6):
+            blockchain.add_transaction(
+                Transaction(from_address=0, to_address=i, value=i, fee=1)
+            )
+            blockchain.add_block(
+                blockchain.mine_pending_transactions(99), skip_mining=True
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.json")
+            blockchain.save_to_file(filename)
+
+            loaded = Blockchain.load_from_file(filename, lazy=True)
+
+            assert loaded.get_chain_stats(window=1) == blockchain.get_chain_stats(
+                window=1
+            )
+            assert loaded.chain.cache_info() <= 2
+
+    def test_lazy_chain_survives_saving_over_its_file(self) -> None:
+        """Test saving over the source file does not disturb a lazy chain."""
+        blockchain = Blockchain(initial_balances={0: 100})
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=5))
+        blockchain.add_block(blockchain.mine_pending_transactions(99), skip_mining=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.json")
+            blockchain.save_to_file(filename)
+
+            loaded = Blockchain.load_from_file(filename, lazy=True, cache_size=0)
+            loaded.add_transaction(Transaction(from_address=1, to_address=2, value=2))
+            loaded.add_block(loaded.mine_pending_transactions(99), skip_mining=True)
+            loaded.save_to_file(filename)
+
+            assert (
+                loaded.chain[1].calculate_hash() == blockchain.chain[1].calculate_hash()
+            )
+            reloaded = Blockchain.load_from_file(filename, lazy=True)
+            assert len(reloaded.chain) == 3
+            assert reloaded.get_balance(2) == 2
+            assert reloaded.is_chain_valid()
+
+    def test_lazy_load_rejects_malformed_files(self) -> None:
+        """Test malformed files raise ValueError when loaded lazily."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.json")
+            with open(filename, "w") as f:
+                f.write('{"chain": [{"index": 0}')
+
+            with pytest.raises(ValueError):
+                Blockchain.load_from_file(filename, lazy=True)
+
+    def test_new_chains_use_header_blocks(self) -> None:
+        """Test new blockchains create header-format blocks."""
+        blockchain = Blockchain(initial_balances={0: 100})
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=5))
+
+        block = blockchain.mine_pending_transactions(miner_address=99)
+
+        assert blockchain.get_latest_block().version == 2
+        assert block.version == 2
+
+    def test_load_legacy_file_keeps_legacy_blocks(self) -> None:
+        """Test files without a block version load as legacy chains."""
+        blockchain = Blockchain(initial_balances={0: 100}, block_version=1)
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=5))
+        blockchain.add_block(blockchain.mine_pending_transactions(99), skip_mining=True)
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            with open(filename) as f:
+                data = json.load(f)
+            del data["block_version"]
+            with open(filename, "w") as f:
+                json.dump(data, f)
+
+            loaded = Blockchain.load_from_file(filename)
+
+            assert loaded.block_version == 1
+            assert all(block.version == 1 for block in loaded.chain)
+            assert loaded.is_chain_valid()
+            assert loaded.mine_pending_transactions(99) is None
+        finally:
+            os.unlink(filename)
+
+    def test_accepted_blocks_are_frozen(self) -> None:
+        """Test blocks are frozen once added to the chain."""
+        blockchain = Blockchain(initial_balances={0: 100})
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=5))
+        block = blockchain.mine_pending_transactions(miner_address=99)
+
+        assert not block.is_frozen()
+        blockchain.add_block(block, skip_mining=True)
+
+        assert all(b.is_frozen() for b in blockchain.chain)
+        with pytest.raises(AttributeError):
+            block.nonce += 1
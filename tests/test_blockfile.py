@@ -0,0 +1,295 @@
+"""
+Tests for the memory-mapped block file storage and the lazy chain.
+"""
+
+import json
+import os
+import tempfile
+from typing import Callable
+import pytest
+from samplechain.block import Block
+from samplechain.blockchain import Blockchain
+from samplechain.lazy import LazyChain
+from samplechain.storage import BlockFile, BlockLog, convert_json_file, open_storage
+from samplechain.storage.blockfile import (
+    DATA_FILE,
+    INDEX_FILE,
+    decode_block,
+    encode_block,
+)
+from samplechain.storage.directory import LOG_FORMAT_VERSION, META_FILE
+from samplechain.transaction import Transaction
+
+
+@pytest.fixture
+def store_dir():
+    """Provide an empty directory for a block file."""
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "chain")
+
+
+class TestBlockEncoding:
+    """Test cases for the binary block records."""
+
+    def test_round_trip(self) -> None:
+        """Test every block field survives encoding."""
+        block = Block(
+            index=7,
+            transactions=[
+                Transaction(
+                    from_address=-1, to_address=3, value=50, fee=0, timestamp=None
+                ),
+                Transaction(
+                    from_address=1, to_address=2, value=5, fee=2, timestamp=123
+                ),
+            ],
+            timestamp=1700000000,
+            previous_hash="ab" * 32,
+            nonce=2**63,
+            difficulty=3,
+            target=2**256,
+            version=2,
+        )
+
+        decoded = decode_block(b"xx" + encode_block(block), 2)
+
+        assert decoded == block
+        assert decoded.calculate_hash() == block.calculate_hash()
+
+    def test_rejects_out_of_range_fields(self) -> None:
+        """Test fields the format cannot hold are rejected."""
+        with pytest.raises(ValueError):
+            encode_block(Block(index=1, transactions=[], nonce=2**64))
+        with pytest.raises(ValueError):
+            encode_block(Block(index=1, transactions=[], previous_hash="AB" * 32))
+        with pytest.raises(ValueError):
+            decode_block(encode_block(Block(index=1, transactions=[]))[:-1])
+
+
+class TestBlockFile:
+    """Test cases for the BlockFile class."""
+
+    def test_create_and_load_round_trip(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a stored blockchain loads back identically."""
+        blockchain = build_chain(num_blocks=5, pending=True)
+        BlockFile.create(store_dir, blockchain).close()
+
+        with BlockFile(store_dir) as storage:
+            loaded = storage.load_blockchain()
+
+            assert [b.calculate_hash() for b in loaded.chain] == [
+                b.calculate_hash() for b in blockchain.chain
+            ]
+            assert dict(loaded.balances) == {
+                a: b for a, b in blockchain.balances.items() if b
+            }
+            assert list(loaded.pending_transactions) == list(
+                blockchain.pending_transactions
+            )
+            assert loaded.get_chain_stats() == blockchain.get_chain_stats()
+            assert loaded.is_chain_valid()
+
+    def test_blocks_are_decoded_on_demand(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test loading decodes only the tip and indexing only the block used."""
+        blockchain = build_chain(num_blocks=20, pending=True)
+        BlockFile.create(store_dir, blockchain).close()
+
+        storage = BlockFile(store_dir, cache_size=4)
+        loaded = storage.load_blockchain()
+
+        assert isinstance(loaded.chain, LazyChain)
+        # Only the tip is decoded, to check it matches the state snapshot
+        assert len(loaded.chain) == 21
+        assert loaded.chain.cache_info() == 1
+
+        assert (
+            loaded.chain[13].calculate_hash() == blockchain.chain[13].calculate_hash()
+        )
+        assert loaded.chain.cache_info() == 2
+
+        for block in loaded.chain:
+            assert block.is_frozen()
+        assert loaded.chain.cache_info() == 4
+        storage.close()
+
+    def test_statistics_do_not_decode_the_chain(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test chain statistics come from the snapshot, not a scan of the blocks."""
+        blockchain = build_chain(num_blocks=20, pending=True)
+        BlockFile.create(store_dir, blockchain).close()
+
+        storage = BlockFile(store_dir, cache_size=30)
+        loaded = storage.load_blockchain()
+
+        assert loaded.get_chain_stats(window=2) == blockchain.get_chain_stats(window=2)
+        # At most the two blocks before the tip are read
+        assert loaded.chain.cache_info() <= 3
+        storage.close()
+
+    def test_added_blocks_are_appended(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test blocks added after loading are written and read back."""
+        BlockFile.create(store_dir, build_chain(num_blocks=2, pending=True)).close()
+
+        storage = BlockFile(store_dir)
+        loaded = storage.load_blockchain()
+        loaded.add_transaction(
+            Transaction(from_address=0, to_address=4, value=9, timestamp=50)
+        )
+        block = loaded.mine_pending_transactions(miner_address=7)
+        loaded.add_block(block, skip_mining=True)
+
+        assert storage.get_height() == 4
+        assert storage.read_block(3).calculate_hash() == block.calculate_hash()
+        assert loaded.get_balance(4) == 9
+        loaded.save_state()
+        storage.close()
+
+        reloaded = BlockFile(store_dir).load_blockchain()
+        assert reloaded.get_latest_block().calculate_hash() == block.calculate_hash()
+        assert reloaded.get_balance(7) == loaded.get_balance(7)
+        assert reloaded.is_chain_valid()
+
+    @pytest.mark.parametrize("damage", ["torn_record", "torn_entry", "corrupt_record"])
+    def test_damaged_tail_is_dropped(
+        self, store_dir: str, damage: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test an interrupted append is rolled back to the last whole block."""
+        blockchain = build_chain(num_blocks=3, pending=True)
+        BlockFile.create(store_dir, blockchain).close()
+        data_path = os.path.join(store_dir, DATA_FILE)
+        index_path = os.path.join(store_dir, INDEX_FILE)
+
+        if damage == "torn_record":
+            with open(data_path, "r+b") as f:
+                f.truncate(os.path.getsize(data_path) - 5)
+        elif damage == "torn_entry":
+            with open(index_path, "r+b") as f:
+                f.truncate(os.path.getsize(index_path) - 3)
+        else:
+            with open(data_path, "r+b") as f:
+                f.seek(-1, os.SEEK_END)
+                f.write(b"\xff")
+
+        with BlockFile(store_dir) as storage:
+            assert storage.get_height() == 3
+            loaded = storage.load_blockchain()
+            assert (
+                loaded.get_latest_block().calculate_hash()
+                == blockchain.chain[2].calculate_hash()
+            )
+            # The checkpoint is ahead of the blocks, so they are replayed
+            expected = build_chain(num_blocks=2, pending=True).balances
+            assert dict(loaded.balances) == {a: b for a, b in expected.items() if b}
+            assert loaded.is_chain_valid()
+
+    def test_read_outside_chain(self, store_dir: str) -> None:
+        """Test heights outside the chain are rejected."""
+        with BlockFile.create(store_dir, Blockchain()) as storage:
+            with pytest.raises(IndexError):
+                storage.read_block(1)
+            assert storage.get_block(1) is None
+            assert storage.get_block(0).index == 0
+
+    def test_layouts_are_told_apart(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a block file directory is not opened as a block log."""
+        BlockFile.create(store_dir, build_chain(num_blocks=1, pending=True)).close()
+
+        assert BlockFile.exists(store_dir)
+        assert not BlockLog.exists(store_dir)
+        with pytest.raises(FileNotFoundError):
+            BlockLog(store_dir)
+
+        storage = open_storage(store_dir)
+        assert isinstance(storage, BlockFile)
+        storage.close()
+
+    def test_metadata_without_layout_is_not_a_store(self, store_dir: str) -> None:
+        """Test a directory whose metadata names no layout is not opened."""
+        os.makedirs(store_dir)
+        with open(os.path.join(store_dir, META_FILE), "w") as f:
+            json.dump({"format": LOG_FORMAT_VERSION}, f)
+
+        assert not BlockLog.exists(store_dir)
+        assert not BlockFile.exists(store_dir)
+        assert open_storage(store_dir) is None
+        with pytest.raises(FileNotFoundError):
+            BlockLog(store_dir)
+
+    def test_conversion_from_json_file(
+        self, store_dir: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a JSON file is streamed into a block file."""
+        blockchain = build_chain(num_blocks=5, pending=True)
+        source = store_dir + ".json"
+        blockchain.save_to_file(source)
+
+        with convert_json_file(source, store_dir, backend=BlockFile) as storage:
+            assert isinstance(storage, BlockFile)
+            loaded = storage.load_blockchain()
+            assert dict(loaded.balances) == {
+                a: b for a, b in blockchain.balances.items() if b
+            }
+            assert (
+                loaded.get_latest_block().calculate_hash()
+                == blockchain.get_latest_block().calculate_hash()
+            )
+
+
+class TestLazyChain:
+    """Test cases for the LazyChain class."""
+
+    def test_sequence_access(self) -> None:
+        """Test indexing, slicing and appending behave like a list."""
+        blocks = [Block(index=i, transactions=[], timestamp=i) for i in range(5)]
+        loads = []
+
+        def load(height: int) -> Block:
+            loads.append(height)
+            return blocks[height].copy()
+
+        chain = LazyChain(5, load, cache_size=2)
+        assert chain[-1].index == 4
+        assert [b.index for b in chain[1:4]] == [1, 2, 3]
+        assert chain[3] is chain[3]
+        assert loads == [4, 1, 2, 3]
+
+        extra = Block(index=5, transactions=[])
+        chain.append(extra)
+        assert len(chain) == 6
+        assert chain[-1] is extra
+
+        with pytest.raises(IndexError):
+            chain[6]
+        with pytest.raises(TypeError):
+            chain[0] = extra
+        with pytest.raises(TypeError):
+            del chain[0]
+        with pytest.raises(TypeError):
+            chain.insert(0, extra)
+
+    def test_close_releases_source(self) -> None:
+        """Test closing drops the cache and releases the source exactly once."""
+        blocks = [Block(index=i, transactions=[], timestamp=i) for i in range(3)]
+        released = []
+
+        with LazyChain(
+            3,
+            lambda height: blocks[height].copy(),
+            release=lambda: released.append(True),
+        ) as chain:
+            chain[1]
+            assert chain.cache_info() == 1
+
+        assert released == [True]
+        assert chain.cache_info() == 0
+        chain.close()
+        assert released == [True]
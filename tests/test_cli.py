@@ -0,0 +1,89 @@
+"""
+Tests for the command-line interface.
+"""
+
+import os
+import tempfile
+import time
+import pytest
+from click.testing import CliRunner
+from samplechain.blockchain import Blockchain
+from samplechain.cli import cli
+from samplechain.transaction import Transaction
+
+
+@pytest.fixture
+def chain_file():
+    """Provide a path for a new JSON chain file."""
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "blockchain.json")
+
+
+def run(chain_file: str, *args: str) -> str:
+    """Run a CLI command against a chain and return its output."""
+    result = CliRunner().invoke(cli, ["--blockchain-file", chain_file, *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+class TestCli:
+    """Test cases for the CLI commands."""
+
+    def test_repeated_sends_are_separate_transfers(
+        self, chain_file: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test two identical sends within a second both stay pending."""
+        monkeypatch.setattr(time, "time", lambda: 1700000000.0)
+        run(chain_file, "init", "--initial-balances", '{"0": 100}')
+
+        run(chain_file, "send", "0", "1", "5")
+        output = run(chain_file, "send", "0", "1", "5")
+
+        assert "Transaction added" in output
+        pending = Blockchain.load_from_file(chain_file).pending_transactions
+        assert len(pending) == 2
+        assert pending[0].calculate_hash() == pending[1].calculate_hash()
+
+    @pytest.mark.parametrize("storage", ["json", "log", "sqlite", "blockfile"])
+    def test_history_on_each_store(self, chain_file: str, storage: str) -> None:
+        """Test history works for JSON files and every store type."""
+        run(
+            chain_file,
+            "init",
+            "--initial-balances",
+            '{"0": 100}',
+            "--difficulty",
+            "1",
+            "--storage",
+            storage,
+        )
+        run(chain_file, "send", "0", "1", "5")
+        run(chain_file, "mine", "9")
+
+        output = run(chain_file, "history", "1")
+
+        assert "(1 total)" in output
+        assert "← 0: 5" in output
+        assert "pruned" not in output
+
+    def test_history_of_pruned_chain(self, chain_file: str) -> None:
+        """Test history reports the pruned blocks instead of skipping them."""
+        blockchain = Blockchain(initial_balances={0: 100}, difficulty=1, prune_depth=2)
+        for value in (1, 2, 3):
+            blockchain.add_transaction(
+                Transaction(from_address=0, to_address=1, value=value, timestamp=value)
+            )
+            block = blockchain.mine_pending_transactions(miner_address=9)
+            blockchain.add_block(block, skip_mining=True)
+        blockchain.save_to_file(chain_file)
+
+        output = run(chain_file, "history", "1")
+        assert "transactions before block 2 have been pruned" in output
+        assert "(2 total since block 2)" in output
+        assert "more available" not in output
+
+        output = run(chain_file, "history", "1", "--oldest-first")
+        assert output.index("← 0: 2") < output.index("← 0: 3")
+
+        output = run(chain_file, "history", "1", "--cursor", "1:0")
+        assert "have been pruned" in output
@@ -0,0 +1,165 @@
+"""
+Tests for the ChainIndex class.
+"""
+
+import os
+import tempfile
+from typing import Callable
+import pytest
+from samplechain.blockchain import Blockchain
+from samplechain.index import ChainIndex
+from samplechain.transaction import Transaction
+
+TRANSFERS = ((0, 1), (0, 2), (1, 0))
+
+
+def scan_history(blockchain: Blockchain, address: int) -> list:
+    """Collect an address's transactions by scanning the chain."""
+    return [
+        tx
+        for block in blockchain.chain
+        for tx in block.transactions
+        if address in (tx.from_address, tx.to_address)
+    ]
+
+
+class TestChainIndex:
+    """Test cases for the ChainIndex class."""
+
+    @pytest.mark.parametrize("address", [0, 1, 2, 3, 42])
+    def test_history_matches_full_scan(
+        self, address: int, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test indexed history equals a scan of every block."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, mining_reward=0)
+
+        assert blockchain.get_transaction_history(address) == scan_history(
+            blockchain, address
+        )
+
+    def test_direction_filters(self, build_chain: Callable[..., Blockchain]) -> None:
+        """Test sent and received filters."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, mining_reward=0)
+
+        sent, _ = blockchain.query_transaction_history(0, direction="sent")
+        received, _ = blockchain.query_transaction_history(0, direction="received")
+
+        assert all(tx.from_address == 0 for tx in sent)
+        assert all(tx.to_address == 0 for tx in received)
+        assert len(sent) == 8
+        assert len(received) == 4
+        assert blockchain.index.count(0) == 12
+
+    def test_newest_first_pagination(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test cursor pagination walks the full history newest first."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, mining_reward=0)
+        expected = scan_history(blockchain, 0)[::-1]
+
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = blockchain.query_transaction_history(
+                0, limit=5, cursor=cursor
+            )
+            pages.append(page)
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [5, 5, 2]
+        assert [tx for page in pages for tx in page] == expected
+
+    def test_oldest_first_pagination(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test cursor pagination in chain order."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, mining_reward=0)
+        expected = scan_history(blockchain, 2)
+
+        first, cursor = blockchain.query_transaction_history(
+            2, limit=3, newest_first=False
+        )
+        second, last_cursor = blockchain.query_transaction_history(
+            2, limit=3, cursor=cursor, newest_first=False
+        )
+
+        assert first + second == expected
+        assert last_cursor is None
+
+    def test_invalid_queries(self) -> None:
+        """Test invalid directions and limits raise ValueError."""
+        index = ChainIndex()
+
+        with pytest.raises(ValueError):
+            index.query(0, direction="sideways")
+        with pytest.raises(ValueError):
+            index.query(0, limit=-1)
+
+    def test_index_rebuilt_on_load(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test loading a saved chain rebuilds the index."""
+        blockchain = build_chain(num_blocks=2, transfers=TRANSFERS, mining_reward=0)
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            loaded = Blockchain.load_from_file(filename)
+
+            assert loaded.get_transaction_history(
+                0
+            ) == blockchain.get_transaction_history(0)
+            assert loaded.index.count(1, "sent") == 2
+        finally:
+            os.unlink(filename)
+
+    def test_block_hash_lookup(self, build_chain: Callable[..., Blockchain]) -> None:
+        """Test blocks are found by hash."""
+        blockchain = build_chain(num_blocks=3, transfers=TRANSFERS, mining_reward=0)
+
+        for block in blockchain.chain:
+            assert blockchain.get_block_by_hash(block.calculate_hash()) is block
+            assert (
+                blockchain.index.get_block_height(block.calculate_hash().upper())
+                == block.index
+            )
+
+        assert blockchain.get_block_by_hash("f" * 64) is None
+
+    def test_transaction_hash_lookup(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test confirmed transactions are found by hash with their position."""
+        blockchain = build_chain(num_blocks=3, transfers=TRANSFERS, mining_reward=0)
+
+        for height, block in enumerate(blockchain.chain):
+            for position, tx in enumerate(block.transactions):
+                found = blockchain.get_transaction_by_hash(tx.calculate_hash())
+                assert found == (tx, (height, position))
+
+        pending = Transaction(from_address=0, to_address=1, value=1, timestamp=999)
+        blockchain.add_transaction(pending)
+        assert blockchain.get_transaction_by_hash(pending.calculate_hash()) is None
+
+    def test_hash_indexes_rebuilt_on_load(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test hash lookups work after loading a saved chain."""
+        blockchain = build_chain(num_blocks=2, transfers=TRANSFERS, mining_reward=0)
+        tip = blockchain.get_latest_block()
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            loaded = Blockchain.load_from_file(filename)
+
+            assert loaded.get_block_by_hash(tip.calculate_hash()).index == tip.index
+            tx_hash = tip.transactions[0].calculate_hash()
+            assert loaded.get_transaction_by_hash(tx_hash)[1] == (tip.index, 0)
+        finally:
+            os.unlink(filename)
@@ -5,9 +5,11 @@ These tests verify that all components work together correctly and
 that the modernized version produces equivalent results to the original.
 """
 
+import time
 import pytest
 from samplechain import Blockchain, Transaction, Block, Miner
 from samplechain.blockchain import InvalidTransactionError
+from samplechain.legacy import getLatestBlock
 
 
 class TestIntegration:
@@ -180,6 +182,27 @@ class TestIntegration:
         assert blockchain.get_balance(1) == 10 - 2  # Lost 2 = 8
         assert blockchain.get_balance(0) == 0 + 2  # Gained 2 = 2
     
+    def test_legacy_repeated_transfers(self) -> None:
+        """Test getLatestBlock mines identical transfers separately, like the original."""
+        result = getLatestBlock([10, 0], [[0, 1, 3], [0, 1, 3]], 2)
+
+        assert result.endswith(", [[0, 1, 3], [0, 1, 3]]")
+
+    def test_legacy_output_matches_original(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test getLatestBlock output, hashes and nonce included, is unchanged."""
+        monkeypatch.setattr(time, "time", lambda: 1700000000.0)
+
+        result = getLatestBlock([5, 0, 0], [[0, 1, 5], [1, 2, 5]], 2)
+
+        # Output of the original implementation at the same clock
+        assert result == (
+            "0000208a446a740562ab995cfb8b91f38a0c11ecf80f2a77cc861f3b7f91224c, "
+            "0fab4274099324685da365569c333981714713297635f10e67c61c20c737413d, "
+            "4969, [[0, 1, 5]]"
+        )
+
     def test_multiple_mining_rounds(self) -> None:
         """Test mining multiple blocks with transactions spread across them."""
         blockchain = Blockchain(initial_balances={0: 1000}, difficulty=2)
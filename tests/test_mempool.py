@@ -0,0 +1,497 @@
+"""
+Tests for the Mempool class.
+"""
+
+import os
+import tempfile
+import pytest
+from samplechain.block import Block
+from samplechain.blockchain import Blockchain, InvalidTransactionError
+from samplechain.mempool import Mempool, MempoolFullError
+from samplechain.transaction import Transaction
+
+
+def make_tx(
+    sender: int = 0, value: int = 10, fee: int = 0, timestamp: int = 1
+) -> Transaction:
+    """Create a transaction with a distinct hash per argument combination."""
+    return Transaction(
+        from_address=sender,
+        to_address=sender + 1,
+        value=value,
+        fee=fee,
+        timestamp=timestamp,
+    )
+
+
+class TestMempool:
+    """Test cases for the Mempool class."""
+
+    def test_add_and_lookup(self) -> None:
+        """Test adding transactions and looking them up by hash."""
+        mempool = Mempool()
+        tx = make_tx()
+
+        assert mempool.add(tx) is True
+        assert tx in mempool
+        assert tx.calculate_hash() in mempool
+        assert mempool.get(tx.calculate_hash()) is tx
+        assert len(mempool) == 1
+
+    def test_rejects_duplicates(self) -> None:
+        """Test a transaction with the same hash is only stored once."""
+        mempool = Mempool()
+
+        assert mempool.add(make_tx()) is True
+        assert mempool.add(make_tx()) is False
+        assert len(mempool) == 1
+
+    def test_allowed_duplicates_are_separate_entries(self) -> None:
+        """Test identical transactions are kept and removed one at a time."""
+        mempool = Mempool(allow_duplicates=True)
+        tx = make_tx()
+        other = make_tx(sender=5)
+
+        assert mempool.add(tx) is True
+        assert mempool.add(other) is True
+        assert mempool.add(tx) is True
+        assert len(mempool) == 3
+        assert list(mempool) == [tx, other, tx]
+        assert list(mempool.iter_by_fee()) == [tx, other, tx]
+        assert mempool.get_pending_debit(0) == 20
+
+        # Each removal drops the earliest copy, as list.remove() would
+        mempool.remove(tx)
+        assert list(mempool) == [other, tx]
+        assert mempool.get(tx.calculate_hash()) is tx
+
+        mempool.remove(tx)
+        assert tx not in mempool
+        assert mempool.discard(tx) is False
+        assert mempool.get_pending_debit(0) == 0
+
+    def test_keeps_arrival_order(self) -> None:
+        """Test iteration, indexing and slicing follow arrival order."""
+        txs = [make_tx(timestamp=t) for t in range(5)]
+        mempool = Mempool(txs)
+
+        assert list(mempool) == txs
+        assert mempool[0] == txs[0]
+        assert mempool[-1] == txs[-1]
+        assert mempool[1:3] == txs[1:3]
+        with pytest.raises(IndexError):
+            mempool[5]
+
+    def test_remove_and_discard(self) -> None:
+        """Test removal by transaction."""
+        txs = [make_tx(timestamp=t) for t in range(3)]
+        mempool = Mempool(txs)
+
+        mempool.remove(txs[1])
+
+        assert list(mempool) == [txs[0], txs[2]]
+        assert mempool.discard(txs[1]) is False
+        with pytest.raises(ValueError):
+            mempool.remove(txs[1])
+
+        mempool.clear()
+        assert not mempool
+
+    def test_blockchain_rejects_duplicate_transactions(self) -> None:
+        """Test Blockchain.add_transaction refuses already pending transactions."""
+        blockchain = Blockchain(initial_balances={0: 100})
+        blockchain.add_transaction(make_tx())
+
+        with pytest.raises(InvalidTransactionError, match="already pending"):
+            blockchain.add_transaction(make_tx())
+
+    def test_blockchain_can_allow_duplicate_transactions(self) -> None:
+        """Test repeated identical transfers are mined as separate transfers."""
+        blockchain = Blockchain(
+            initial_balances={0: 100}, mining_reward=0, mempool_allow_duplicates=True
+        )
+        blockchain.add_transaction(make_tx())
+        blockchain.add_transaction(make_tx())
+
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        blockchain.add_block(block, skip_mining=True)
+
+        assert block.transactions == [make_tx(), make_tx()]
+        assert blockchain.get_balance(0) == 80
+        assert not blockchain.mempool
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            assert Blockchain.load_from_file(filename).mempool.allow_duplicates
+        finally:
+            os.unlink(filename)
+
+    def test_pending_transactions_alias(self) -> None:
+        """Test pending_transactions is the mempool and accepts assignment."""
+        blockchain = Blockchain(initial_balances={0: 100})
+        txs = [make_tx(timestamp=t) for t in range(3)]
+
+        blockchain.pending_transactions = txs
+
+        assert blockchain.pending_transactions is blockchain.mempool
+        assert list(blockchain.pending_transactions) == txs
+
+    def test_add_block_removes_confirmed(self) -> None:
+        """Test confirmed transactions leave the mempool."""
+        blockchain = Blockchain(initial_balances={0: 100, 5: 100})
+        confirmed = make_tx(timestamp=1)
+        waiting = make_tx(sender=5, timestamp=2)
+        blockchain.add_transaction(confirmed)
+        blockchain.add_transaction(waiting)
+
+        block = blockchain.mine_pending_transactions(miner_address=99, block_size=1)
+        blockchain.add_block(block, skip_mining=True)
+
+        assert confirmed not in blockchain.mempool
+        assert list(blockchain.mempool) == [waiting]
+
+    def test_iter_by_fee_orders_by_fee_then_arrival(self) -> None:
+        """Test fee iteration yields highest fees first, ties in arrival order."""
+        low = make_tx(fee=1, timestamp=1)
+        high = make_tx(fee=9, timestamp=2)
+        tie_first = make_tx(fee=5, timestamp=3)
+        tie_second = make_tx(fee=5, timestamp=4)
+        mempool = Mempool([low, high, tie_first, tie_second])
+
+        assert list(mempool.iter_by_fee()) == [high, tie_first, tie_second, low]
+
+    def test_iter_by_fee_keeps_heap_and_skips_removed(self) -> None:
+        """Test partial iteration leaves the index intact and removals are skipped."""
+        txs = [make_tx(fee=fee, timestamp=fee) for fee in range(10)]
+        mempool = Mempool(txs)
+        heap = list(mempool._fee_heap)
+
+        iterator = mempool.iter_by_fee()
+        assert next(iterator) == txs[9]
+        assert next(iterator) == txs[8]
+        assert mempool._fee_heap == heap  # Read in place, never popped
+        del iterator
+        mempool.remove(txs[8])
+
+        assert list(mempool.iter_by_fee()) == [txs[9]] + txs[7::-1]
+
+    def test_fee_heap_compacts_after_removals(self) -> None:
+        """Test stale heap entries do not accumulate."""
+        mempool = Mempool()
+
+        for t in range(1000):
+            tx = make_tx(fee=t % 7, timestamp=t)
+            mempool.add(tx)
+            mempool.discard(tx)
+
+        assert len(mempool._fee_heap) <= 64 + 1
+
+    def test_block_assembly_prefers_high_fees(self) -> None:
+        """Test mined blocks take the highest-fee affordable transactions."""
+        blockchain = Blockchain(
+            initial_balances={0: 100, 2: 100, 4: 100}, mining_reward=0
+        )
+        cheap = make_tx(sender=0, fee=1)
+        rich = make_tx(sender=2, fee=10)
+        mid = make_tx(sender=4, fee=5)
+        for tx in (cheap, rich, mid):
+            blockchain.add_transaction(tx)
+
+        block = blockchain.mine_pending_transactions(miner_address=99, block_size=2)
+
+        assert block.transactions == [rich, mid]
+
+    def test_block_assembly_respects_sender_balance(self) -> None:
+        """Test fee ordering still tracks each sender's balance within the block."""
+        blockchain = Blockchain(initial_balances={0: 25}, mining_reward=0)
+        first = make_tx(sender=0, value=10, fee=5, timestamp=1)
+        second = make_tx(sender=0, value=10, fee=3, timestamp=2)
+        blockchain.add_transaction(first)
+        blockchain.add_transaction(second)
+
+        selected = blockchain.select_transactions_for_block(block_size=10)
+
+        assert selected == [first]
+        assert len(blockchain.mempool) == 2
+
+    def test_block_assembly_includes_funded_dependents(self) -> None:
+        """Test a transaction funded by a lower-fee pending one is included after it."""
+        blockchain = Blockchain(
+            initial_balances={0: 0, 1: 10},
+            mining_reward=0,
+            mempool_reject_unaffordable=True,
+        )
+        dependent = Transaction(
+            from_address=0, to_address=2, value=5, fee=5, timestamp=1
+        )
+        funding = Transaction(from_address=1, to_address=0, value=10, timestamp=2)
+        blockchain.add_transaction(funding)
+        blockchain.add_transaction(dependent)
+
+        selected = blockchain.select_transactions_for_block(block_size=2)
+
+        assert selected == [funding, dependent]
+        block = blockchain.mine_pending_transactions(miner_address=99, block_size=2)
+        assert blockchain.is_block_valid(block, skip_mining=True)
+
+    def test_block_assembly_resolves_dependency_chains(self) -> None:
+        """Test chains of funding dependencies fill the block in topological order."""
+        blockchain = Blockchain(
+            initial_balances={0: 10}, mining_reward=0, mempool_reject_unaffordable=True
+        )
+        chain = [
+            Transaction(
+                from_address=i,
+                to_address=i + 1,
+                value=10 - i,
+                fee=0 if i == 0 else 1,
+                timestamp=i,
+            )
+            for i in range(5)
+        ]
+        for tx in chain:
+            blockchain.add_transaction(tx)
+
+        assert blockchain.select_transactions_for_block(block_size=5) == chain
+        assert blockchain.select_transactions_for_block(block_size=3) == chain[:3]
+
+    def test_block_assembly_skips_unfundable(self) -> None:
+        """Test transactions that stay unaffordable are left out."""
+        blockchain = Blockchain(initial_balances={0: 10}, mining_reward=0)
+        unfundable = Transaction(
+            from_address=5, to_address=6, value=1, fee=9, timestamp=1
+        )
+        payable = Transaction(from_address=0, to_address=1, value=10, timestamp=2)
+        # Admission would refuse it, so queue it directly
+        blockchain.mempool.add(unfundable)
+        blockchain.add_transaction(payable)
+
+        assert blockchain.select_transactions_for_block(block_size=5) == [payable]
+
+    def test_pending_totals_track_adds_and_removals(self) -> None:
+        """Test per-sender debits and per-recipient credits follow the pool."""
+        mempool = Mempool()
+        first = make_tx(sender=0, value=10, fee=2, timestamp=1)
+        second = make_tx(sender=0, value=5, fee=1, timestamp=2)
+
+        mempool.add(first)
+        mempool.add(second)
+        mempool.add(second)
+        assert mempool.get_pending_debit(0) == 18
+        assert mempool.get_pending_credit(1) == 15
+
+        mempool.discard(first)
+        assert mempool.get_pending_debit(0) == 6
+        assert mempool.get_pending_credit(1) == 5
+
+        mempool.clear()
+        assert mempool.get_pending_debit(0) == 0
+        assert mempool.get_pending_credit(1) == 0
+
+    def test_admission_counts_pending_spends(self) -> None:
+        """Test add_transaction rejects transactions that overspend with pending ones."""
+        blockchain = Blockchain(
+            initial_balances={0: 22}, mempool_reject_unaffordable=True
+        )
+        blockchain.add_transaction(make_tx(sender=0, value=10, fee=2, timestamp=1))
+        blockchain.add_transaction(make_tx(sender=0, value=8, fee=1, timestamp=2))
+
+        with pytest.raises(InvalidTransactionError, match="insufficient balance"):
+            blockchain.add_transaction(make_tx(sender=0, value=2, timestamp=3))
+
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        blockchain.add_block(block, skip_mining=True)
+
+        assert blockchain.mempool.get_pending_debit(0) == 0
+        blockchain.add_transaction(make_tx(sender=0, value=1, timestamp=3))
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            assert Blockchain.load_from_file(filename).mempool_reject_unaffordable
+        finally:
+            os.unlink(filename)
+
+    def test_admission_counts_pending_credits(self) -> None:
+        """Test add_transaction lets a sender spend what pending ones pay it."""
+        blockchain = Blockchain(
+            initial_balances={0: 10}, mempool_reject_unaffordable=True
+        )
+        blockchain.add_transaction(make_tx(sender=0, value=10, timestamp=1))
+        blockchain.add_transaction(make_tx(sender=1, value=6, timestamp=2))
+
+        with pytest.raises(InvalidTransactionError, match="insufficient balance"):
+            blockchain.add_transaction(make_tx(sender=1, value=5, timestamp=3))
+
+    def test_admission_checks_each_transaction_by_default(self) -> None:
+        """Test the default admission only checks a transaction against the balance."""
+        blockchain = Blockchain(initial_balances={0: 10})
+        blockchain.add_transaction(make_tx(sender=0, value=10, timestamp=1))
+        blockchain.add_transaction(make_tx(sender=0, value=10, timestamp=2))
+
+        with pytest.raises(InvalidTransactionError, match="insufficient balance"):
+            blockchain.add_transaction(make_tx(sender=1, value=1, timestamp=3))
+
+    def test_evict_unaffordable_keeps_highest_fees(self) -> None:
+        """Test eviction keeps the highest-fee transactions that still fit."""
+        mempool = Mempool()
+        low = make_tx(sender=0, value=10, fee=1, timestamp=1)
+        high = make_tx(sender=0, value=10, fee=5, timestamp=2)
+        other = make_tx(sender=7, value=10, timestamp=3)
+        for tx in (low, high, other):
+            mempool.add(tx)
+
+        assert mempool.evict_unaffordable(0, balance=100) == []
+        assert mempool.evict_unaffordable(0, balance=20) == [low]
+
+        assert mempool.get_sender_transactions(0) == [high]
+        assert mempool.get_pending_debit(0) == 15
+        assert other in mempool
+
+    def test_block_evicts_transactions_it_makes_unaffordable(self) -> None:
+        """Test add_block revalidates the senders it debits."""
+        blockchain = Blockchain(
+            initial_balances={0: 10, 3: 10},
+            mining_reward=0,
+            mempool_reject_unaffordable=True,
+        )
+        pending = make_tx(sender=0, value=8, timestamp=1)
+        untouched = make_tx(sender=3, value=5, timestamp=1)
+        blockchain.add_transaction(pending)
+        blockchain.add_transaction(untouched)
+
+        # A block from elsewhere spends sender 0's balance
+        spend = Transaction(from_address=0, to_address=5, value=6, timestamp=2)
+        block = Block(
+            index=1,
+            transactions=[spend],
+            previous_hash=blockchain.get_latest_block().calculate_hash(),
+            version=2,
+        )
+        blockchain.add_block(block, skip_mining=True)
+
+        assert pending not in blockchain.mempool
+        assert list(blockchain.mempool) == [untouched]
+
+    def test_eviction_cascades_to_funded_transactions(self) -> None:
+        """Test evicting a transaction also evicts the ones it was funding."""
+        blockchain = Blockchain(
+            initial_balances={0: 10}, mining_reward=0, mempool_reject_unaffordable=True
+        )
+        funding = make_tx(sender=0, value=8, timestamp=1)
+        funded = make_tx(sender=1, value=8, timestamp=1)
+        blockchain.add_transaction(funding)
+        blockchain.add_transaction(funded)
+
+        spend = Transaction(from_address=0, to_address=5, value=6, timestamp=2)
+        block = Block(
+            index=1,
+            transactions=[spend],
+            previous_hash=blockchain.get_latest_block().calculate_hash(),
+            version=2,
+        )
+        blockchain.add_block(block, skip_mining=True)
+
+        assert len(blockchain.mempool) == 0
+        assert blockchain.mempool.get_pending_credit(1) == 0
+
+    def test_blocks_leave_the_mempool_alone_by_default(self) -> None:
+        """Test unaffordable transactions stay pending unless the chain evicts them."""
+        blockchain = Blockchain(initial_balances={0: 10}, mining_reward=0)
+        pending = make_tx(sender=0, value=8, timestamp=1)
+        blockchain.add_transaction(pending)
+
+        spend = Transaction(from_address=0, to_address=5, value=6, timestamp=2)
+        block = Block(
+            index=1,
+            transactions=[spend],
+            previous_hash=blockchain.get_latest_block().calculate_hash(),
+            version=2,
+        )
+        blockchain.add_block(block, skip_mining=True)
+
+        assert list(blockchain.mempool) == [pending]
+
+    def test_capacity_evicts_lowest_fee(self) -> None:
+        """Test a full pool evicts its lowest-fee transaction for a better one."""
+        mempool = Mempool(max_transactions=3)
+        txs = [
+            make_tx(sender=s, fee=fee, timestamp=s)
+            for s, fee in ((0, 5), (2, 1), (4, 3))
+        ]
+        for tx in txs:
+            mempool.add(tx)
+
+        better = make_tx(sender=6, fee=2, timestamp=6)
+        mempool.add(better)
+
+        assert len(mempool) == 3
+        assert txs[1] not in mempool
+        assert better in mempool
+        assert mempool.evictions == 1
+        assert mempool.get_min_fee() == 2
+        assert mempool.get_pending_debit(2) == 0
+
+    def test_full_pool_rejects_low_fees(self) -> None:
+        """Test a full pool refuses transactions that do not beat the floor."""
+        mempool = Mempool(max_transactions=2)
+        mempool.add(make_tx(sender=0, fee=4, timestamp=1))
+        mempool.add(make_tx(sender=2, fee=4, timestamp=2))
+
+        with pytest.raises(MempoolFullError):
+            mempool.add(make_tx(sender=4, fee=4, timestamp=3))
+        assert len(mempool) == 2
+        assert mempool.evictions == 0
+
+        mempool.add(make_tx(sender=6, fee=6, timestamp=4))
+        with pytest.raises(MempoolFullError, match="below the mempool minimum"):
+            mempool.add(make_tx(sender=8, fee=4, timestamp=5))
+
+    def test_fee_floor_lifts_when_pool_drains(self) -> None:
+        """Test the minimum fee resets once usage falls below half capacity."""
+        mempool = Mempool(max_transactions=2)
+        first = make_tx(sender=0, fee=1, timestamp=1)
+        second = make_tx(sender=2, fee=2, timestamp=2)
+        third = make_tx(sender=4, fee=3, timestamp=3)
+        for tx in (first, second, third):
+            mempool.add(tx)
+        assert mempool.get_min_fee() == 2
+
+        mempool.discard(second)
+        mempool.discard(third)
+
+        assert mempool.get_min_fee() == 0
+
+    def test_byte_capacity(self) -> None:
+        """Test the pool is bounded by estimated size in bytes."""
+        tx = make_tx(fee=1)
+        size = Mempool.estimate_size(tx)
+        mempool = Mempool(max_bytes=size * 2)
+
+        for t in range(5):
+            mempool.add(make_tx(fee=t + 1, timestamp=t))
+
+        metrics = mempool.get_metrics()
+        assert metrics["transactions"] == 2
+        assert metrics["bytes"] <= size * 2
+        assert metrics["evictions"] == 3
+        assert [tx.fee for tx in mempool.iter_by_fee()] == [5, 4]
+
+    def test_blockchain_reports_low_fee_rejection(self) -> None:
+        """Test Blockchain surfaces a full mempool as an invalid transaction."""
+        blockchain = Blockchain(
+            initial_balances={0: 100, 2: 100}, mempool_max_transactions=1
+        )
+        blockchain.add_transaction(make_tx(sender=0, fee=3))
+
+        with pytest.raises(InvalidTransactionError, match="Mempool is full"):
+            blockchain.add_transaction(make_tx(sender=2, fee=1))
+
+        stats = blockchain.get_chain_stats()
+        assert stats["mempool"]["max_transactions"] == 1
+        assert stats["mempool"]["transactions"] == 1
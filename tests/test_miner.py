@@ -2,9 +2,12 @@
 Tests for the Miner class.
 """
 
+import threading
+import time
 import pytest
 from unittest.mock import patch
-from samplechain.miner import Miner, MiningError
+from samplechain.miner import Miner, MiningError, NonceScheduler, ProcessMiningPool
+from samplechain.pow import HashTemplate
 from samplechain.block import Block
 from samplechain.transaction import Transaction
 from samplechain.blockchain import Blockchain
@@ -19,6 +22,7 @@ class TestMiner:
         
         assert miner.max_nonce == 1000000
         assert miner.progress_callback is None
+        assert miner.roll_timestamp is True
         assert miner._mining_stats["blocks_mined"] == 0
         assert miner._mining_stats["total_hashes"] == 0
         assert miner._mining_stats["total_time"] == 0.0
@@ -51,7 +55,7 @@ class TestMiner:
     
     def test_mine_block_impossible_difficulty(self) -> None:
         """Test mining fails with impossible difficulty in limited nonce range."""
-        miner = Miner(max_nonce=100)  # Very low max nonce
+        miner = Miner(max_nonce=100, roll_timestamp=False)  # Very low max nonce
         
         # Create block with high difficulty
         tx = Transaction(from_address=1, to_address=2, value=100)
@@ -107,7 +111,7 @@ class TestMiner:
     
     def test_mine_block_parallel_failure(self) -> None:
         """Test parallel mining fails with impossible parameters."""
-        miner = Miner(max_nonce=50)  # Very low max nonce
+        miner = Miner(max_nonce=50, roll_timestamp=False)  # Very low max nonce
         
         tx = Transaction(from_address=1, to_address=2, value=100)
         block = Block(index=1, transactions=[tx], difficulty=8)  # Very high difficulty
@@ -393,4 +397,285 @@ class TestMiner:
         
         # Test after mining
         str_repr_after = str(miner)
-        assert "blocks_mined=1" in str_repr_after
\ No newline at end of file
+        assert "blocks_mined=1" in str_repr_after
+
+    def test_mine_block_processes_success(self) -> None:
+        """Test mining with the process pool finds a valid nonce."""
+        miner = Miner(max_nonce=20000)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=2)
+
+        try:
+            result = miner.mine_block_processes(block, num_workers=2)
+        finally:
+            miner.close()
+
+        assert result is True
+        assert block.is_hash_valid()
+        assert miner._mining_stats["blocks_mined"] == 1
+        assert miner._mining_stats["total_hashes"] > 0
+
+    def test_mine_block_processes_failure(self) -> None:
+        """Test process pool mining fails with impossible parameters."""
+        miner = Miner(max_nonce=200, roll_timestamp=False)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=8)
+
+        try:
+            result = miner.mine_block_processes(block, num_workers=2)
+        finally:
+            miner.close()
+
+        assert result is False
+        assert miner._mining_stats["blocks_mined"] == 0
+
+    def test_process_pool_is_reused(self) -> None:
+        """Test worker processes persist across mining calls."""
+        miner = Miner(max_nonce=20000)
+
+        try:
+            for index in range(1, 3):
+                tx = Transaction(from_address=1, to_address=2, value=index)
+                block = Block(index=index, transactions=[tx], difficulty=1)
+                assert miner.mine_block_processes(block, num_workers=2)
+
+                if index == 1:
+                    pool = miner._process_pool
+
+            assert miner._process_pool is pool
+        finally:
+            miner.close()
+
+        assert miner._process_pool is None
+
+    def test_process_pool_counts_hashes_per_worker(self) -> None:
+        """Test the process pool reports every hash it performed."""
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=64)
+        template = HashTemplate.from_block(block)
+
+        with ProcessMiningPool(num_workers=3) as pool:
+            nonce, hashes = pool.search(template, 0, 5000)
+
+        assert nonce is None
+        assert len(hashes) == 3
+        assert sum(hashes) == 5000
+
+    @pytest.mark.parametrize("method", ["mine_block_parallel", "mine_block_processes"])
+    def test_parallel_mining_finds_lowest_nonce(self, method: str) -> None:
+        """Test parallel mining finds the same nonce as serial mining."""
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        serial_block = Block(index=1, transactions=[tx], timestamp=1000, difficulty=3)
+        parallel_block = serial_block.copy()
+
+        serial_miner = Miner(max_nonce=200000)
+        parallel_miner = Miner(max_nonce=200000)
+
+        try:
+            assert serial_miner.mine_block(serial_block) is True
+            assert getattr(parallel_miner, method)(parallel_block, num_workers=3)
+        finally:
+            parallel_miner.close()
+
+        assert parallel_block.nonce == serial_block.nonce
+        assert len(parallel_miner.last_worker_hashes) == 3
+        assert sum(parallel_miner.last_worker_hashes) >= serial_block.nonce + 1
+        assert parallel_miner.get_mining_stats()["total_hashes"] == sum(
+            parallel_miner.last_worker_hashes
+        )
+
+    def test_nonce_scheduler_batches(self) -> None:
+        """Test the scheduler hands out batches until the range is covered."""
+        scheduler = NonceScheduler(batch_size=40)
+        scheduler.reset(10, 100)
+
+        batches = []
+        while True:
+            batch = scheduler.claim()
+            if batch is None:
+                break
+            batches.append(batch)
+
+        assert batches == [(10, 50), (50, 90), (90, 100)]
+        assert scheduler.get_best_nonce() is None
+
+    def test_nonce_scheduler_stops_above_best(self) -> None:
+        """Test no batches above the best reported nonce are handed out."""
+        scheduler = NonceScheduler(batch_size=10)
+        scheduler.reset(0, 1000)
+
+        assert scheduler.claim() == (0, 10)
+        assert scheduler.claim() == (10, 20)
+
+        scheduler.report(15)
+        assert scheduler.claim() is None
+
+        scheduler.report(7)
+        scheduler.report(12)
+        assert scheduler.get_best_nonce() == 7
+
+    def test_process_pool_closed(self) -> None:
+        """Test searching a closed pool raises an error."""
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        template = HashTemplate.from_block(Block(index=1, transactions=[tx]))
+
+        pool = ProcessMiningPool(num_workers=1)
+        pool.close()
+
+        with pytest.raises(MiningError, match="closed"):
+            pool.search(template, 0, 10)
+
+    @pytest.mark.parametrize("method", ["mine_block", "mine_block_parallel"])
+    def test_cancel_while_idle_is_ignored(self, method: str) -> None:
+        """Test a cancel issued between mining calls does not abort the next one."""
+        miner = Miner(max_nonce=10000)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=1)
+
+        miner.cancel()
+
+        assert getattr(miner, method)(block) is True
+        assert miner.cancel_token.is_cancelled() is False
+
+    def test_parallel_mining_stops_after_first_nonce(self) -> None:
+        """Test parallel workers stop once one of them finds a nonce."""
+        miner = Miner(max_nonce=10**9)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=1)
+
+        start_time = time.time()
+        result = miner.mine_block_parallel(block, num_workers=4)
+
+        assert result is True
+        assert block.is_hash_valid()
+        assert time.time() - start_time < 5.0
+
+    @pytest.mark.parametrize("method", ["mine_block", "mine_block_parallel"])
+    def test_cancel_running_mining(self, method: str) -> None:
+        """Test cancelling from another thread aborts mining promptly."""
+        miner = Miner(max_nonce=10**9)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=64)
+
+        timer = threading.Timer(0.2, miner.cancel)
+        timer.start()
+
+        start_time = time.time()
+        result = getattr(miner, method)(block)
+        timer.join()
+
+        assert result is False
+        assert time.time() - start_time < 5.0
+        assert miner.cancel_token.is_cancelled() is False
+
+    def test_cancel_process_mining(self) -> None:
+        """Test cancelling stops process pool workers promptly."""
+        miner = Miner(max_nonce=10**9)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=64)
+
+        timer = threading.Timer(0.5, miner.cancel)
+        timer.start()
+
+        try:
+            start_time = time.time()
+            result = miner.mine_block_processes(block, num_workers=2)
+            timer.join()
+
+            assert result is False
+            assert time.time() - start_time < 10.0
+
+            # The pool is still usable after a cancelled job
+            block = Block(index=1, transactions=[tx], difficulty=1)
+            assert miner.mine_block_processes(block, num_workers=2) is True
+        finally:
+            miner.close()
+
+    @pytest.mark.parametrize(
+        "method", ["mine_block", "mine_block_parallel", "mine_block_processes"]
+    )
+    def test_roll_timestamp_extends_search(self, method: str) -> None:
+        """Test timestamp rolling keeps mining past max_nonce."""
+        miner = Miner(max_nonce=50)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], timestamp=1000, difficulty=3)
+
+        try:
+            if method == "mine_block":
+                result = miner.mine_block(block)
+            else:
+                result = getattr(miner, method)(block, num_workers=2)
+        finally:
+            miner.close()
+
+        assert result is True
+        assert block.timestamp > 1000
+        assert block.nonce < 50
+        assert block.is_hash_valid()
+        assert miner.get_mining_stats()["total_hashes"] > 50
+
+    def test_roll_timestamp_limit(self) -> None:
+        """Test mining still fails once the roll limit is reached."""
+        miner = Miner(max_nonce=10, max_timestamp_rolls=3)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], timestamp=1000, difficulty=64)
+
+        assert miner.mine_block(block) is False
+        assert block.timestamp == 1003
+
+    def test_roll_timestamp_stops_when_cancelled(self) -> None:
+        """Test unlimited rolling can still be cancelled."""
+        miner = Miner(max_nonce=100)
+
+        tx = Transaction(from_address=1, to_address=2, value=100)
+        block = Block(index=1, transactions=[tx], difficulty=64)
+
+        timer = threading.Timer(0.2, miner.cancel)
+        timer.start()
+
+        assert miner.mine_block_parallel(block, num_workers=2) is False
+        timer.join()
+
+    def test_calculate_target_adjustment_scales_smoothly(self) -> None:
+        """Test target retargeting follows the block time ratio."""
+        blocks = [
+            Block(index=i, transactions=[], timestamp=1000 + i * 450, target=1 << 240)
+            for i in range(5)
+        ]
+
+        # Blocks 25% faster than desired -> target shrinks to 75%
+        result = Miner.calculate_target_adjustment(blocks, target_time=600)
+        assert result == (1 << 240) * 3 // 4
+
+    def test_calculate_target_adjustment_is_clamped(self) -> None:
+        """Test target retargeting is limited per adjustment."""
+        fast = [
+            Block(index=i, transactions=[], timestamp=1000 + i, difficulty=4)
+            for i in range(3)
+        ]
+        slow = [
+            Block(index=i, transactions=[], timestamp=1000 + i * 100000, difficulty=4)
+            for i in range(3)
+        ]
+
+        assert Miner.calculate_target_adjustment(fast, 600) == (16**60) // 4
+        assert Miner.calculate_target_adjustment(slow, 600) == (16**60) * 4
+        assert Miner.calculate_target_adjustment([fast[0]]) == 16**60
+
+    def test_estimate_mining_time_with_target(self) -> None:
+        """Test mining time estimation with an integer target."""
+        miner = Miner()
+
+        estimated_time = miner.estimate_mining_time(
+            difficulty=0, hash_rate=1000, target=1 << 246
+        )
+
+        assert abs(estimated_time - 1024 / 1000) < 0.001
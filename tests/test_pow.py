@@ -0,0 +1,191 @@
+"""
+Tests for the proof-of-work hash template.
+"""
+
+import pickle
+import pytest
+from samplechain.block import Block
+from samplechain.miner import Miner
+from samplechain.pow import (
+    MAX_TARGET,
+    HashTemplate,
+    bits_to_target,
+    difficulty_to_target,
+)
+from samplechain.transaction import Transaction
+
+
+def make_block(
+    difficulty: int = 2, num_transactions: int = 3, version: int = 1
+) -> Block:
+    """Create a deterministic block for template tests."""
+    transactions = [
+        Transaction(from_address=i, to_address=i + 1, value=10 + i, fee=i)
+        for i in range(num_transactions)
+    ]
+    return Block(
+        index=7,
+        transactions=transactions,
+        timestamp=1640995200,
+        previous_hash="ab" * 32,
+        difficulty=difficulty,
+        version=version,
+    )
+
+
+class TestHashTemplate:
+    """Test cases for the HashTemplate class."""
+
+    @pytest.mark.parametrize("nonce", [0, 1, 9, 10, 999, 123456789])
+    def test_hexdigest_matches_block_hash(self, nonce: int) -> None:
+        """Test template hashes match Block.calculate_hash for any nonce."""
+        block = make_block()
+        template = HashTemplate.from_block(block)
+
+        block.nonce = nonce
+        assert template.hexdigest(nonce) == block.calculate_hash()
+
+    def test_template_ignores_block_nonce(self) -> None:
+        """Test the template does not depend on the nonce it was built with."""
+        block = make_block()
+        block.nonce = 42
+        template = HashTemplate.from_block(block)
+
+        block.nonce = 7
+        assert template.hexdigest(7) == block.calculate_hash()
+
+    def test_empty_block(self) -> None:
+        """Test template hashing for a block without transactions."""
+        block = make_block(num_transactions=0)
+        template = HashTemplate.from_block(block)
+
+        assert template.hexdigest(0) == block.calculate_hash()
+
+    @pytest.mark.parametrize("difficulty", [0, 1, 2, 3])
+    def test_search_finds_same_nonce_as_brute_force(self, difficulty: int) -> None:
+        """Test search returns the first nonce valid under Block.is_hash_valid."""
+        block = make_block(difficulty=difficulty)
+        template = HashTemplate.from_block(block)
+
+        expected = None
+        for nonce in range(20000):
+            block.nonce = nonce
+            if block.is_hash_valid():
+                expected = nonce
+                break
+
+        assert template.search(0, 20000) == expected
+
+    def test_search_respects_range(self) -> None:
+        """Test search only returns nonces within the requested range."""
+        block = make_block(difficulty=1)
+        template = HashTemplate.from_block(block)
+
+        first = template.search(0, 10000)
+        assert first is not None
+
+        later = template.search(first + 1, 10000)
+        assert later is None or later > first
+        assert template.search(5, 5) is None
+
+    @pytest.mark.parametrize("difficulty", [0, 1, 2, 3, 4])
+    def test_is_digest_valid_matches_hex_prefix(self, difficulty: int) -> None:
+        """Test raw digest comparison agrees with the hex prefix rule."""
+        block = make_block(difficulty=difficulty)
+        template = HashTemplate.from_block(block)
+
+        for nonce in range(2000):
+            digest = template.digest(nonce)
+            assert template.is_digest_valid(digest) == block.is_hash_valid(digest.hex())
+
+    def test_difficulty_to_target(self) -> None:
+        """Test difficulty conversion to integer targets."""
+        assert difficulty_to_target(0) == 1 << 256
+        assert difficulty_to_target(1) == 1 << 252
+        assert difficulty_to_target(4) == 16**60
+        assert difficulty_to_target(65) == 0
+
+    def test_miner_matches_serial_hashing(self) -> None:
+        """Test the miner produces the nonce and hash of the naive loop."""
+        block = make_block(difficulty=2, num_transactions=20)
+        reference = make_block(difficulty=2, num_transactions=20)
+
+        expected_nonce = None
+        for nonce in range(50000):
+            reference.nonce = nonce
+            if reference.calculate_hash().startswith("00"):
+                expected_nonce = nonce
+                break
+
+        assert Miner(max_nonce=50000).mine_block(block) is True
+        assert block.nonce == expected_nonce
+        assert block.calculate_hash() == reference.calculate_hash()
+
+    def test_template_pickles(self) -> None:
+        """Test templates survive pickling for worker processes."""
+        block = make_block()
+        template = HashTemplate.from_block(block)
+
+        restored = pickle.loads(pickle.dumps(template))
+
+        assert restored.target == template.target
+        assert restored.hexdigest(5) == template.hexdigest(5)
+
+    def test_with_prefix_after_timestamp_roll(self) -> None:
+        """Test rebuilding only the prefix matches a fully re-encoded block."""
+        block = make_block()
+        template = HashTemplate.from_block(block)
+
+        block.timestamp += 1
+        rolled = template.with_prefix(block.get_hash_prefix())
+
+        block.nonce = 3
+        assert rolled.hexdigest(3) == block.calculate_hash()
+        assert rolled.hexdigest(3) != template.hexdigest(3)
+
+    def test_bits_to_target(self) -> None:
+        """Test leading-zero-bit targets."""
+        assert bits_to_target(0) == MAX_TARGET
+        assert bits_to_target(4) == difficulty_to_target(1)
+        assert bits_to_target(13) == 1 << 243
+
+        with pytest.raises(ValueError):
+            bits_to_target(257)
+
+    def test_search_with_integer_target(self) -> None:
+        """Test mining against a target between two hex difficulties."""
+        block = make_block()
+        block.difficulty = 0
+        block.target = bits_to_target(6)
+        template = HashTemplate.from_block(block)
+
+        nonce = template.search(0, 100000)
+        assert nonce is not None
+
+        block.nonce = nonce
+        assert block.is_hash_valid()
+        assert int(block.calculate_hash(), 16) >> 250 == 0
+
+    @pytest.mark.parametrize("nonce", [0, 1, 255, 256, 123456789])
+    def test_header_block_hexdigest_matches(self, nonce: int) -> None:
+        """Test templates of header blocks match Block.calculate_hash."""
+        block = make_block(version=2)
+        template = HashTemplate.from_block(block)
+
+        block.nonce = nonce
+        assert template.nonce_size == 8
+        assert template.hexdigest(nonce) == block.calculate_hash()
+
+    def test_header_block_search_and_pickle(self) -> None:
+        """Test header templates search correctly and survive pickling."""
+        block = make_block(difficulty=2, num_transactions=50, version=2)
+        template = pickle.loads(pickle.dumps(HashTemplate.from_block(block)))
+
+        nonce = template.search(0, 50000)
+        assert nonce is not None
+
+        block.nonce = nonce
+        assert block.is_hash_valid()
+        for earlier in range(nonce):
+            block.nonce = earlier
+            assert not block.is_hash_valid()
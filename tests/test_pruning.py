@@ -0,0 +1,222 @@
+"""
+Tests for block body pruning.
+"""
+
+import os
+import tempfile
+from typing import Callable
+import pytest
+from samplechain.block import BLOCK_VERSION_LEGACY, Block
+from samplechain.blockchain import Blockchain, PrunedDataError
+from samplechain.storage import BlockFile, BlockLog, SQLiteStorage, convert_json_file
+from samplechain.transaction import Transaction
+
+PAYMENTS = ((0, 1),)
+
+
+class TestBlockPruning:
+    """Test cases for pruning a single block."""
+
+    def test_pruned_block_keeps_header_and_totals(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a pruned block keeps its hash, Merkle root and totals."""
+        block = build_chain(num_blocks=1, transfers=PAYMENTS).chain[1]
+        pruned = block.prune()
+
+        assert pruned.is_pruned()
+        assert not block.is_pruned()
+        assert pruned.transactions == []
+        assert pruned.is_frozen()
+        assert pruned.calculate_hash() == block.calculate_hash()
+        assert pruned.get_merkle_root() == block.get_merkle_root()
+        assert pruned.get_transaction_count() == 2
+        assert pruned.get_transaction_total() == block.get_transaction_total()
+        assert pruned.get_total_fees() == block.get_total_fees()
+        assert pruned.prune() is pruned
+
+    def test_serialization_round_trip(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a pruned block survives to_dict() and from_dict()."""
+        pruned = build_chain(num_blocks=1, transfers=PAYMENTS).chain[1].prune()
+        data = pruned.to_dict()
+
+        assert data["pruned"] is True
+        assert data["transactions"] == []
+
+        restored = Block.from_dict(data)
+        assert restored.is_pruned()
+        assert restored.calculate_hash() == pruned.calculate_hash()
+        assert restored.get_transaction_count() == 2
+        assert restored.to_dict() == data
+
+    def test_tampered_header_is_rejected(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a pruned header block must match its stored hash."""
+        data = build_chain(num_blocks=1, transfers=PAYMENTS).chain[1].prune().to_dict()
+
+        for key, value in (("nonce", 12345), ("merkle_root", "ab" * 32)):
+            with pytest.raises(ValueError):
+                Block.from_dict({**data, key: value})
+
+    def test_legacy_hash_is_trusted(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a pruned legacy block keeps the hash it was saved with."""
+        block = build_chain(num_blocks=1, transfers=PAYMENTS).chain[1]
+        legacy = Block(
+            index=block.index,
+            transactions=list(block.transactions),
+            timestamp=block.timestamp,
+            previous_hash=block.previous_hash,
+            difficulty=block.difficulty,
+            version=BLOCK_VERSION_LEGACY,
+        )
+        data = legacy.prune().to_dict()
+
+        assert Block.from_dict(data).calculate_hash() == legacy.calculate_hash()
+
+
+class TestBlockchainPruning:
+    """Test cases for pruning a blockchain."""
+
+    def test_prune_depth_keeps_chain_valid(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test blocks are pruned as they fall below the depth."""
+        full = build_chain(num_blocks=6, transfers=PAYMENTS)
+        blockchain = build_chain(prune_depth=2, num_blocks=6, transfers=PAYMENTS)
+
+        assert blockchain.get_pruned_height() == 5
+        assert [b.is_pruned() for b in blockchain.chain] == [True] * 5 + [False] * 2
+        assert [b.calculate_hash() for b in blockchain.chain] == [
+            b.calculate_hash() for b in full.chain
+        ]
+        assert blockchain.is_chain_valid()
+        assert blockchain.get_chain_stats() == full.get_chain_stats()
+        assert dict(blockchain.balances) == dict(full.balances)
+
+    def test_history_reports_pruned_blocks(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test history queries report pruned transactions instead of skipping."""
+        blockchain = build_chain(num_blocks=6, transfers=PAYMENTS)
+        blockchain.get_transaction_history(1)  # build the index before pruning
+        pruned_tx = blockchain.chain[2].transactions[0]
+
+        assert blockchain.prune(3) == 4
+        assert blockchain.prune(3) == 0
+        assert blockchain.count_transaction_history(1) == 3
+        assert blockchain.get_transaction_by_hash(pruned_tx.calculate_hash()) is None
+        assert blockchain.get_block_by_hash(blockchain.chain[2].calculate_hash())
+        with pytest.raises(PrunedDataError):
+            blockchain.get_transaction_history(1)
+
+        transactions, cursor = blockchain.query_transaction_history(1, limit=3)
+        assert [tx.value for tx in transactions] == [6, 5, 4]
+        assert cursor == (4, 0)
+        with pytest.raises(PrunedDataError):
+            blockchain.query_transaction_history(1, cursor=cursor)
+        with pytest.raises(PrunedDataError):
+            blockchain.query_transaction_history(1, cursor=(2, 0))
+
+        with pytest.raises(PrunedDataError):
+            blockchain.query_transaction_history(1, newest_first=False)
+        transactions, cursor = blockchain.query_transaction_history(
+            1, cursor=(4, -1), newest_first=False
+        )
+        assert [tx.value for tx in transactions] == [4, 5, 6]
+        assert cursor is None
+
+    def test_index_built_after_pruning(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test an index built after pruning matches one pruned in place."""
+        blockchain = build_chain(num_blocks=6, transfers=PAYMENTS)
+        blockchain.prune(2)
+        blockchain.restore_state(blockchain.chain, blockchain.balances)
+
+        assert blockchain.get_pruned_height() == 5
+        assert blockchain.count_transaction_history(1) == 2
+        assert blockchain.count_transaction_history(0) == 2
+
+    def test_settings_and_file_round_trip(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test the prune depth and pruned blocks survive saving to a file."""
+        blockchain = build_chain(prune_depth=3, num_blocks=6, transfers=PAYMENTS)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.json")
+            blockchain.save_to_file(filename)
+            loaded = Blockchain.load_from_file(filename)
+
+        assert loaded.prune_depth == 3
+        assert loaded.get_pruned_height() == blockchain.get_pruned_height()
+        assert loaded.is_chain_valid()
+        assert loaded.get_chain_stats() == blockchain.get_chain_stats()
+
+    def test_invalid_depth(self, build_chain: Callable[..., Blockchain]) -> None:
+        """Test depths below one are rejected."""
+        with pytest.raises(ValueError):
+            Blockchain(prune_depth=0)
+        with pytest.raises(ValueError):
+            build_chain(num_blocks=1, transfers=PAYMENTS).prune(0)
+
+
+class TestStoragePruning:
+    """Test cases for pruning with storage attached."""
+
+    @pytest.mark.parametrize("backend", [BlockLog, BlockFile, SQLiteStorage])
+    def test_store_keeps_full_blocks(
+        self, backend: type, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test stores keep the bodies of blocks pruned in memory."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chain")
+            blockchain = build_chain(num_blocks=1, transfers=PAYMENTS)
+
+            with backend.create(path, blockchain) as storage:
+                blockchain.prune_depth = 1
+                blockchain.add_transaction(
+                    Transaction(from_address=0, to_address=2, value=7, timestamp=9)
+                )
+                block = blockchain.mine_pending_transactions(miner_address=99)
+                blockchain.add_block(block, skip_mining=True)
+
+                assert blockchain.chain[1].is_pruned()
+                assert storage.get_block(1).get_transaction_count() == 2
+                assert not storage.get_block(1).is_pruned()
+
+    @pytest.mark.parametrize("backend", [BlockLog, BlockFile, SQLiteStorage])
+    def test_pruned_blocks_are_not_stored(
+        self, backend: type, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a store refuses blocks without their transactions."""
+        blockchain = build_chain(num_blocks=2, transfers=PAYMENTS)
+        blockchain.prune(1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chain")
+            with pytest.raises(ValueError):
+                backend.create(path, blockchain)
+
+            assert not os.path.exists(path)
+
+    def test_pruned_file_is_not_converted(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test converting a pruned JSON file leaves no store behind."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "chain.json")
+            path = os.path.join(directory, "chain")
+            blockchain = build_chain(num_blocks=2, transfers=PAYMENTS, prune_depth=1)
+            blockchain.save_to_file(source)
+
+            with pytest.raises(ValueError):
+                convert_json_file(source, path)
+
+            assert os.listdir(path) == []
+            assert not BlockLog.exists(path)
@@ -0,0 +1,183 @@
+"""
+Tests for state snapshots.
+"""
+
+import struct
+import zlib
+from typing import Callable
+import pytest
+from samplechain.block import Block
+from samplechain.blockchain import Blockchain
+from samplechain.lazy import LazyChain
+from samplechain.snapshot import SNAPSHOT_VERSION, StateSnapshot
+from samplechain.stats import ChainTotals
+from samplechain.transaction import Transaction
+
+
+class TestStateSnapshot:
+    """Test cases for the StateSnapshot class."""
+
+    def test_round_trip(self) -> None:
+        """Test every field survives encoding."""
+        snapshot = StateSnapshot(
+            height=12,
+            tip_hash="cd" * 32,
+            difficulty=5,
+            target=2**256,
+            balances={3: 30, 1: 10, 2: 0},
+        )
+
+        decoded = StateSnapshot.from_bytes(snapshot.to_bytes())
+
+        assert decoded == StateSnapshot(
+            height=12,
+            tip_hash="cd" * 32,
+            difficulty=5,
+            target=2**256,
+            balances={1: 10, 3: 30},
+        )
+        assert decoded.to_bytes() == snapshot.to_bytes()
+
+    def test_totals_round_trip(self) -> None:
+        """Test chain totals survive encoding, and their absence does too."""
+        totals = ChainTotals(transactions=7, value=120, fees=3)
+        with_totals = StateSnapshot(
+            height=4, tip_hash="ab" * 32, difficulty=4, totals=totals
+        )
+        without = StateSnapshot(height=4, tip_hash="ab" * 32, difficulty=4)
+
+        assert StateSnapshot.from_bytes(with_totals.to_bytes()).totals == totals
+        assert StateSnapshot.from_bytes(without.to_bytes()).totals is None
+
+    def test_rejects_other_versions(self) -> None:
+        """Test snapshots of another format version are rejected."""
+        data = StateSnapshot(height=3, tip_hash="ab" * 32, difficulty=4).to_bytes()
+        body = data[:6] + bytes([SNAPSHOT_VERSION + 1]) + data[7:-4]
+        data = body + struct.pack(">I", zlib.crc32(body))
+
+        with pytest.raises(ValueError, match="version"):
+            StateSnapshot.from_bytes(data)
+
+    def test_size_grows_with_balances_only(self) -> None:
+        """Test the encoding is a fixed header plus one entry per balance."""
+        empty = StateSnapshot(height=1, tip_hash="00" * 32, difficulty=4)
+        funded = StateSnapshot(
+            height=10**9,
+            tip_hash="00" * 32,
+            difficulty=4,
+            balances={a: 1 for a in range(100)},
+        )
+
+        assert len(funded.to_bytes()) - len(empty.to_bytes()) == 100 * 16
+
+    @pytest.mark.parametrize("damage", ["flip", "truncate", "magic"])
+    def test_rejects_damaged_data(self, damage: str) -> None:
+        """Test corrupt, truncated and foreign data are rejected."""
+        data = bytearray(
+            StateSnapshot(
+                height=1, tip_hash="00" * 32, difficulty=4, balances={1: 5}
+            ).to_bytes()
+        )
+        if damage == "flip":
+            data[20] ^= 1
+        elif damage == "truncate":
+            data = data[:10]
+        else:
+            data[:6] = b"NOTSNP"
+
+        with pytest.raises(ValueError):
+            StateSnapshot.from_bytes(bytes(data))
+
+
+class TestBlockchainSnapshots:
+    """Test cases for restoring a blockchain from a snapshot."""
+
+    def test_restore_replays_only_later_blocks(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a snapshot plus later blocks reproduces the full state."""
+        blockchain = build_chain(num_blocks=2, target=1 << 250)
+        snapshot = blockchain.get_snapshot()
+        blockchain.add_transaction(
+            Transaction(from_address=1, to_address=5, value=1, timestamp=9)
+        )
+        blockchain.add_block(blockchain.mine_pending_transactions(99), skip_mining=True)
+        pending = Transaction(from_address=0, to_address=6, value=2, timestamp=10)
+        blockchain.add_transaction(pending)
+
+        loads = []
+
+        def load(height: int) -> Block:
+            loads.append(height)
+            return blockchain.chain[height].copy()
+
+        restored = Blockchain()
+        restored.restore_snapshot(
+            snapshot,
+            LazyChain(len(blockchain.chain), load),
+            blockchain.get_pending_transactions(),
+        )
+
+        # Only the snapshot tip and the block after it are read
+        assert loads == [2, 3]
+
+        assert {a: b for a, b in restored.balances.items() if b} == {
+            a: b for a, b in blockchain.balances.items() if b
+        }
+        assert restored.target == 1 << 250
+        assert restored.get_pending_transactions() == [pending]
+
+    def test_restore_resumes_statistics(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test statistics continue from the snapshot totals without a scan."""
+        blockchain = build_chain(num_blocks=3, target=1 << 250)
+        snapshot = blockchain.get_snapshot()
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=5, value=5, timestamp=9)
+        )
+        blockchain.add_block(blockchain.mine_pending_transactions(99), skip_mining=True)
+
+        loads = []
+
+        def load(height: int) -> Block:
+            loads.append(height)
+            return blockchain.chain[height].copy()
+
+        restored = Blockchain(target=1 << 250, mining_reward=5)
+        restored.restore_snapshot(snapshot, LazyChain(len(blockchain.chain), load))
+
+        assert snapshot.totals == ChainTotals(transactions=6, value=6 + 3 * 5, fees=3)
+        assert restored.get_chain_stats(window=1) == blockchain.get_chain_stats(
+            window=1
+        )
+        assert loads == [3, 4]
+        assert restored.get_chain_stats() == blockchain.get_chain_stats()
+
+    def test_restore_drops_transactions_confirmed_after_snapshot(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test pending transactions mined after the snapshot are dropped."""
+        blockchain = build_chain(num_blocks=1, target=1 << 250)
+        snapshot = blockchain.get_snapshot()
+        tx = Transaction(from_address=0, to_address=8, value=3, timestamp=20)
+        blockchain.add_transaction(tx)
+        blockchain.add_block(blockchain.mine_pending_transactions(99), skip_mining=True)
+
+        restored = Blockchain()
+        restored.restore_snapshot(snapshot, blockchain.chain, [tx])
+
+        assert restored.get_pending_transactions() == []
+        assert restored.get_balance(8) == 3
+
+    def test_restore_rejects_snapshot_of_other_chain(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a snapshot whose tip is not in the chain is rejected."""
+        blockchain = build_chain(num_blocks=3, target=1 << 250)
+        foreign = StateSnapshot(height=2, tip_hash="ab" * 32, difficulty=4)
+        ahead = StateSnapshot(height=10, tip_hash="00" * 32, difficulty=4)
+
+        for snapshot in (foreign, ahead):
+            with pytest.raises(ValueError):
+                Blockchain().restore_snapshot(snapshot, blockchain.chain)
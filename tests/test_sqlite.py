@@ -0,0 +1,224 @@
+"""
+Tests for the SQLite storage backend.
+"""
+
+import os
+import sqlite3
+import tempfile
+from typing import Callable
+import pytest
+from samplechain.blockchain import Blockchain
+from samplechain.storage import BlockLog, SQLiteStorage, StorageBackend, open_storage
+from samplechain.transaction import Transaction
+
+
+@pytest.fixture
+def db_path():
+    """Provide a path for a new database file."""
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "chain.db")
+
+
+TRANSFERS = ((0, 1), (0, 2), (1, 0), (2, 0))
+
+
+class TestSQLiteStorage:
+    """Test cases for the SQLiteStorage class."""
+
+    def test_create_and_load_round_trip(
+        self, db_path: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a stored blockchain loads back identically."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, pending=True)
+        SQLiteStorage.create(db_path, blockchain).close()
+
+        with SQLiteStorage(db_path) as storage:
+            loaded = storage.load_blockchain()
+
+            assert [b.calculate_hash() for b in loaded.chain] == [
+                b.calculate_hash() for b in blockchain.chain
+            ]
+            assert dict(loaded.balances) == {
+                a: b for a, b in blockchain.balances.items() if b
+            }
+            assert list(loaded.pending_transactions) == list(
+                blockchain.pending_transactions
+            )
+            assert loaded.is_chain_valid()
+
+    def test_add_block_updates_balances_atomically(self, db_path: str) -> None:
+        """Test appended blocks carry their balance changes."""
+        blockchain = Blockchain(initial_balances={0: 100}, mining_reward=5)
+        storage = SQLiteStorage.create(db_path, blockchain)
+
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=1, value=30, fee=2, timestamp=1)
+        )
+        block = blockchain.mine_pending_transactions(miner_address=9)
+        blockchain.add_block(block, skip_mining=True)
+
+        assert storage.get_height() == 2
+        for address in (0, 1, 9):
+            assert storage.get_balance(address) == blockchain.get_balance(address)
+        storage.close()
+
+    def test_failed_append_leaves_no_partial_block(
+        self, db_path: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test a block that fails to insert leaves the database unchanged."""
+        blockchain = build_chain(num_blocks=1, transfers=TRANSFERS, pending=True)
+        storage = SQLiteStorage.create(db_path, blockchain)
+        balances = {a: storage.get_balance(a) for a in (0, 1, 2, 99)}
+
+        # A block whose hash is already stored violates the unique index
+        duplicate = blockchain.chain[1].copy()
+        duplicate.index = 2
+        duplicate.__dict__["_hash"] = blockchain.chain[1].calculate_hash()
+        with pytest.raises(sqlite3.IntegrityError):
+            storage.append_block(duplicate)
+
+        assert storage.get_height() == 2
+        assert storage.get_block(2) is None
+        assert {a: storage.get_balance(a) for a in balances} == balances
+        storage.close()
+
+    def test_queries_match_blockchain(
+        self, db_path: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test indexed queries agree with the in-memory blockchain."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, pending=True)
+        storage = SQLiteStorage.create(db_path, blockchain)
+
+        for height in range(len(blockchain.chain)):
+            assert (
+                storage.get_block(height).calculate_hash()
+                == blockchain.chain[height].calculate_hash()
+            )
+        assert storage.get_block(len(blockchain.chain)) is None
+        assert storage.get_latest_block().index == blockchain.get_latest_block().index
+
+        block_hash = blockchain.chain[2].calculate_hash()
+        assert storage.get_block_by_hash(block_hash.upper()).index == 2
+        assert storage.get_block_by_hash("0" * 64) is None
+
+        tx = blockchain.chain[3].transactions[1]
+        assert storage.get_transaction_by_hash(
+            tx.calculate_hash()
+        ) == blockchain.get_transaction_by_hash(tx.calculate_hash())
+
+        pending = blockchain.get_pending_transactions()
+        assert storage.get_pending_transactions() == pending
+        assert (
+            storage.get_pending_transaction(pending[0].calculate_hash()) == pending[0]
+        )
+        assert storage.get_pending_transaction(tx.calculate_hash()) is None
+        storage.close()
+
+    @pytest.mark.parametrize("direction", ["all", "sent", "received"])
+    @pytest.mark.parametrize("newest_first", [True, False])
+    @pytest.mark.parametrize("address", [0, 1, 2, 42])
+    def test_history_pages_match_blockchain(
+        self,
+        db_path: str,
+        direction: str,
+        newest_first: bool,
+        address: int,
+        build_chain: Callable[..., Blockchain],
+    ) -> None:
+        """Test paging through history gives the same pages as the index."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, pending=True)
+        storage = SQLiteStorage.create(db_path, blockchain)
+
+        assert storage.count_transaction_history(
+            address, direction
+        ) == blockchain.count_transaction_history(address, direction)
+
+        cursor = None
+        while True:
+            expected = blockchain.query_transaction_history(
+                address, direction, limit=3, cursor=cursor, newest_first=newest_first
+            )
+            page = storage.query_transaction_history(
+                address, direction, limit=3, cursor=cursor, newest_first=newest_first
+            )
+            assert page == expected
+            cursor = page[1]
+            if cursor is None:
+                break
+
+        assert storage.query_transaction_history(
+            address, direction
+        ) == blockchain.query_transaction_history(address, direction)
+        storage.close()
+
+    def test_invalid_history_arguments(self, db_path: str) -> None:
+        """Test invalid directions and limits are rejected."""
+        with SQLiteStorage.create(db_path, Blockchain()) as storage:
+            with pytest.raises(ValueError):
+                storage.query_transaction_history(0, direction="sideways")
+            with pytest.raises(ValueError):
+                storage.query_transaction_history(0, limit=-1)
+
+    def test_chain_stats_match_blockchain(
+        self, db_path: str, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test statistics computed in SQL agree with the running aggregates."""
+        blockchain = build_chain(num_blocks=4, transfers=TRANSFERS, pending=True)
+        with SQLiteStorage.create(db_path, blockchain) as storage:
+            assert storage.get_chain_stats(window=2) == blockchain.get_chain_stats(
+                window=2
+            )
+
+    def test_create_refuses_existing_file(self, db_path: str) -> None:
+        """Test an existing file is only replaced with overwrite."""
+        SQLiteStorage.create(db_path, Blockchain()).close()
+
+        with pytest.raises(FileExistsError):
+            SQLiteStorage.create(db_path, Blockchain())
+
+        SQLiteStorage.create(db_path, Blockchain(), overwrite=True).close()
+
+    def test_rejects_files_that_are_not_chains(self, db_path: str) -> None:
+        """Test other files and databases are not opened as chains."""
+        with open(db_path, "w") as f:
+            f.write("{}")
+        assert not SQLiteStorage.exists(db_path)
+        with pytest.raises(FileNotFoundError):
+            SQLiteStorage(db_path)
+
+        os.remove(db_path)
+        sqlite3.connect(db_path).execute("CREATE TABLE other (x)").connection.close()
+        with pytest.raises(FileNotFoundError):
+            SQLiteStorage(db_path)
+
+
+class TestOpenStorage:
+    """Test cases for backend detection."""
+
+    @pytest.mark.parametrize("backend", [BlockLog, SQLiteStorage])
+    def test_detects_backend(
+        self, db_path: str, backend: type, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test the backend that wrote a store is used to open it."""
+        blockchain = build_chain(num_blocks=2, transfers=TRANSFERS, pending=True)
+        backend.create(db_path, blockchain).close()
+
+        storage = open_storage(db_path)
+        assert isinstance(storage, backend)
+        assert isinstance(storage, StorageBackend)
+
+        # Default and indexed query implementations agree
+        assert storage.get_balance(0) == blockchain.get_balance(0)
+        assert (
+            storage.get_block(1).calculate_hash()
+            == blockchain.chain[1].calculate_hash()
+        )
+        assert (
+            storage.get_chain_stats()["total_transactions"]
+            == blockchain.get_chain_stats()["total_transactions"]
+        )
+        storage.close()
+
+    def test_unknown_location(self, db_path: str) -> None:
+        """Test locations without a store are not opened."""
+        assert open_storage(db_path) is None
@@ -0,0 +1,145 @@
+"""
+Tests for the ChainStats class.
+"""
+
+import os
+import tempfile
+from typing import Callable
+import pytest
+from samplechain.block import Block
+from samplechain.blockchain import Blockchain
+from samplechain.stats import ChainStats, ChainTotals
+from samplechain.transaction import Transaction
+
+PAYMENTS = ((0, 1),)
+
+
+def make_block(index: int, timestamp: int, num_transactions: int) -> Block:
+    """Create a block with the given number of transactions."""
+    transactions = [
+        Transaction(from_address=0, to_address=1, value=1, timestamp=i)
+        for i in range(num_transactions)
+    ]
+    return Block(index=index, transactions=transactions, timestamp=timestamp)
+
+
+class TestChainStats:
+    """Test cases for the ChainStats class."""
+
+    def test_totals_match_full_scan(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test running totals equal a scan of every block."""
+        blockchain = build_chain(num_blocks=3, transfers=PAYMENTS)
+        stats = blockchain.get_chain_stats()
+
+        transactions = [tx for block in blockchain.chain for tx in block.transactions]
+        assert stats["total_blocks"] == len(blockchain.chain)
+        assert stats["total_transactions"] == len(transactions)
+        assert stats["total_value_transferred"] == sum(tx.value for tx in transactions)
+        assert stats["total_fees"] == sum(tx.fee for tx in transactions) == 3
+        assert stats["total_addresses"] == len(
+            [addr for addr, balance in blockchain.balances.items() if balance > 0]
+        )
+
+    def test_funded_addresses_follow_balances(self) -> None:
+        """Test addresses are counted when funded and dropped when emptied."""
+        blockchain = Blockchain(initial_balances={0: 10}, mining_reward=0)
+        assert blockchain.stats.funded_addresses == 1
+
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=1, value=10, timestamp=1)
+        )
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        blockchain.add_block(block, skip_mining=True)
+
+        # Address 0 is emptied, 1 is funded and the zero reward funds nobody
+        assert blockchain.stats.funded_addresses == 1
+        assert blockchain.get_chain_stats()["total_addresses"] == 1
+
+    def test_window_statistics(self) -> None:
+        """Test block interval and throughput over recent blocks."""
+        stats = ChainStats()
+        for index, (timestamp, count) in enumerate([(0, 0), (10, 2), (20, 4), (40, 6)]):
+            stats.add_block(make_block(index, timestamp, count))
+
+        assert stats.get_average_block_interval() == pytest.approx(40 / 3)
+        assert stats.get_average_block_interval(window=1) == 20
+        assert stats.get_transactions_per_second() == pytest.approx(12 / 40)
+        assert stats.get_transactions_per_second(window=2) == pytest.approx(10 / 30)
+        # Windows larger than the chain are clamped
+        assert stats.get_transactions_per_second(window=100) == pytest.approx(12 / 40)
+
+    def test_window_statistics_without_intervals(self) -> None:
+        """Test rates are zero before two blocks exist or time has passed."""
+        stats = ChainStats()
+        assert stats.get_average_block_interval() == 0.0
+
+        stats.add_block(make_block(0, 5, 1))
+        assert stats.get_transactions_per_second() == 0.0
+
+        stats.add_block(make_block(1, 5, 1))
+        assert stats.get_average_block_interval() == 0.0
+        assert stats.get_transactions_per_second() == 0.0
+
+    def test_rebuild_matches_incremental(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test rebuilding from a chain reproduces the running aggregates."""
+        blockchain = build_chain(num_blocks=3, transfers=PAYMENTS)
+        rebuilt = ChainStats()
+        rebuilt.rebuild(blockchain.chain, blockchain.balances)
+
+        for name in (
+            "total_blocks",
+            "total_transactions",
+            "total_value",
+            "total_fees",
+            "funded_addresses",
+        ):
+            assert getattr(rebuilt, name) == getattr(blockchain.stats, name)
+        assert (
+            rebuilt.get_average_block_interval()
+            == blockchain.stats.get_average_block_interval()
+        )
+
+    def test_resume_matches_incremental(self) -> None:
+        """Test statistics resumed from saved totals match ones built block by block."""
+        blocks = [
+            make_block(i, t, c)
+            for i, (t, c) in enumerate([(0, 0), (10, 2), (20, 4), (40, 6)])
+        ]
+        full = ChainStats()
+        for block in blocks:
+            full.add_block(block)
+
+        resumed = ChainStats()
+        resumed.resume(blocks, 2, ChainTotals(transactions=2, value=2, fees=0))
+        for block in blocks[2:]:
+            resumed.add_block(block)
+
+        assert resumed.get_totals() == full.get_totals()
+        for window in (None, 1, 2, 3):
+            assert resumed.get_average_block_interval(
+                window
+            ) == full.get_average_block_interval(window)
+            assert resumed.get_transactions_per_second(
+                window
+            ) == full.get_transactions_per_second(window)
+
+    def test_stats_survive_save_and_load(
+        self, build_chain: Callable[..., Blockchain]
+    ) -> None:
+        """Test loading a chain rebuilds its statistics."""
+        blockchain = build_chain(num_blocks=3, transfers=PAYMENTS)
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            filename = f.name
+
+        try:
+            blockchain.save_to_file(filename)
+            loaded = Blockchain.load_from_file(filename)
+
+            assert loaded.get_chain_stats() == blockchain.get_chain_stats()
+        finally:
+            os.unlink(filename)
@@ -0,0 +1,406 @@
+"""
+Tests for the block log storage engine.
+"""
+
+import io
+import json
+import os
+import tempfile
+import pytest
+from samplechain.blockchain import Blockchain
+from samplechain.snapshot import StateSnapshot
+from samplechain.storage import BlockLog, JSONStreamReader, convert_json_file
+from samplechain.storage.directory import (
+    MEMPOOL_FILE,
+    META_FILE,
+    PENDING_FILE,
+    SEGMENTS_LAYOUT,
+    SNAPSHOT_PREFIX,
+)
+from samplechain.transaction import Transaction
+
+
+@pytest.fixture
+def log_dir():
+    """Provide an empty directory for a block log."""
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "chain")
+
+
+def mine_block(blockchain: Blockchain, timestamp: int, value: int = 10) -> None:
+    """Add a block with one transfer from address 0 to address 1."""
+    blockchain.add_transaction(
+        Transaction(
+            from_address=0, to_address=1, value=value, fee=1, timestamp=timestamp
+        )
+    )
+    block = blockchain.mine_pending_transactions(miner_address=99)
+    blockchain.add_block(block, skip_mining=True)
+
+
+def remove_snapshots(path: str) -> None:
+    """Delete the state snapshots of a store, forcing a full replay."""
+    for name in os.listdir(path):
+        if name.startswith(SNAPSHOT_PREFIX):
+            os.remove(os.path.join(path, name))
+
+
+def assert_same_state(loaded: Blockchain, original: Blockchain) -> None:
+    """Check that two blockchains hold the same chain, balances and mempool."""
+    assert [b.calculate_hash() for b in loaded.chain] == [
+        b.calculate_hash() for b in original.chain
+    ]
+    assert dict(loaded.balances) == {a: b for a, b in original.balances.items() if b}
+    assert list(loaded.pending_transactions) == list(original.pending_transactions)
+    assert loaded.get_settings() == original.get_settings()
+
+
+class TestBlockLog:
+    """Test cases for the BlockLog class."""
+
+    def test_create_and_load_round_trip(self, log_dir: str) -> None:
+        """Test a stored blockchain loads back identically."""
+        blockchain = Blockchain(initial_balances={0: 1000}, target=1 << 250)
+        mine_block(blockchain, 1)
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=2, value=5, timestamp=2)
+        )
+
+        BlockLog.create(log_dir, blockchain).close()
+        loaded = BlockLog(log_dir).load_blockchain()
+
+        assert_same_state(loaded, blockchain)
+        assert loaded.is_chain_valid()
+        assert loaded.storage is not None
+        assert BlockLog(log_dir).read_meta()["layout"] == SEGMENTS_LAYOUT
+
+    def test_add_block_appends_only_new_block(self, log_dir: str) -> None:
+        """Test adding a block appends one line and leaves earlier data alone."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain, segment_blocks=100)
+        segment = os.path.join(log_dir, "blocks-0000000000.jsonl")
+        with open(segment, "rb") as f:
+            before = f.read()
+
+        mine_block(blockchain, 1)
+
+        with open(segment, "rb") as f:
+            after = f.read()
+        assert after.startswith(before)
+        assert after.count(b"\n") == 2
+        assert log.height == 2
+        log.close()
+
+    def test_failed_append_leaves_blockchain_unchanged(
+        self, log_dir: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a block the store cannot write is not added in memory either."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain)
+        blockchain.add_transaction(Transaction(from_address=0, to_address=1, value=10))
+        block = blockchain.mine_pending_transactions(miner_address=99)
+
+        def fail(block: object) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(log, "append_block", fail)
+        with pytest.raises(OSError):
+            blockchain.add_block(block, skip_mining=True)
+
+        assert len(blockchain.chain) == 1
+        assert blockchain.get_balance(0) == 1000
+        assert len(blockchain.pending_transactions) == 1
+        assert not block.is_frozen()
+        log.close()
+
+    def test_queries_reuse_loaded_chain(
+        self, log_dir: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test queries load the chain once and reload it when the log changes."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain)
+        loads = []
+        load_blockchain = log.load_blockchain
+
+        def counting_load() -> Blockchain:
+            loads.append(len(blockchain.chain))
+            return load_blockchain()
+
+        monkeypatch.setattr(log, "load_blockchain", counting_load)
+        assert log.get_balance(0) == 1000
+        assert log.get_pending_transactions() == []
+        assert loads == [1]
+
+        mine_block(blockchain, 1)
+        assert log.get_balance(1) == 10
+        assert loads == [1, 2]
+
+        pending = Transaction(from_address=0, to_address=2, value=5, timestamp=2)
+        blockchain.add_transaction(pending)
+        blockchain.save_state()
+        assert log.get_pending_transactions() == [pending]
+        assert loads == [1, 2, 2]
+        log.close()
+
+    def test_segments_roll_over(self, log_dir: str) -> None:
+        """Test blocks are split across segment files."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain, segment_blocks=2)
+        for timestamp in range(1, 5):
+            mine_block(blockchain, timestamp)
+        blockchain.save_state()
+        log.close()
+
+        segments = sorted(n for n in os.listdir(log_dir) if n.startswith("blocks-"))
+        assert len(segments) == 3
+
+        reopened = BlockLog(log_dir, segment_blocks=2)
+        assert reopened.height == 5
+        assert [b.index for b in reopened.iter_blocks(start=3)] == [3, 4]
+        assert_same_state(reopened.load_blockchain(), blockchain)
+
+    def test_blocks_after_checkpoint_are_replayed(self, log_dir: str) -> None:
+        """Test balances and mempool catch up with blocks newer than the state file."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain)
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=1, value=7, timestamp=1)
+        )
+        blockchain.save_state()
+
+        # The pending transaction is mined but no checkpoint is written
+        block = blockchain.mine_pending_transactions(miner_address=99)
+        blockchain.add_block(block, skip_mining=True)
+        log.close()
+
+        loaded = BlockLog(log_dir).load_blockchain()
+        assert_same_state(loaded, blockchain)
+        assert len(loaded.pending_transactions) == 0
+
+    def test_load_without_state_replays_from_initial_balances(
+        self, log_dir: str
+    ) -> None:
+        """Test the log alone is enough to rebuild balances."""
+        blockchain = Blockchain(initial_balances={0: 1000, 3: 50})
+        mine_block(blockchain, 1)
+        BlockLog.create(log_dir, blockchain).close()
+        remove_snapshots(log_dir)
+        os.remove(os.path.join(log_dir, MEMPOOL_FILE))
+
+        loaded = BlockLog(log_dir).load_blockchain()
+        assert_same_state(loaded, blockchain)
+
+    def test_torn_append_is_truncated(self, log_dir: str) -> None:
+        """Test a partially written block is dropped when the log is reopened."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        BlockLog.create(log_dir, blockchain).close()
+        segment = os.path.join(log_dir, "blocks-0000000000.jsonl")
+        with open(segment, "ab") as f:
+            f.write(b'{"index":1,"transac')
+
+        log = BlockLog(log_dir)
+        assert log.height == 1
+        mine_block(log.load_blockchain(), 1)
+        log.close()
+
+        assert BlockLog(log_dir).height == 2
+
+    def test_append_rejects_gaps(self, log_dir: str) -> None:
+        """Test a block that does not follow the log is refused."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        mine_block(blockchain, 1)
+        source = Blockchain(initial_balances={0: 1000})
+
+        with BlockLog.create(log_dir, source) as log:
+            with pytest.raises(ValueError):
+                log.append_block(blockchain.chain[0])
+            log.append_block(blockchain.chain[1])
+
+    def test_existing_log_is_not_overwritten(self, log_dir: str) -> None:
+        """Test creating a log over another requires overwrite."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        BlockLog.create(log_dir, blockchain).close()
+
+        with pytest.raises(FileExistsError):
+            BlockLog.create(log_dir, blockchain)
+
+        BlockLog.create(log_dir, blockchain, overwrite=True).close()
+
+    def test_interrupted_create_is_not_a_store(self, log_dir: str) -> None:
+        """Test a log whose metadata was never written is not opened or kept."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        mine_block(blockchain, timestamp=1)
+
+        # What a crash before the metadata is written leaves behind
+        log = BlockLog._initialize(log_dir, overwrite=False)
+        log.append_block(blockchain.chain[0])
+        log.close()
+        assert not BlockLog.exists(log_dir)
+        assert not os.path.exists(os.path.join(log_dir, META_FILE))
+
+        BlockLog.create(log_dir, blockchain).close()
+        assert_same_state(BlockLog(log_dir).load_blockchain(), blockchain)
+        assert PENDING_FILE not in os.listdir(log_dir)
+
+    @pytest.mark.parametrize("sync", ["always", "batch", "never"])
+    def test_sync_modes(self, log_dir: str, sync: str) -> None:
+        """Test every sync mode stores the same chain."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(log_dir, blockchain, sync=sync, sync_interval=2)
+        for timestamp in range(1, 4):
+            mine_block(blockchain, timestamp)
+        blockchain.save_state()
+        log.close()
+
+        assert_same_state(BlockLog(log_dir).load_blockchain(), blockchain)
+
+    def test_snapshots_are_written_periodically_and_pruned(self, log_dir: str) -> None:
+        """Test a snapshot is written every snapshot_interval blocks."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(
+            log_dir, blockchain, snapshot_interval=2, keep_snapshots=2
+        )
+        for timestamp in range(1, 6):
+            mine_block(blockchain, timestamp)
+
+        assert [s.height for s in log.iter_snapshots()] == [6, 4]
+        snapshot = next(log.iter_snapshots())
+        assert snapshot.tip_hash == blockchain.get_latest_block().calculate_hash()
+        assert snapshot.balances == {a: b for a, b in blockchain.balances.items() if b}
+        assert snapshot.totals == blockchain.stats.get_totals()
+        log.close()
+
+    def test_load_falls_back_past_bad_snapshots(self, log_dir: str) -> None:
+        """Test corrupt snapshots and snapshots of another chain are skipped."""
+        blockchain = Blockchain(initial_balances={0: 1000})
+        log = BlockLog.create(
+            log_dir, blockchain, snapshot_interval=1, keep_snapshots=3
+        )
+        for timestamp in range(1, 4):
+            mine_block(blockchain, timestamp)
+        log.close()
+
+        # Corrupt the newest snapshot and replace the next with a foreign one
+        names = sorted(n for n in os.listdir(log_dir) if n.startswith(SNAPSHOT_PREFIX))
+        with open(os.path.join(log_dir, names[-1]), "r+b") as f:
+            f.seek(10)
+            f.write(b"\xff")
+        foreign = StateSnapshot(
+            height=3, tip_hash="ab" * 32, difficulty=4, balances={0: 1}
+        )
+        with open(os.path.join(log_dir, names[-2]), "wb") as f:
+            f.write(foreign.to_bytes())
+
+        reopened = BlockLog(log_dir)
+        assert [s.height for s in reopened.iter_snapshots()] == [3, 2]
+        assert_same_state(reopened.load_blockchain(), blockchain)
+
+    def test_invalid_options(self, log_dir: str) -> None:
+        """Test invalid sync settings and missing logs are rejected."""
+        with pytest.raises(FileNotFoundError):
+            BlockLog(log_dir)
+
+        BlockLog.create(log_dir, Blockchain()).close()
+        with pytest.raises(ValueError):
+            BlockLog(log_dir, sync="sometimes")
+        with pytest.raises(ValueError):
+            BlockLog(log_dir, sync_interval=0)
+        with pytest.raises(ValueError):
+            BlockLog(log_dir, keep_snapshots=0)
+
+
+class TestConvertJSONFile:
+    """Test cases for converting blockchain.json files."""
+
+    def test_conversion_matches_load_from_file(self, log_dir: str) -> None:
+        """Test a converted log loads to the same state as the JSON file."""
+        blockchain = Blockchain(initial_balances={0: 1000, 5: 20}, mining_reward=3)
+        for timestamp in range(1, 4):
+            mine_block(blockchain, timestamp)
+        blockchain.add_transaction(
+            Transaction(from_address=0, to_address=2, value=5, timestamp=9)
+        )
+
+        source = log_dir + ".json"
+        blockchain.save_to_file(source)
+        convert_json_file(source, log_dir).close()
+
+        loaded = BlockLog(log_dir).load_blockchain()
+        assert_same_state(loaded, Blockchain.load_from_file(source))
+
+        # Initial balances were recovered, so replaying the log agrees too
+        remove_snapshots(log_dir)
+        assert_same_state(BlockLog(log_dir).load_blockchain(), blockchain)
+
+    def test_conversion_applies_legacy_defaults(self, log_dir: str) -> None:
+        """Test files without a block version convert as legacy chains."""
+        blockchain = Blockchain(initial_balances={0: 1000}, block_version=1)
+        source = log_dir + ".json"
+        blockchain.save_to_file(source)
+        with open(source) as f:
+            data = json.load(f)
+        del data["block_version"]
+        with open(source, "w") as f:
+            json.dump(data, f)
+
+        convert_json_file(source, log_dir).close()
+
+        assert BlockLog(log_dir).load_blockchain().block_version == 1
+
+
+class TestJSONStreamReader:
+    """Test cases for the JSONStreamReader class."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64])
+    def test_streams_array_members(self, chunk_size: int) -> None:
+        """Test members are decoded across chunk boundaries."""
+        document = {
+            "chain": [{"a": 1}, [2, 3], 12345, "x"],
+            "n": 1234567,
+            "e": [],
+            "o": {},
+        }
+        reader = JSONStreamReader(
+            io.StringIO(json.dumps(document, indent=2)), chunk_size
+        )
+
+        items = list(reader.iter_object(array_keys=("chain", "e")))
+
+        assert items == [
+            ("chain", {"a": 1}),
+            ("chain", [2, 3]),
+            ("chain", 12345),
+            ("chain", "x"),
+            ("n", 1234567),
+            ("o", {}),
+        ]
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 64])
+    def test_spans_locate_values(self, chunk_size: int) -> None:
+        """Test reported offsets slice out each value of the document."""
+        text = json.dumps({"chain": [{"a": [1, 2]}, 3], "s": "x,y", "n": 42}, indent=2)
+        reader = JSONStreamReader(io.StringIO(text), chunk_size)
+
+        spans = list(reader.iter_spans(array_keys=("chain",)))
+
+        assert [key for key, _, _ in spans] == ["chain", "chain", "s", "n"]
+        assert [json.loads(text[start:end]) for _, start, end in spans] == [
+            {"a": [1, 2]},
+            3,
+            "x,y",
+            42,
+        ]
+
+    def test_empty_object(self) -> None:
+        """Test an empty object yields nothing."""
+        assert list(JSONStreamReader(io.StringIO(" {} ")).iter_object()) == []
+
+    @pytest.mark.parametrize(
+        "document", ['{"a": 1', "[1, 2]", '{"a" 1}', '{"a": [1 2]}']
+    )
+    def test_malformed_documents(self, document: str) -> None:
+        """Test malformed documents raise ValueError."""
+        reader = JSONStreamReader(io.StringIO(document), chunk_size=2)
+
+        with pytest.raises(ValueError):
+            list(reader.iter_object(array_keys=("a",)))
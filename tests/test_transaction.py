@@ -2,7 +2,9 @@
 Tests for the Transaction class.
 """
 
+import hashlib
 import json
+import pickle
 import pytest
 from samplechain.transaction import Transaction
 
@@ -222,4 +224,35 @@ class TestTransaction:
         
         assert tx1 == tx2
         assert tx1 != tx3
-        assert hash(tx1) == hash(tx2)  # Equal objects should have same hash
\ No newline at end of file
+        assert hash(tx1) == hash(tx2)  # Equal objects should have same hash
+
+    def test_hash_is_cached(self) -> None:
+        """Test the digest is computed once and matches a fresh SHA256."""
+        tx = Transaction(
+            from_address=1, to_address=2, value=100, fee=5, timestamp=1640995200
+        )
+        expected = hashlib.sha256(b"1,2,100,5,1640995200").hexdigest()
+
+        assert tx.calculate_hash() == expected
+        assert tx.get_digest() is tx.get_digest()
+        assert tx.get_digest().hex() == expected
+
+    def test_cache_does_not_affect_equality(self) -> None:
+        """Test cached hashes do not change equality or hashing semantics."""
+        tx1 = Transaction(from_address=1, to_address=2, value=100, timestamp=1640995200)
+        tx2 = Transaction(from_address=1, to_address=2, value=100, timestamp=1640995200)
+
+        tx1.calculate_hash()
+        tx1.get_canonical_encoding()
+
+        assert tx1 == tx2
+        assert hash(tx1) == hash(tx2)
+        assert repr(tx1) == repr(tx2)
+        assert pickle.loads(pickle.dumps(tx1)) == tx2
+
+    def test_canonical_encoding(self) -> None:
+        """Test the cached encoding matches compact sorted JSON."""
+        tx = Transaction(from_address=1, to_address=2, value=100, fee=5)
+        expected = json.dumps(tx.to_dict(), sort_keys=True, separators=(",", ":"))
+
+        assert tx.get_canonical_encoding() == expected.encode()